@@ -0,0 +1,48 @@
+"""Cálculo de asignación de fondos de seguridad pública (FASP, FOFISP)."""
+from .engine import (
+    FASP_MIN_MAX_VARIABLE_MAP,
+    FASP_VARIABLE_MAP,
+    FOFISP_VARIABLE_MAP,
+    apply_bands,
+    band_adjustment,
+    band_columns,
+    band_diagnostics,
+    band_summary,
+    calculate_index,
+    calculate_normalized_index,
+    direct_proportion_normalize,
+    indicator_matrix,
+    min_max_normalize,
+    run_allocation,
+)
+from .bands import BandSolution, solve_bands
+from .batch import (
+    FASP_WEIGHT_KEYS,
+    ScenarioResults,
+    evaluate_scenarios,
+    weight_keys,
+    weights_to_matrix,
+)
+from .cache import ResultCache, content_hash, scenario_key
+from .compare import (
+    NormalizerResults,
+    allocation_ranks,
+    compare_allocations,
+    evaluate_normalizers,
+)
+from .diagnostics import import_times, importtime_profile, lazy_import
+from .hierarchy import HierarchicalResults, allocate_hierarchical, group_layout
+from .montecarlo import DISTRIBUTIONS, MonteCarloResults, simulate
+from .normalizers import (
+    NORMALIZERS,
+    benchmark_normalizers,
+    get_normalizer,
+    normalize_matrix,
+    proportion_matrix,
+    register_normalizer,
+    to_shares,
+)
+from .optimize import OBJECTIVES, OptimizationResult, optimize_weights
+from .pipeline import Graph, allocation_graph, allocation_params, fingerprint
+from .rounding import largest_remainder, to_centavos
+from .sensitivity import band_jacobian, points_table, weight_jacobian
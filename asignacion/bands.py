@@ -0,0 +1,189 @@
+"""
+Solución exacta de la banda de control.
+
+El reparto de una sola pasada (recortar a `Min`/`Max` y repartir el remanente entre las
+elegibles) puede volver a empujar Entidades por encima de `Max`. Aquí se busca el nivel
+común `t` tal que
+
+    x_i = clip(a_i + t * s_i, Min_i, Max_i)    y    sum(x_i) = presupuesto
+
+- reparto proporcional (FASP): a_i = 0, s_i = asignación bruta (se escala la asignación)
+- reparto igualitario (FOFISP): a_i = asignación bruta, s_i = 1 (se suma el mismo monto)
+
+Como la suma es monótona en `t`, la solución se obtiene en forma cerrada ordenando los
+puntos de quiebre (water-filling) o iterativamente fijando las Entidades que rebasan la banda.
+"""
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+
+class BandSolution(NamedTuple):
+    """
+    Resultado del solver; `asignacion` conserva la forma de la entrada y `nivel` es el `t`
+    común de cada escenario (±inf si el presupuesto no cabe en la banda).
+    """
+    asignacion: np.ndarray
+    factible: np.ndarray
+    iteraciones: np.ndarray
+    segundos: float
+    nivel: np.ndarray
+
+
+def _linear_terms(asignacion, redistribution):
+    if redistribution == 'proportional':
+        return np.zeros_like(asignacion), asignacion
+    if redistribution == 'equal':
+        return asignacion, np.ones_like(asignacion)
+    raise ValueError("El reparto del remanente debe ser 'proportional' o 'equal'")
+
+
+def _close_residual(x, s, lo, hi, total, factible):
+    """
+    Reparte el residuo de redondeo entre las Entidades libres proporcional a `s`. Si el
+    problema no es factible, escala todas las asignaciones por el mismo factor.
+    """
+    current = x.sum(axis=-1, keepdims=True)
+    residual = total - current
+    free = (x > lo) & (x < hi)
+    weights = np.where(free, s, 0.0)
+    weight_sum = weights.sum(axis=-1, keepdims=True)
+    x = x + np.where(weight_sum > 0, weights / np.where(weight_sum > 0, weight_sum, 1) * residual, 0)
+    return np.where(factible[..., None] | (current == 0), x, x * total / np.where(current == 0, 1, current))
+
+
+def _solve_closed(a, s, lo, hi, total):
+    """Water-filling vectorizado sobre el último eje (acepta lotes de escenarios)."""
+    active = s > 0
+    # Entidades sin pendiente quedan fijas en clip(a, Min, Max)
+    const = np.clip(a, lo, hi)
+    lo = np.where(active, lo, const)
+    hi = np.where(active, hi, const)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_lo = np.where(active, (lo - a) / s, -np.inf)
+        t_hi = np.where(active, (hi - a) / s, -np.inf)
+
+    # eventos: al cruzar t_lo la Entidad deja Min, al cruzar t_hi llega a Max.
+    # f(t) = K + t * L es lineal entre eventos consecutivos.
+    times = np.concatenate([t_lo, t_hi], axis=-1)
+    d_k = np.concatenate([a - lo, hi - a], axis=-1)
+    d_l = np.concatenate([s, -s], axis=-1)
+
+    order = np.argsort(times, axis=-1, kind='stable')
+    times = np.take_along_axis(times, order, axis=-1)
+    k = lo.sum(axis=-1, keepdims=True) + np.cumsum(np.take_along_axis(d_k, order, axis=-1), axis=-1)
+    slope = np.cumsum(np.take_along_axis(d_l, order, axis=-1), axis=-1)
+    f = np.where(slope == 0, k, k + np.where(np.isfinite(times), times, 0) * slope)
+
+    tol = 1e-12 * np.abs(total)
+    factible = ((lo.sum(axis=-1, keepdims=True) <= total + tol)
+                & (hi.sum(axis=-1, keepdims=True) >= total - tol))[..., 0]
+
+    # primer evento donde f alcanza el presupuesto; t se despeja en el tramo anterior
+    event = np.argmax(f >= total - tol, axis=-1)[..., None]
+    prev = np.maximum(event - 1, 0)
+    k_prev = np.take_along_axis(k, prev, axis=-1)
+    slope_prev = np.take_along_axis(slope, prev, axis=-1)
+    t_event = np.take_along_axis(times, event, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where((event == 0) | (slope_prev <= 0), t_event, (total - k_prev) / slope_prev)
+
+    # presupuesto fuera de [sum(Min), sum(Max)]: todas las Entidades en el extremo de la banda
+    t = np.where(total > hi.sum(axis=-1, keepdims=True) + tol, np.inf, t)
+    t = np.where(total < lo.sum(axis=-1, keepdims=True) - tol, -np.inf, t)
+
+    with np.errstate(invalid='ignore'):
+        x = np.where(active, np.clip(a + t * s, lo, hi), const)
+    return x, factible, event[..., 0] + 1, t[..., 0]
+
+
+def _solve_iterative(a, s, lo, hi, total, max_iter):
+    """Fija en cada ronda las Entidades del lado que más rebasa la banda (un escenario)."""
+    # como en `_solve_closed`, las Entidades sin pendiente quedan fijas en clip(a, Min, Max)
+    inactive = s <= 0
+    const = np.clip(a, lo, hi)
+    fixed = inactive.copy()
+    x = np.where(inactive, const, 0.0)
+    iteraciones, t = 0, 0.0
+
+    for iteraciones in range(1, max_iter + 1):
+        free = ~fixed
+        s_free = s[free].sum()
+        remaining = total - x[fixed].sum() - a[free].sum()
+        t = remaining / s_free if s_free > 0 else 0.0
+        x[free] = a[free] + t * s[free]
+
+        over = free & (x > hi)
+        under = free & (x < lo)
+        if not over.any() and not under.any():
+            break
+
+        # se fija primero el lado con mayor violación total
+        if (x - hi)[over].sum() >= (lo - x)[under].sum():
+            x[over] = hi[over]
+            fixed |= over
+        else:
+            x[under] = lo[under]
+            fixed |= under
+
+        if fixed.all():
+            break
+
+    # factibilidad con la banda efectiva (las Entidades fijas solo aportan su valor)
+    tol = 1e-12 * abs(total)
+    factible = (np.where(inactive, const, lo).sum() <= total + tol
+                and np.where(inactive, const, hi).sum() >= total - tol)
+    if not factible:
+        t = np.inf if total > np.where(inactive, const, hi).sum() else -np.inf
+    return x, factible, iteraciones, t
+
+
+def solve_bands(asignacion, minimo, maximo, presupuesto=None, redistribution='proportional',
+                method='closed', max_iter=None):
+    """
+    Ajusta `asignacion` a la banda [`minimo`, `maximo`] conservando el total `presupuesto`.
+
+    Los arreglos tienen forma (..., n_entidades); `presupuesto` es escalar o de forma (...)
+    y por omisión es la suma de `asignacion`. Con `method='closed'` se resuelve por
+    water-filling (vectorizado sobre lotes; `iteraciones` es el número de puntos de quiebre
+    recorridos). Con `method='iterative'` se fijan Entidades en la banda ronda por ronda
+    (a lo más `max_iter`, por omisión n_entidades rondas).
+
+    Si el presupuesto no cabe en [sum(Min), sum(Max)], `factible` es False: todas las
+    Entidades quedan en el extremo de la banda y se escalan por el mismo factor (rebasando
+    la banda) para conservar el total.
+    """
+    start = time.perf_counter()
+
+    asignacion = np.asarray(asignacion, dtype=float)
+    a, s = _linear_terms(asignacion, redistribution)
+    a, s, lo, hi = np.broadcast_arrays(a, s, np.asarray(minimo, dtype=float), np.asarray(maximo, dtype=float))
+    if presupuesto is None:
+        presupuesto = asignacion.sum(axis=-1)
+    total = np.broadcast_to(np.asarray(presupuesto, dtype=float), a.shape[:-1])[..., None]
+
+    if method == 'closed':
+        x, factible, iteraciones, nivel = _solve_closed(a, s, lo, hi, total)
+    elif method == 'iterative':
+        n = a.shape[-1]
+        max_iter = n if max_iter is None else max_iter
+        rows = zip(*(arr.reshape(-1, n) for arr in (a, s, lo, hi)), total.reshape(-1))
+        flat = [_solve_iterative(*row, max_iter) for row in rows]
+        x = np.stack([item[0] for item in flat]).reshape(a.shape)
+        factible = np.array([item[1] for item in flat]).reshape(a.shape[:-1])
+        iteraciones = np.array([item[2] for item in flat]).reshape(a.shape[:-1])
+        nivel = np.array([item[3] for item in flat], dtype=float).reshape(a.shape[:-1])
+    else:
+        raise ValueError("El método debe ser 'closed' o 'iterative'")
+
+    x = _close_residual(x, s, lo, hi, total, np.asarray(factible))
+
+    return BandSolution(
+        asignacion=x,
+        factible=np.asarray(factible),
+        iteraciones=np.asarray(iteraciones),
+        segundos=time.perf_counter() - start,
+        nivel=np.asarray(nivel),
+    )
@@ -0,0 +1,95 @@
+"""
+Evaluación por lotes de escenarios de ponderadores.
+
+Calcula en una sola pasada, para S vectores de ponderadores, la asignación antes de
+bandas, la asignación ajustada y su variación contra el ejercicio anterior.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from .bands import solve_bands
+from .engine import FASP_VARIABLE_MAP, indicator_matrix, shifted_index
+from .normalizers import normalize_matrix, resolve_methods
+
+
+# Orden de las columnas de la matriz de escenarios: los 14 indicadores y el monto base
+FASP_WEIGHT_KEYS = tuple(FASP_VARIABLE_MAP) + ('Monto base',)
+
+
+class ScenarioResults(NamedTuple):
+    """Resultados apilados con forma (S, n_entidades); `factible` tiene forma (S,)."""
+    entidades: np.ndarray
+    asignacion_bruta: np.ndarray
+    asignacion_ajustada: np.ndarray
+    var_ajustada: np.ndarray
+    factible: np.ndarray
+
+
+def weight_keys(variable_map=FASP_VARIABLE_MAP, method='proportion'):
+    """Orden de las columnas de ponderadores: indicadores y, en 'proportion', el monto base."""
+    return tuple(variable_map) + (('Monto base',) if method == 'proportion' else ())
+
+
+def weights_to_matrix(weights_list, keys=FASP_WEIGHT_KEYS):
+    """Convierte una lista de diccionarios `weights` en una matriz (S x len(keys))."""
+    return np.array([[weights[key] for key in keys] for weights in weights_list], dtype=float)
+
+
+def evaluate_scenarios(data, weight_matrix, presupuesto, upper_limit, lower_limit,
+                       variable_map=FASP_VARIABLE_MAP, method='proportion', normalization=None):
+    """
+    Evalúa S escenarios de ponderadores sobre el mismo archivo de entrada.
+
+    `weight_matrix` tiene forma (S x K), con columnas en el orden de
+    `weight_keys(variable_map, method)` (en 'proportion' la última es el monto base).
+    `presupuesto`, `upper_limit` y `lower_limit` pueden ser escalares o arreglos de
+    longitud S. `method` y `normalization` tienen el mismo significado que en
+    `run_allocation`, cuyos resultados coinciden escenario por escenario.
+    """
+    W = np.atleast_2d(np.asarray(weight_matrix, dtype=float))
+    n_scenarios = W.shape[0]
+    n_keys = len(weight_keys(variable_map, method))
+    if W.shape[1] != n_keys:
+        raise ValueError(f"Se esperaban {n_keys} columnas de ponderadores, "
+                         f"se recibieron {W.shape[1]}")
+
+    presupuesto = np.broadcast_to(np.asarray(presupuesto, dtype=float), (n_scenarios,))[:, None]
+    upper_limit = np.broadcast_to(np.asarray(upper_limit, dtype=float), (n_scenarios,))[:, None]
+    lower_limit = np.broadcast_to(np.asarray(lower_limit, dtype=float), (n_scenarios,))[:, None]
+
+    # las puntuaciones no dependen de los ponderadores: se calculan una sola vez (n x k)
+    X, negative = indicator_matrix(data, variable_map)
+
+    if method == 'proportion':
+        methods = resolve_methods(list(variable_map), normalization, 'proportion')
+        props = normalize_matrix(X, negative, methods, shares=True)
+        # asignación bruta de todos los escenarios: (S x k) @ (k x n) más el monto base
+        bruta = (W[:, :-1] @ props.T + W[:, -1:] / len(data)) * presupuesto
+        redistribution = 'proportional'
+    elif method == 'min_max':
+        methods = resolve_methods(list(variable_map), normalization, 'min_max')
+        scores = normalize_matrix(X, negative, methods)
+        # índice de todos los escenarios, re-escalado y con corrimiento
+        _, corrimiento = shifted_index(W @ scores.T)
+        bruta = corrimiento / corrimiento.sum(axis=1, keepdims=True) * presupuesto
+        redistribution = 'equal'
+    else:
+        raise ValueError("El método debe ser 'proportion' o 'min_max'")
+
+    # bandas respecto al ejercicio anterior, resueltas para todos los escenarios a la vez
+    asignacion_2025 = data['Asignacion_2025'].to_numpy(dtype=float)
+    minimo = asignacion_2025 * (1 - lower_limit)
+    maximo = asignacion_2025 * (1 + upper_limit)
+    # el total de la banda es la asignación bruta de cada escenario, como en `apply_bands`
+    # (presupuesto * suma de ponderadores en 'proportion')
+    solution = solve_bands(bruta, minimo, maximo, bruta.sum(axis=-1), redistribution=redistribution)
+    ajustada = solution.asignacion
+
+    return ScenarioResults(
+        entidades=data['Entidad_Federativa'].to_numpy(),
+        asignacion_bruta=bruta,
+        asignacion_ajustada=ajustada,
+        var_ajustada=(ajustada - asignacion_2025) / asignacion_2025,
+        factible=solution.factible,
+    )
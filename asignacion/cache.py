@@ -0,0 +1,88 @@
+"""
+Memo LRU de resultados de asignación.
+
+Los resultados (DataFrames y figuras serializadas) se indexan con un hash estable del
+archivo de entrada, los ponderadores, el presupuesto y las bandas, de modo que regresar
+a un escenario ya calculado no repite el cálculo.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def content_hash(content):
+    """Hash SHA-256 (hex) del contenido de un archivo en bytes."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def scenario_key(data_hash, weights, presupuesto, upper_limit, lower_limit, **extra):
+    """
+    Llave estable de un escenario.
+
+    Los ponderadores se ordenan por nombre, así que el orden del diccionario no cambia la
+    llave. `extra` permite distinguir otros parámetros (p. ej. el método de normalización).
+    """
+    payload = {
+        'data': data_hash,
+        'weights': {name: float(value) for name, value in weights.items()},
+        'presupuesto': float(presupuesto),
+        'upper_limit': float(upper_limit),
+        'lower_limit': float(lower_limit),
+        **extra,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Caché LRU de tamaño acotado con contadores de aciertos y fallos.
+
+    Los valores se comparten entre sesiones: quien los lea no debe modificarlos.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_or_compute(self, key, compute):
+        """Regresa el valor memorizado para `key` o lo calcula con `compute()` y lo guarda."""
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+
+        # el cálculo se hace fuera del candado para no bloquear otras sesiones
+        value = compute()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Aciertos, fallos, tasa de aciertos y ocupación del caché."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+        }
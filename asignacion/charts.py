@@ -0,0 +1,274 @@
+"""
+Gráficos Plotly de los resultados de asignación.
+
+Módulo separado del motor para que el cálculo pueda usarse sin Plotly. Con más de
+`MAX_BARRAS` filas (p. ej. un archivo municipal) las gráficas de barras se dibujan con los
+totales por Entidad, no con una barra por fila.
+"""
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+# filas a partir de las cuales las barras se agregan por Entidad Federativa
+MAX_BARRAS = 32
+
+# montos que se suman al agregar por Entidad
+MONTOS = ['Asignacion_2025', 'Asignacion_2026', 'Asignacion_ajustada']
+
+
+def by_state(df_results, max_bars=MAX_BARRAS):
+    """
+    `df_results` si tiene a lo más `max_bars` filas; si no, los montos sumados por
+    Entidad Federativa con `Var%` recalculada sobre los totales.
+    """
+    if len(df_results) <= max_bars:
+        return df_results
+    montos = [column for column in MONTOS if column in df_results]
+    total = df_results.groupby('Entidad_Federativa', sort=False, as_index=False)[montos].sum()
+    total['Var%'] = total['Asignacion_2026'] / total['Asignacion_2025'] - 1
+    return total
+
+
+def allocation_bar(df_results, title="Asignación de Fondos 2026 (Según Ponderadores Aplicados)"):
+    """Gráfico de barras de asignación de fondos 2026 (sin bandas)."""
+    df_results = by_state(df_results)
+    fig = px.bar(
+        df_results,
+        x='Entidad_Federativa',
+        y='Asignacion_2026',
+        text='Asignacion_2026',
+        title=title,
+        template='ggplot2',
+        hover_data={
+            'Entidad_Federativa':False,
+            'Asignacion_2026':':$,.2f', # customize hover for column of y attribute
+            'Var%':':.2%',
+            },
+        labels={
+            'Entidad_Federativa':'Entidad Federativa',
+            'Asignacion_2026':'Asignación 2026',
+            'Var%':'Variación',
+            },
+    )
+
+    fig.update_traces(
+        textposition='outside',
+        marker_color='#235b4e',
+        opacity=0.9,
+        marker_line_color='#6f7271',
+        marker_line_width=1.2,
+        texttemplate='$%{text:,.2f}',
+        textfont_size=20,
+        )
+
+    fig.update_layout(
+        uniformtext_minsize=8, uniformtext_mode='hide',
+        hovermode="x unified",
+        autosize=True,
+        height=600,
+        xaxis_title='',
+        yaxis_title='Asignacion 2026',
+        hoverlabel=dict(
+            bgcolor="#fff",
+            font_size=16,
+            font_family="Noto Sans",
+            )
+        )
+
+    fig.update_xaxes(
+        showgrid=True,
+        title_font=dict(size=18, family='Noto Sans', color='#691c32'),  # X-axis title font size
+        tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),  # X-axis tick label font size
+        tickangle=-75,
+        )
+
+    fig.update_yaxes(
+        tickprefix="$",
+        tickformat=',.0f',
+        showgrid=True,
+        title_font=dict(size=16, family='Noto Sans', color='#28282b'),
+        tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),
+        tickangle=0,
+        )
+
+    return fig
+
+
+def variation_bar(df_results):
+    """Gráfico de barras de variación de la asignación respecto al ejercicio anterior."""
+    df_results = by_state(df_results)
+    # create positive and negative colors using if and list comprehension
+    var_color = ['#235b4e' if v > 0 else '#9f2241' for v in df_results['Var%']]
+
+    fig_var = px.bar(
+        df_results,
+        x='Entidad_Federativa',
+        y='Var%',
+        text='Var%',
+        title=f"Variación en la Asignación de Fondos con respecto al Ejercicio Anterior",
+        template='ggplot2',
+        hover_data={
+            'Entidad_Federativa':False,
+            'Var%':':.2%',
+            },
+        labels={
+            'Entidad_Federativa':'Entidad Federativa',
+            'Var%':'Variación',
+            },
+    )
+
+    fig_var.update_traces(
+        textposition='outside',
+        marker_color=var_color,
+        opacity=0.9,
+        marker_line_color='#6f7271',
+        marker_line_width=1.2,
+        texttemplate='%{text:.2%}',
+        textfont_size=20,
+        )
+
+    fig_var.update_layout(
+        uniformtext_minsize=8, uniformtext_mode='hide',
+        hovermode="x unified",
+        autosize=True,
+        height=600,
+        xaxis_title='',
+        yaxis_title='Variación %',
+        hoverlabel=dict(
+            bgcolor="#fff",
+            font_size=16,
+            font_family="Noto Sans",
+            )
+        )
+
+    fig_var.update_xaxes(
+        showgrid=True,
+        title_font=dict(size=18, family='Noto Sans', color='#bc955c'),  # X-axis title font size
+        tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),  # X-axis tick label font size
+        tickangle=-75,
+    )
+
+    fig_var.update_yaxes(
+        tickformat='.0%',
+        showgrid=True,
+        title_font=dict(size=16, family='Noto Sans', color='#28282b'),
+        tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),
+        tickangle=0,
+        )
+
+    return fig_var
+
+
+def reallocation_bar(df_results,
+                     title="Reasignación de Fondos por Entidad Federativa después de Remanente de la banda de control"):
+    """Gráfico de barras agrupadas de la asignación ajustada 2026 contra el ejercicio 2025."""
+    df_results = by_state(df_results)
+    fig2 = go.Figure(data=[
+        go.Bar(name='Ejercicio 2025',
+            x=df_results['Entidad_Federativa'],
+            y=df_results['Asignacion_2025'],
+            marker_color='#bc955c',
+            ),
+        go.Bar(name='Ejercicio 2026',
+            x=df_results['Entidad_Federativa'],
+            y=df_results['Asignacion_ajustada'],
+            marker_color='#691c32',
+            ),
+        ])
+
+    # Update layout to group bars
+    fig2.update_traces(
+        textposition='outside',
+        opacity=0.9,
+        marker_line_color='#6f7271',
+        marker_line_width=1.2,
+        texttemplate='$%{text:,.2f}',
+        textfont_size=20,
+        )
+
+    fig2.update_layout(
+        barmode='group',
+        title=title,
+        template='ggplot2',
+        uniformtext_minsize=8, uniformtext_mode='hide',
+        hovermode="x unified",
+        autosize=True,
+        height=600,
+        xaxis_title='',
+        yaxis_title='Asignacion 2026',
+        hoverlabel=dict(
+            bgcolor="#fff",
+            font_size=16,
+            font_family="Noto Sans",
+            )
+        )
+
+    fig2.update_xaxes(
+        showgrid=True,
+        title_font=dict(size=18, family='Noto Sans', color='#691c32'),  # X-axis title font size
+        tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),  # X-axis tick label font size
+        tickangle=-75,
+        )
+
+    fig2.update_yaxes(
+        tickprefix="$",
+        tickformat=',.0f',
+        showgrid=True,
+        title_font=dict(size=16, family='Noto Sans', color='#28282b'),
+        tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),
+        tickangle=0,
+        )
+
+    return fig2
+
+
+def simulation_range(resumen, low='P5', high='P95', title="Rango de Asignación Simulada por Entidad Federativa"):
+    """Mediana simulada con barras de error entre los percentiles `low` y `high`."""
+    fig3 = go.Figure(data=[
+        go.Scatter(
+            name='Mediana',
+            x=resumen['Entidad_Federativa'],
+            y=resumen['P50'],
+            mode='markers',
+            marker=dict(color='#691c32', size=10),
+            error_y=dict(
+                type='data',
+                symmetric=False,
+                array=resumen[high] - resumen['P50'],
+                arrayminus=resumen['P50'] - resumen[low],
+                color='#bc955c',
+                thickness=2,
+                ),
+            ),
+        ])
+
+    fig3.update_layout(
+        title=title,
+        template='ggplot2',
+        hovermode="x unified",
+        autosize=True,
+        height=600,
+        xaxis_title='',
+        yaxis_title='Asignacion ajustada',
+        hoverlabel=dict(
+            bgcolor="#fff",
+            font_size=16,
+            font_family="Noto Sans",
+            )
+        )
+
+    fig3.update_xaxes(
+        showgrid=True,
+        tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),
+        tickangle=-75,
+        )
+
+    fig3.update_yaxes(
+        tickprefix="$",
+        tickformat=',.0f',
+        showgrid=True,
+        title_font=dict(size=16, family='Noto Sans', color='#28282b'),
+        tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),
+        )
+
+    return fig3
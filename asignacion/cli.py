@@ -0,0 +1,156 @@
+"""
+Cálculo de asignación sin interfaz (cron, CI).
+
+Lee el mismo csv que aceptan las apps y un archivo de configuración JSON con los
+ponderadores y las bandas, ejecuta `run_allocation` y escribe el resultado en Parquet,
+CSV o XLSX según la extensión de la salida. Solo depende de numpy y pandas (y de
+pyarrow/openpyxl para Parquet/XLSX); no importa streamlit, plotly, great_tables ni PIL.
+
+Uso::
+
+    python -m asignacion datos.csv config.json -o resultado.parquet
+
+Configuración (las llaves omitidas toman el valor del fondo)::
+
+    {
+        "fondo": "fasp",
+        "presupuesto": 9840407024.0,
+        "upper_limit": 0.03,
+        "lower_limit": 0.08,
+        "weights": {"Pob": 0.075, "Var_inc_del": 0.21, "Monto base": 0.015, ...},
+        "normalization": {"Pob": "rank"},
+        "centavos": false
+    }
+
+`centavos` (o la opción `--centavos`) redondea la asignación ajustada a centavos enteros;
+por omisión es `false`, igual que `run_allocation` y la app con el interruptor apagado.
+La extensión de la salida y las columnas del csv se revisan antes de calcular.
+
+Con un archivo municipal se agregan las llaves de la banda municipal y la asignación es
+jerárquica (banda estatal sobre los totales por Entidad y banda municipal dentro de cada
+Entidad); el resumen por Entidad se escribe junto a la salida como `<salida>_estatal`::
+
+    {..., "municipal_upper": 0.15, "municipal_lower": 0.15, "state_column": "Entidad_Federativa"}
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from .batch import weight_keys
+from .engine import FASP_MIN_MAX_VARIABLE_MAP, FASP_VARIABLE_MAP, FOFISP_VARIABLE_MAP, run_allocation
+from .hierarchy import allocate_hierarchical
+
+
+# metodología, indicadores y bandas por omisión de cada fondo
+FONDOS = {
+    'fasp': {'method': 'proportion', 'variable_map': FASP_VARIABLE_MAP, 'upper_limit': 0.03, 'lower_limit': 0.08},
+    'fasp-min-max': {'method': 'min_max', 'variable_map': FASP_MIN_MAX_VARIABLE_MAP,
+                     'upper_limit': 0.1, 'lower_limit': 0.1},
+    'fofisp': {'method': 'min_max', 'variable_map': FOFISP_VARIABLE_MAP, 'upper_limit': 0.1, 'lower_limit': 0.1},
+}
+
+FORMATOS = ('.parquet', '.csv', '.xlsx')
+
+
+def load_config(path):
+    """Lee la configuración JSON y completa los valores por omisión del fondo."""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+
+    fondo = config.get('fondo', 'fasp')
+    if fondo not in FONDOS:
+        raise ValueError(f"El fondo debe ser uno de: {', '.join(FONDOS)}")
+    config = {**FONDOS[fondo], 'normalization': None, 'centavos': False, 'state_column': 'Entidad_Federativa',
+              **config}
+    if ('municipal_upper' in config) != ('municipal_lower' in config):
+        raise ValueError("La banda municipal requiere 'municipal_upper' y 'municipal_lower'")
+
+    for key in ('presupuesto', 'weights'):
+        if key not in config:
+            raise ValueError(f"Falta '{key}' en la configuración")
+    faltantes = [key for key in weight_keys(config['variable_map'], config['method']) if key not in config['weights']]
+    if faltantes:
+        raise ValueError(f"Faltan ponderadores: {', '.join(faltantes)}")
+
+    return config
+
+
+def check_columns(data, config):
+    """Revisa que el csv tenga la Entidad, los indicadores del fondo y `Asignacion_2025`."""
+    required = [config['state_column'], *config['variable_map'], 'Asignacion_2025']
+    faltantes = [column for column in required if column not in data.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el csv: {', '.join(faltantes)}")
+
+
+def result_columns(df):
+    """Columnas de resultado: montos por indicador, banda, remanente y asignación ajustada."""
+    columns = ['Entidad_Federativa', 'Municipio', 'Asignacion_2025']
+    columns += [column for column in df.columns if column.startswith('Monto_')]
+    columns += ['Asignacion_2026', 'Var%', 'Min', 'Max', 'Superavit', 'Deficit', 'Reasignacion',
+                'Asignacion_estatal', 'Asignacion_ajustada', 'Asignacion_centavos', 'Reparto_neto', 'Var%_ajustada']
+    return [column for column in columns if column in df.columns]
+
+
+def write_result(df, path):
+    """Escribe `df` en Parquet, CSV o XLSX según la extensión de `path`."""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.parquet':
+        df.to_parquet(path, index=False)
+    elif suffix == '.csv':
+        df.to_csv(path, index=False)
+    elif suffix == '.xlsx':
+        df.to_excel(path, index=False)
+    else:
+        raise ValueError(f"La salida debe tener extensión {', '.join(FORMATOS)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m asignacion',
+                                     description='Cálculo de asignación FASP/FOFISP sin interfaz.')
+    parser.add_argument('datos', help='csv de entrada (el mismo que se sube a la app)')
+    parser.add_argument('config', help='configuración JSON con ponderadores y bandas')
+    parser.add_argument('-o', '--salida', required=True, help=f"archivo de salida ({', '.join(FORMATOS)})")
+    parser.add_argument('--todas', action='store_true', help='escribir todas las columnas intermedias')
+    parser.add_argument('--centavos', action='store_true', default=None,
+                        help='asignación en centavos enteros (por omisión, la llave "centavos" de la configuración)')
+    args = parser.parse_args(argv)
+
+    try:
+        # la extensión y las columnas se revisan antes de calcular
+        if Path(args.salida).suffix.lower() not in FORMATOS:
+            raise ValueError(f"La salida debe tener extensión {', '.join(FORMATOS)}")
+        config = load_config(args.config)
+        if args.centavos is not None:
+            config['centavos'] = args.centavos
+        data = pd.read_csv(args.datos)
+        check_columns(data, config)
+        if 'municipal_upper' in config:
+            results = allocate_hierarchical(
+                data, config['weights'], config['presupuesto'], config['upper_limit'], config['lower_limit'],
+                config['municipal_upper'], config['municipal_lower'], variable_map=config['variable_map'],
+                method=config['method'], normalization=config['normalization'],
+                state_column=config['state_column'], centavos=config['centavos'],
+            )
+            df = results.municipal
+            salida = Path(args.salida)
+            write_result(results.estatal, salida.with_name(f'{salida.stem}_estatal{salida.suffix}'))
+        else:
+            df = run_allocation(data, config['weights'], config['presupuesto'], config['upper_limit'],
+                                config['lower_limit'], variable_map=config['variable_map'], method=config['method'],
+                                normalization=config['normalization'], centavos=config['centavos'])
+        write_result(df if args.todas else df[result_columns(df)], args.salida)
+    except (OSError, ValueError, KeyError) as error:
+        print(f'error: {error}', file=sys.stderr)
+        return 1
+
+    bandas = df.attrs['bandas']
+    if not bandas['factible']:
+        print('aviso: el presupuesto no cabe en la banda de control; las asignaciones se escalaron '
+              'por el mismo factor', file=sys.stderr)
+    total = df['Asignacion_centavos'].sum() / 100 if 'Asignacion_centavos' in df else df['Asignacion_ajustada'].sum()
+    print(f'{len(df)} filas, total asignado ${total:,.2f} -> {args.salida}')
+    return 0
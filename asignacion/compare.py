@@ -0,0 +1,108 @@
+"""
+Comparación de metodologías y normalizadores sobre el mismo archivo.
+
+`evaluate_normalizers` calcula en una sola pasada la asignación con cada normalizador
+registrado (mismos ponderadores, presupuesto y bandas): las puntuaciones se apilan en un
+arreglo (M x n x k), la asignación es un solo producto matricial y las bandas se
+resuelven por lote. `compare_allocations` arma las diferencias por Entidad, los cambios
+de rango y la distancia L1 entre cualquier conjunto de asignaciones.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .bands import solve_bands
+from .engine import FASP_VARIABLE_MAP, indicator_matrix, shifted_index
+from .normalizers import NORMALIZERS, SHARE_NORMALIZERS, get_normalizer, to_shares
+
+
+class NormalizerResults(NamedTuple):
+    """Resultados apilados por normalizador, cada arreglo con forma (M, n_entidades)."""
+    metodos: tuple
+    entidades: np.ndarray
+    asignacion: np.ndarray
+    asignacion_ajustada: np.ndarray
+    factible: np.ndarray
+
+
+def evaluate_normalizers(data, weights, presupuesto, upper_limit, lower_limit,
+                         variable_map=FASP_VARIABLE_MAP, method='proportion', normalizers=None):
+    """
+    Asignación antes y después de bandas con cada normalizador de `normalizers`
+    (por omisión todos los registrados), aplicado a todos los indicadores.
+
+    `method` es la metodología de `run_allocation`: 'proportion' (participaciones y
+    reparto proporcional del remanente) o 'min_max' (índice re-escalado con corrimiento
+    y reparto igualitario). Cada fila coincide con `run_allocation(..., normalization=m)`.
+    """
+    metodos = tuple(NORMALIZERS) if normalizers is None else tuple(normalizers)
+    variables = list(variable_map)
+    X, negative = indicator_matrix(data, variable_map)
+    w = np.array([weights[var_name] for var_name in variables])
+
+    # puntuaciones de todos los normalizadores apiladas: (M x n x k)
+    scores = np.stack([get_normalizer(name)(X, negative) for name in metodos])
+
+    if method == 'proportion':
+        no_shares = np.array([name not in SHARE_NORMALIZERS for name in metodos])
+        scores[no_shares] = to_shares(scores[no_shares])
+        asignacion = (scores @ w + weights['Monto base'] / len(data)) * presupuesto
+        redistribution = 'proportional'
+    elif method == 'min_max':
+        _, corrimiento = shifted_index(scores @ w)
+        asignacion = corrimiento / corrimiento.sum(axis=-1, keepdims=True) * presupuesto
+        redistribution = 'equal'
+    else:
+        raise ValueError("El método debe ser 'proportion' o 'min_max'")
+
+    asignacion_2025 = data['Asignacion_2025'].to_numpy(dtype=float)
+    solution = solve_bands(asignacion, asignacion_2025 * (1 - lower_limit), asignacion_2025 * (1 + upper_limit),
+                           redistribution=redistribution)
+
+    return NormalizerResults(
+        metodos=metodos,
+        entidades=data['Entidad_Federativa'].to_numpy(),
+        asignacion=asignacion,
+        asignacion_ajustada=solution.asignacion,
+        factible=solution.factible,
+    )
+
+
+def allocation_ranks(asignaciones):
+    """Rango de cada Entidad por asignación sobre el último eje (1 = mayor asignación)."""
+    order = np.argsort(-np.asarray(asignaciones), axis=-1, kind='stable')
+    ranks = np.empty(order.shape, dtype=int)
+    np.put_along_axis(ranks, order, np.arange(1, order.shape[-1] + 1), axis=-1)
+    return ranks
+
+
+def compare_allocations(entidades, asignaciones, reference=None):
+    """
+    Compara asignaciones {nombre: arreglo (n,)} contra la de `reference` (por omisión la
+    primera).
+
+    Regresa `(tabla, distancias)`: la tabla tiene, por Entidad, la asignación de cada
+    nombre, su diferencia contra la referencia, su rango y el cambio de rango (positivo =
+    sube de lugar); `distancias` es la matriz de distancias L1 entre asignaciones.
+    """
+    nombres = list(asignaciones)
+    reference = nombres[0] if reference is None else reference
+    matriz = np.stack([np.asarray(asignaciones[nombre], dtype=float) for nombre in nombres])
+    ranks = allocation_ranks(matriz)
+    ref = nombres.index(reference)
+
+    columns = {'Entidad_Federativa': entidades}
+    for i, nombre in enumerate(nombres):
+        columns[f'Asignacion_ajustada ({nombre})'] = matriz[i]
+        if i != ref:
+            columns[f'Diferencia ({nombre})'] = matriz[i] - matriz[ref]
+        columns[f'Rango ({nombre})'] = ranks[i]
+        if i != ref:
+            columns[f'Cambio de rango ({nombre})'] = ranks[ref] - ranks[i]
+
+    # distancia L1 entre todos los pares: sum(|a - b|)
+    distancias = np.abs(matriz[:, None, :] - matriz[None, :, :]).sum(axis=-1)
+
+    return (pd.DataFrame(columns),
+            pd.DataFrame(distancias, index=nombres, columns=nombres))
@@ -0,0 +1,63 @@
+"""
+Diagnóstico de tiempos de importación.
+
+Las apps importan las bibliotecas pesadas (plotly, great_tables) con `lazy_import` hasta
+el momento de usarlas, de modo que la pantalla de password y la de carga de archivo no
+las esperan. Streamlit re-ejecuta el script en cada interacción, pero los módulos quedan
+en `sys.modules`: solo la primera importación cuesta y es la que se registra.
+`importtime_profile` mide un árbol de importación completo con `python -X importtime`.
+"""
+import importlib
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+
+# segundos de la primera importación de cada módulo en este proceso
+IMPORT_TIMES = {}
+
+
+def lazy_import(name):
+    """Importa el módulo `name` y registra cuánto tardó (0 si ya estaba importado)."""
+    if name in sys.modules:
+        IMPORT_TIMES.setdefault(name, 0.0)
+        return sys.modules[name]
+
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
+
+
+def import_times():
+    """Tabla de los módulos cargados con `lazy_import` y el tiempo de su primera importación."""
+    return pd.DataFrame({
+        'Módulo': list(IMPORT_TIMES),
+        'Milisegundos': [seconds * 1000 for seconds in IMPORT_TIMES.values()],
+    })
+
+
+def importtime_profile(modules, depth=1):
+    """
+    Perfil de importación en frío de `modules` con `python -X importtime` en un proceso
+    aparte: tiempo propio y acumulado (ms) de cada paquete hasta `depth` niveles de
+    anidamiento, ordenado por tiempo acumulado.
+    """
+    code = '; '.join(f'import {name}' for name in modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, check=True)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, package = line[len('import time:'):].split('|')
+        # la profundidad es la sangría del nombre (dos espacios por nivel)
+        level = (len(package) - len(package.lstrip()) - 1) // 2
+        if level < depth:
+            rows.append({'Módulo': package.strip(), 'Propio (ms)': int(own) / 1000,
+                         'Acumulado (ms)': int(cumulative) / 1000})
+
+    return pd.DataFrame(rows).sort_values('Acumulado (ms)', ascending=False, ignore_index=True)
@@ -0,0 +1,370 @@
+"""
+Motor de cálculo para la asignación de fondos.
+
+Funciones puras (sin Streamlit) para normalizar los indicadores, calcular la
+asignación bruta por Entidad Federativa y aplicar la banda de control con el
+rebalanceo del remanente.
+"""
+import numpy as np
+import pandas as pd
+
+from .bands import solve_bands
+from .normalizers import min_max_matrix, normalize_matrix, resolve_methods
+from .rounding import largest_remainder
+
+
+# Dirección de cada indicador FASP: 'positive' (Alto=Bueno) o 'negative' (Alto=Malo)
+FASP_VARIABLE_MAP = {
+    'Pob': 'positive', 'Tasa_policial': 'positive', 'Profesionalizacion': 'positive',
+    'Ctrl_conf': 'positive', 'Disp_camaras': 'positive', 'Disp_lectores_veh': 'positive',
+    'Cump_presup': 'positive', 'Servs_forenses': 'positive', 'Eficiencia_procesal': 'positive',
+    'Var_inc_del': 'positive', 'Dig_salarial': 'positive',
+    'Tasa_abandono_llamadas': 'negative', 'Sobrepob_penitenciaria': 'negative',
+    'Proc_justicia': 'negative',
+}
+
+# Indicadores FOFISP
+FOFISP_VARIABLE_MAP = {
+    'Población': 'positive', 'Tasa_policial': 'positive', 'Academias': 'positive',
+    'Var_incidencia_del': 'negative',
+}
+
+# En la metodología Min-Max de FASP la variación de incidencia delictiva es Alto=Malo
+FASP_MIN_MAX_VARIABLE_MAP = {**FASP_VARIABLE_MAP, 'Var_inc_del': 'negative'}
+
+
+def direct_proportion_normalize(series, direction='positive'):
+    """
+    Normaliza una serie de datos usando el método de Proporción Directa (Normalización a la Suma).
+    Implementa un 'shift' para evitar valores negativos en la serie.
+    Si la dirección es 'negative', se usa Proporción Inversa Normalizada sobre la serie shiftada.
+    """
+
+    # 1. SHIFTING: Asegurar que el valor mínimo de la serie sea 0 o positivo.
+    min_val = series.min()
+    if min_val < 0:
+        # Sumar el valor absoluto del mínimo a toda la serie.
+        shifted_series = series + abs(min_val)
+    else:
+        # No se necesita shift si el mínimo es 0 o positivo.
+        shifted_series = series
+
+    total_sum = shifted_series.sum()
+
+    if total_sum == 0:
+        # Caso extremo: si todos los valores son iguales a cero después del shift (o eran idénticos antes).
+        return pd.Series(1.0 / len(shifted_series), index=shifted_series.index)
+
+    if direction == 'positive':
+        # Alto=Bueno
+        return shifted_series / total_sum
+
+    elif direction == 'negative':
+        # Alto=Malo: Proporción Inversa Normalizada.
+        # Se aplica un pequeño "epsilon" para evitar división por cero si la serie shiftada tiene ceros.
+        epsilon = 1e-6
+        safe_inverse_series = 1 / (shifted_series + epsilon)
+
+        # Normalizar la inversa a la suma (esta es la proporción a asignar).
+        return safe_inverse_series / safe_inverse_series.sum()
+
+    else:
+        raise ValueError("La dirección debe ser 'positive' o 'negative'")
+
+
+def min_max_normalize(series, direction='positive'):
+    """
+    Normaliza una serie de datos entre 0 y 1 usando el método Min-Max.
+    Si la dirección es 'negative', se invierte (Alto = Malo se convierte en Alto = Bueno).
+    """
+    min_val = series.min()
+    max_val = series.max()
+
+    if max_val == min_val:
+        return pd.Series(0.5, index=series.index) # Retorna 0.5 si todos los valores son iguales
+
+    if direction == 'positive':
+        # (X - Min) / (Max - Min) -> Un valor más alto resulta en una puntuación más alta
+        return (series - min_val) / (max_val - min_val)
+    elif direction == 'negative':
+        # (Max - X) / (Max - Min) -> Un valor más bajo (mejor) resulta en una puntuación más alta
+        return (max_val - series) / (max_val - min_val)
+    else:
+        raise ValueError("La dirección debe ser 'positive' o 'negative'")
+
+
+def indicator_matrix(df, variable_map=FASP_VARIABLE_MAP):
+    """
+    Extrae el bloque de indicadores como matriz (n_entidades x n_indicadores)
+    junto con la máscara de dirección (True = 'negative', Alto=Malo).
+    """
+    X = df[list(variable_map)].to_numpy(dtype=float)
+    negative = np.array([direction == 'negative' for direction in variable_map.values()])
+    return X, negative
+
+
+def calculate_index(df, weights, presupuesto, variable_map=FASP_VARIABLE_MAP, vectorized=True,
+                    normalization=None):
+    """
+    Calcula la Asignación de Fondo Ponderada (Reparto Directo) y la contribución monetaria por variable.
+
+    No modifica `df`; regresa una copia con las columnas `<var>_prop`, `Monto_<var>`,
+    `Monto_Base`, `Asignacion_Bruta` y `Reparto`.
+
+    Con `vectorized=True` todo el bloque de indicadores se normaliza como una sola matriz
+    y la asignación bruta es un producto matriz-vector de ponderadores; con `False` se
+    normaliza columna por columna con `direct_proportion_normalize`.
+
+    `normalization` elige el normalizador por indicador (ver `resolve_methods`); por omisión
+    es 'proportion'. Las puntuaciones de métodos que no son de participación se convierten
+    en participación antes de asignar los montos.
+    """
+    methods = resolve_methods(list(variable_map), normalization, 'proportion')
+    if vectorized:
+        return _calculate_index_matrix(df, weights, presupuesto, variable_map, methods)
+    if set(methods) != {'proportion'}:
+        raise ValueError("El cálculo por columnas sólo admite la normalización 'proportion'")
+
+    df = df.copy()
+
+    # Diccionario para almacenar las contribuciones monetarias de cada variable
+    contributions = {}
+
+    for var_name, direction in variable_map.items():
+        # 1. Normalización
+        df[f'{var_name}_prop'] = direct_proportion_normalize(df[var_name], direction=direction)
+
+        # 2. Cálculo de la Contribución Monetaria Ponderada
+        # (Proporción * Peso de la variable * Fondo)
+        contributions[f'Monto_{var_name}'] = df[f'{var_name}_prop'] * weights[var_name] * presupuesto
+
+    # --- Cálculo del Monto Base ---
+    w_base_amount = presupuesto * weights['Monto base']
+    base_share = w_base_amount / len(df)
+
+    # sumamos el monto base constante para cada fila
+    contributions['Monto_Base'] = pd.Series(base_share, index=df.index)
+
+    # --- Cálculo de la Asignación Bruta y Reparto Final ---
+    # Sumar todas las contribuciones (Series de variables + Serie de Monto Base), fila por fila.
+    df['Asignacion_Bruta'] = sum(contributions.values())
+
+    # Combinar todas las contribuciones (Monto_X) con el DF principal
+    df = pd.concat([df, pd.DataFrame(contributions)], axis=1)
+
+    # Para el remanente se necesita una columna que sume 1.00 y represente el reparto
+    df['Reparto'] = df['Asignacion_Bruta'] / df['Asignacion_Bruta'].sum()
+
+    return df
+
+
+def _calculate_index_matrix(df, weights, presupuesto, variable_map, methods):
+    """Versión matricial de `calculate_index`: mismas columnas, un solo `concat`."""
+    variables = list(variable_map)
+    X, negative = indicator_matrix(df, variable_map)
+
+    # proporciones (n x k) y montos por indicador
+    props = normalize_matrix(X, negative, methods, shares=True)
+    w = np.array([weights[var_name] for var_name in variables]) * presupuesto
+    montos = props * w
+
+    # monto base constante y asignación bruta (producto matriz-vector)
+    base_share = presupuesto * weights['Monto base'] / len(df)
+    bruta = props @ w + base_share
+
+    columns = {f'{var_name}_prop': props[:, j] for j, var_name in enumerate(variables)}
+    columns['Asignacion_Bruta'] = bruta
+    columns.update({f'Monto_{var_name}': montos[:, j] for j, var_name in enumerate(variables)})
+    columns['Monto_Base'] = np.full(len(df), base_share)
+    columns['Reparto'] = bruta / bruta.sum()
+
+    return pd.concat([df, pd.DataFrame(columns, index=df.index)], axis=1)
+
+
+def shifted_index(indice, epsilon=0.01):
+    """
+    Re-escala el índice (..., n_entidades) a [0, 1] con Min-Max y aplica el corrimiento
+    `epsilon`. Regresa ambos arreglos: índice re-escalado e índice con corrimiento.
+    """
+    indice_final = min_max_matrix(indice[..., None], False)[..., 0]
+    return indice_final, (indice_final * (1 - epsilon)) + epsilon
+
+
+def calculate_normalized_index(df, weights, presupuesto, variable_map=FOFISP_VARIABLE_MAP, epsilon=0.01,
+                               normalization=None):
+    """
+    Calcula el Índice Compuesto Normalizado (Min-Max) y reparte el presupuesto según el índice.
+
+    El índice ponderado se re-escala a [0, 1] y se le aplica un corrimiento `epsilon`
+    para evitar participaciones nulas. `normalization` elige el normalizador por
+    indicador (por omisión 'min_max'). No modifica `df`.
+    """
+    variables = list(variable_map)
+    X, negative = indicator_matrix(df, variable_map)
+
+    # 1. Normalización de Variables
+    scores = normalize_matrix(X, negative, resolve_methods(variables, normalization, 'min_max'))
+
+    # 2. Aplicación de Ponderadores
+    indice = scores @ np.array([weights[var_name] for var_name in variables])
+
+    # El índice final también se normaliza a un rango de 0 a 1 para asegurar comparabilidad
+    indice_final, corrimiento = shifted_index(indice, epsilon)
+
+    # 3. Participación de cada Entidad en el índice total y monto asignado
+    columns = {f'{var_name}_norm': scores[:, j] for j, var_name in enumerate(variables)}
+    columns['Indice Normalizado'] = indice
+    columns['Indice Final (0-1)'] = indice_final
+    columns['Indice Final (Corrimiento)'] = corrimiento
+    columns['Reparto'] = corrimiento / corrimiento.sum()
+    columns['Asignacion_2026'] = columns['Reparto'] * presupuesto
+
+    return pd.concat([df, pd.DataFrame(columns, index=df.index)], axis=1)
+
+
+def band_diagnostics(asignacion, minimo, maximo):
+    """
+    Posición de cada Entidad respecto a la banda antes del ajuste, sobre arreglos (..., n).
+
+    `Superavit` es lo que rebasa `maximo`, `Deficit` lo que falta para `minimo`,
+    `Reasignacion` la asignación recortada a la banda y `Elegibles` marca las Entidades
+    que pueden recibir remanente (por debajo de `maximo`).
+    """
+    reasignacion = np.clip(asignacion, minimo, maximo)
+    return {
+        'Superavit': np.where(asignacion > maximo, asignacion - maximo, 0),
+        'Deficit': np.where(asignacion < minimo, minimo - asignacion, 0),
+        'Reasignacion': reasignacion,
+        'Elegibles': (reasignacion < maximo).astype(int),
+    }
+
+
+def band_columns(asignacion, asignacion_2025, upper_limit, lower_limit, redistribution='proportional',
+                 method='closed', centavos=False, reparto=None):
+    """
+    Etapa de bandas sobre arreglos: regresa `(columnas, resumen)`, las columnas que
+    `apply_bands` agrega (en orden) y el resumen del solver para `df.attrs['bandas']`.
+    `reparto` es la columna `Reparto` (base del remanente con `'proportional'`).
+    """
+    minimo = asignacion_2025 * (1 - lower_limit)
+    maximo = asignacion_2025 * (1 + upper_limit)
+
+    # Calculate Allocation Band (Min and Max), superávit, déficit y recorte a la banda
+    columns = {'Min': minimo, 'Max': maximo, **band_diagnostics(asignacion, minimo, maximo)}
+    if redistribution == 'proportional':
+        # Use the raw assignment proportion as the basis for reallocation
+        columns['Base_Reparto'] = reparto
+
+    solution = solve_bands(asignacion, minimo, maximo, redistribution=redistribution, method=method)
+
+    # Final Adjusted Allocation, net reallocation and percentage change
+    ajustada = solution.asignacion
+    columns['Asignacion_ajustada'] = ajustada
+    if centavos:
+        columns['Asignacion_centavos'] = largest_remainder(ajustada, asignacion.sum(), minimo, maximo)
+        ajustada = columns['Asignacion_centavos'] / 100
+        columns['Asignacion_ajustada'] = ajustada
+    columns['Reparto_neto'] = ajustada - columns['Reasignacion']
+    columns['Var%_ajustada'] = (ajustada - asignacion_2025) / asignacion_2025
+
+    tol = 1e-9 * np.abs(asignacion).sum()
+    resumen = {
+        'factible': bool(solution.factible),
+        'en_banda': bool(((solution.asignacion >= minimo - tol) & (solution.asignacion <= maximo + tol)).all()),
+        'iteraciones': int(solution.iteraciones),
+        'segundos': solution.segundos,
+        'reparto': redistribution,
+        'nivel': float(solution.nivel),
+    }
+    return columns, resumen
+
+
+def apply_bands(df, upper_limit, lower_limit, redistribution='proportional', method='closed', centavos=False):
+    """
+    Aplica la banda de control respecto a `Asignacion_2025` y reparte el remanente.
+
+    El ajuste se resuelve con `solve_bands`: todas las Entidades quedan dentro de
+    [`Min`, `Max`] y la suma se conserva. Con `redistribution='proportional'` el remanente
+    sigue el `Reparto` original (se escala la asignación); con `'equal'` se suma el mismo
+    monto a cada Entidad no acotada. El resumen del solver (factibilidad, iteraciones y
+    tiempo) queda en `df.attrs['bandas']`.
+
+    Con `centavos=True` la asignación ajustada se redondea a centavos con residuos mayores
+    (`Asignacion_centavos`, int64) y su suma coincide exactamente con la asignación total.
+    """
+    df = df.copy()
+
+    columns, resumen = band_columns(
+        df['Asignacion_2026'].to_numpy(), df['Asignacion_2025'].to_numpy(dtype=float), upper_limit, lower_limit,
+        redistribution, method, centavos, reparto=df['Reparto'].to_numpy() if 'Reparto' in df else None,
+    )
+    for column, values in columns.items():
+        df[column] = values
+    df.attrs['bandas'] = resumen
+
+    return df
+
+
+def band_summary(df):
+    """Resumen de superávit, déficit y remanente de un resultado con bandas."""
+    total_superavit = df['Superavit'].sum()
+    total_deficit = df['Deficit'].sum()
+
+    return pd.DataFrame([
+        {'Concepto': 'Superávit total', 'Importe': total_superavit},
+        {'Concepto': 'Déficit total', 'Importe': total_deficit},
+        {'Concepto': 'Remanente', 'Importe': total_superavit - total_deficit},
+    ])
+
+
+def band_adjustment(df, atol=0.01):
+    """
+    Ajuste de la banda por Entidad: asignación bruta, ajustada, diferencia (`Ajuste`) y el
+    extremo de la banda en el que quedó (`Tope`: 'Max', 'Min' o '' si quedó libre, es decir
+    en `clip(a + t * s)` con el nivel común `t` de `df.attrs['bandas']`).
+    """
+    ajustada = df['Asignacion_ajustada'].to_numpy()
+    tope = np.select([np.isclose(ajustada, df['Max'], rtol=0, atol=atol),
+                      np.isclose(ajustada, df['Min'], rtol=0, atol=atol)], ['Max', 'Min'], '')
+    return pd.DataFrame({
+        'Entidad_Federativa': df['Entidad_Federativa'],
+        'Asignacion_2025': df['Asignacion_2025'],
+        'Asignacion_2026': df['Asignacion_2026'],
+        'Asignacion_ajustada': ajustada,
+        'Ajuste': ajustada - df['Asignacion_2026'].to_numpy(),
+        'Tope': tope,
+        'Var%_ajustada': df['Var%_ajustada'],
+    })
+
+
+def run_allocation(data, weights, presupuesto, upper_limit, lower_limit,
+                   variable_map=FASP_VARIABLE_MAP, method='proportion', normalization=None, centavos=False):
+    """
+    Ejecuta el cálculo completo: asignación, variación contra 2025 y bandas.
+
+    `data` es el DataFrame del archivo de entrada (una fila por Entidad Federativa)
+    y `weights` el diccionario de ponderadores.
+
+    - `method='proportion'` (FASP): Proporción Directa con 'Monto base'; el remanente
+      se reparte en proporción al reparto original.
+    - `method='min_max'` (FOFISP): Índice Normalizado Min-Max con corrimiento; el remanente
+      se reparte en partes iguales entre las Entidades elegibles.
+
+    `normalization` cambia el normalizador de cada indicador sin cambiar la metodología.
+    Con `centavos=True` la asignación ajustada se calcula en centavos enteros y suma
+    exactamente la asignación total.
+    """
+    if method == 'proportion':
+        df = calculate_index(data, weights, presupuesto, variable_map, normalization=normalization)
+        # El reparto ya está en la columna 'Asignacion_Bruta' (sin bandas)
+        df['Asignacion_2026'] = df['Asignacion_Bruta']
+        redistribution = 'proportional'
+    elif method == 'min_max':
+        df = calculate_normalized_index(data, weights, presupuesto, variable_map, normalization=normalization)
+        redistribution = 'equal'
+    else:
+        raise ValueError("El método debe ser 'proportion' o 'min_max'")
+
+    df['Var%'] = df['Asignacion_2026'] / df['Asignacion_2025'] - 1
+
+    return apply_bands(df, upper_limit, lower_limit, redistribution, centavos=centavos)
@@ -0,0 +1,129 @@
+"""
+Asignación jerárquica Entidad Federativa -> municipio.
+
+Con un archivo a nivel municipal (una fila por municipio, ~2,500 filas) la asignación
+bruta se calcula con el mismo motor sobre todos los municipios. Después se aplica la
+banda en dos niveles:
+
+1. Entidades: la bruta y la `Asignacion_2025` se suman por Entidad (`np.bincount`) y se
+   ajustan a la banda estatal conservando el presupuesto.
+2. Municipios: dentro de cada Entidad se reparte su total ajustado con la banda
+   municipal. Las Entidades se resuelven en un solo lote de `solve_bands` (Entidades x
+   municipios, rellenando con ceros las Entidades con menos municipios).
+"""
+import time
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .bands import solve_bands
+from .engine import (FASP_VARIABLE_MAP, band_columns, band_diagnostics, calculate_index,
+                     calculate_normalized_index)
+from .rounding import largest_remainder
+
+
+class HierarchicalResults(NamedTuple):
+    """Resultados por Entidad (banda estatal) y por municipio (banda municipal)."""
+    estatal: pd.DataFrame
+    municipal: pd.DataFrame
+
+
+def group_layout(codes, n_groups):
+    """
+    Acomodo de filas agrupadas por `codes` en un arreglo rellenado (n_grupos x máximo):
+    regresa `(order, fila, columna, ancho)` tales que `padded[fila, columna] = values[order]`.
+    """
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    fila = codes[order]
+    columna = np.arange(len(codes)) - starts[fila]
+    return order, fila, columna, int(counts.max())
+
+
+def allocate_hierarchical(data, weights, presupuesto, upper_limit, lower_limit, municipal_upper, municipal_lower,
+                          variable_map=FASP_VARIABLE_MAP, method='proportion', normalization=None,
+                          state_column='Entidad_Federativa', centavos=False):
+    """
+    Asignación con banda estatal (`upper_limit`/`lower_limit`) y banda municipal
+    (`municipal_upper`/`municipal_lower`) sobre un archivo municipal.
+
+    `data` tiene una fila por municipio con la columna `state_column`, los indicadores de
+    `variable_map` y `Asignacion_2025`. Con `centavos=True` los totales estatales y los
+    montos municipales se redondean a centavos y cuadran exactamente en ambos niveles.
+    """
+    start = time.perf_counter()
+
+    if method == 'proportion':
+        df = calculate_index(data, weights, presupuesto, variable_map, normalization=normalization)
+        df['Asignacion_2026'] = df['Asignacion_Bruta']
+        redistribution = 'proportional'
+    elif method == 'min_max':
+        df = calculate_normalized_index(data, weights, presupuesto, variable_map, normalization=normalization)
+        redistribution = 'equal'
+    else:
+        raise ValueError("El método debe ser 'proportion' o 'min_max'")
+
+    bruta = df['Asignacion_2026'].to_numpy()
+    anterior = df['Asignacion_2025'].to_numpy(dtype=float)
+    df['Var%'] = bruta / anterior - 1
+
+    # 1. banda estatal sobre los totales por Entidad
+    codes, estados = pd.factorize(df[state_column])
+    n_estados = len(estados)
+    bruta_estatal = np.bincount(codes, bruta, n_estados)
+    anterior_estatal = np.bincount(codes, anterior, n_estados)
+
+    columns, resumen = band_columns(bruta_estatal, anterior_estatal, upper_limit, lower_limit, redistribution,
+                                    centavos=centavos, reparto=bruta_estatal / bruta_estatal.sum())
+    estatal = pd.DataFrame({
+        state_column: estados,
+        'Municipios': np.bincount(codes, minlength=n_estados),
+        'Asignacion_2025': anterior_estatal,
+        'Asignacion_2026': bruta_estatal,
+        'Var%': bruta_estatal / anterior_estatal - 1,
+        **columns,
+    })
+    estatal.attrs['bandas'] = resumen
+    total_estatal = columns['Asignacion_ajustada']
+
+    # 2. banda municipal dentro de cada Entidad: un lote (Entidades x municipios)
+    order, fila, columna, ancho = group_layout(codes, n_estados)
+
+    def padded(values):
+        out = np.zeros((n_estados, ancho))
+        out[fila, columna] = values[order]
+        return out
+
+    def unpadded(values):
+        out = np.empty(len(order), dtype=values.dtype)
+        out[order] = values[fila, columna]
+        return out
+
+    minimo = anterior * (1 - municipal_lower)
+    maximo = anterior * (1 + municipal_upper)
+    solution = solve_bands(padded(bruta), padded(minimo), padded(maximo), presupuesto=total_estatal,
+                           redistribution=redistribution)
+
+    df['Min'] = minimo
+    df['Max'] = maximo
+    # superávit y déficit contra la bruta escalada al total ajustado de su Entidad
+    escalada = bruta * (total_estatal / bruta_estatal)[codes]
+    for column, values in band_diagnostics(escalada, minimo, maximo).items():
+        df[column] = values
+    df['Asignacion_estatal'] = total_estatal[codes]
+    df['Asignacion_ajustada'] = unpadded(solution.asignacion)
+    if centavos:
+        df['Asignacion_centavos'] = unpadded(largest_remainder(solution.asignacion, total_estatal,
+                                                               padded(minimo), padded(maximo)))
+        df['Asignacion_ajustada'] = df['Asignacion_centavos'] / 100
+    df['Var%_ajustada'] = (df['Asignacion_ajustada'] - df['Asignacion_2025']) / df['Asignacion_2025']
+
+    df.attrs['bandas'] = {
+        'factible': bool(solution.factible.all()),
+        'entidades_no_factibles': [str(estado) for estado in estados[~solution.factible]],
+        'segundos': time.perf_counter() - start,
+    }
+
+    return HierarchicalResults(estatal=estatal, municipal=df)
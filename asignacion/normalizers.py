@@ -0,0 +1,198 @@
+"""
+Registro de métodos de normalización de indicadores.
+
+Todos los normalizadores reciben la matriz de indicadores `X` con forma
+(..., n_entidades, n_indicadores) y la máscara de dirección `negative` (True = Alto=Malo)
+y regresan puntuaciones de la misma forma donde un valor más alto es mejor. Los lotes
+(primeros ejes) se procesan a la vez.
+
+Los métodos de tipo *participación* ('proportion', 'log_proportion') regresan columnas
+que suman 1; los demás regresan puntuaciones que `to_shares` convierte en participación
+cuando la metodología lo requiere (p. ej. la asignación por Proporción Directa).
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# límites inferior y superior (percentiles) del recorte en 'winsorized_min_max'
+WINSOR_LIMITS = (0.05, 0.95)
+
+NORMALIZERS = {}
+SHARE_NORMALIZERS = set()
+
+
+def register_normalizer(name, shares=False):
+    """Decorador que agrega un normalizador al registro con el nombre `name`."""
+    def decorator(func):
+        NORMALIZERS[name] = func
+        if shares:
+            SHARE_NORMALIZERS.add(name)
+        return func
+    return decorator
+
+
+def get_normalizer(name):
+    try:
+        return NORMALIZERS[name]
+    except KeyError:
+        raise ValueError(f"Normalizador desconocido: '{name}'. "
+                         f"Opciones: {', '.join(NORMALIZERS)}") from None
+
+
+def _shift_nonnegative(X):
+    """Suma el valor absoluto del mínimo a las columnas con valores negativos."""
+    col_min = X.min(axis=-2, keepdims=True)
+    return np.where(col_min < 0, X - col_min, X)
+
+
+@register_normalizer('proportion', shares=True)
+def proportion_matrix(X, negative):
+    """
+    Proporción Directa de todas las columnas a la vez.
+
+    Equivale a aplicar `direct_proportion_normalize` a cada columna de `X`
+    (entidades sobre el penúltimo eje), con `negative` como máscara de dirección.
+    Acepta lotes con forma (..., n_entidades, n_indicadores).
+    """
+    # shift por columna para que el mínimo sea 0 o positivo
+    shifted = _shift_nonnegative(X)
+
+    # Alto=Malo: proporción inversa sobre la serie shiftada
+    base = np.where(negative, 1 / (shifted + 1e-6), shifted)
+    total = base.sum(axis=-2, keepdims=True)
+
+    # columnas sin variación (suma cero tras el shift) se reparten en partes iguales
+    zero = shifted.sum(axis=-2, keepdims=True) == 0
+    return np.where(zero, 1.0 / X.shape[-2], base / np.where(zero, 1.0, total))
+
+
+@register_normalizer('min_max')
+def min_max_matrix(X, negative):
+    """Min-Max por columna en [0, 1]; columnas constantes valen 0.5 (como `min_max_normalize`)."""
+    col_min = X.min(axis=-2, keepdims=True)
+    col_max = X.max(axis=-2, keepdims=True)
+    spread = col_max - col_min
+    safe = np.where(spread == 0, 1.0, spread)
+    scores = np.where(negative, (col_max - X) / safe, (X - col_min) / safe)
+    return np.where(spread == 0, 0.5, scores)
+
+
+@register_normalizer('z_score')
+def z_score_matrix(X, negative):
+    """Puntuación Z por columna (desviación poblacional); columnas constantes valen 0."""
+    std = X.std(axis=-2, keepdims=True)
+    scores = (X - X.mean(axis=-2, keepdims=True)) / np.where(std == 0, 1.0, std)
+    return np.where(negative, -scores, scores)
+
+
+@register_normalizer('rank')
+def rank_matrix(X, negative):
+    """
+    Rango percentil en [0, 1] (empates con rango promedio). Es insensible a valores
+    extremos: sólo importa el orden de las Entidades.
+    """
+    n = X.shape[-2]
+    if n == 1:
+        return np.full_like(X, 0.5, dtype=float)
+
+    order = np.argsort(X, axis=-2, kind='stable')
+    ordered = np.take_along_axis(X, order, axis=-2)
+    position = np.broadcast_to(np.arange(n, dtype=float).reshape((n, 1)), ordered.shape)
+
+    # cada grupo de empates recibe el promedio de su primera y última posición
+    new_group = np.ones(ordered.shape, dtype=bool)
+    new_group[..., 1:, :] = ordered[..., 1:, :] != ordered[..., :-1, :]
+    last = np.ones(ordered.shape, dtype=bool)
+    last[..., :-1, :] = new_group[..., 1:, :]
+    start = np.maximum.accumulate(np.where(new_group, position, 0), axis=-2)
+    end = np.flip(np.minimum.accumulate(np.flip(np.where(last, position, n), axis=-2), axis=-2), axis=-2)
+
+    ranks = np.empty(X.shape, dtype=float)
+    np.put_along_axis(ranks, order, (start + end) / 2 / (n - 1), axis=-2)
+    return np.where(negative, 1 - ranks, ranks)
+
+
+@register_normalizer('log_proportion', shares=True)
+def log_proportion_matrix(X, negative):
+    """Proporción Directa sobre log(1 + x) (tras el shift); atenúa indicadores muy sesgados."""
+    return proportion_matrix(np.log1p(_shift_nonnegative(X)), negative)
+
+
+@register_normalizer('winsorized_min_max')
+def winsorized_min_max_matrix(X, negative):
+    """Min-Max tras recortar cada columna a los percentiles `WINSOR_LIMITS`."""
+    low, high = np.quantile(X, WINSOR_LIMITS, axis=-2, keepdims=True)
+    return min_max_matrix(np.clip(X, low, high), negative)
+
+
+def to_shares(scores):
+    """
+    Convierte puntuaciones en participación por columna (cada columna suma 1).
+    Las columnas con valores negativos se desplazan a cero; las que suman cero se
+    reparten en partes iguales.
+    """
+    shifted = _shift_nonnegative(scores)
+    total = shifted.sum(axis=-2, keepdims=True)
+    zero = total == 0
+    return np.where(zero, 1.0 / scores.shape[-2], shifted / np.where(zero, 1.0, total))
+
+
+def resolve_methods(variables, normalization, default):
+    """
+    Lista de métodos por indicador. `normalization` puede ser None (todos `default`),
+    el nombre de un método o un diccionario {indicador: método} (los omitidos usan `default`).
+    """
+    if normalization is None:
+        normalization = default
+    if isinstance(normalization, str):
+        methods = [normalization] * len(variables)
+    else:
+        methods = [normalization.get(var_name, default) for var_name in variables]
+    for name in methods:
+        get_normalizer(name)
+    return methods
+
+
+def normalize_matrix(X, negative, methods, shares=False):
+    """
+    Normaliza cada columna de `X` con su método (`methods` tiene un nombre por columna);
+    las columnas con el mismo método se procesan juntas. Con `shares=True` el resultado
+    se expresa como participación por columna.
+    """
+    negative = np.asarray(negative, dtype=bool)
+    methods = np.asarray(methods)
+    out = np.empty(X.shape, dtype=float)
+    for name in dict.fromkeys(methods.tolist()):
+        cols = methods == name
+        scores = NORMALIZERS[name](X[..., cols], negative[cols])
+        if shares and name not in SHARE_NORMALIZERS:
+            scores = to_shares(scores)
+        out[..., cols] = scores
+    return out
+
+
+def benchmark_normalizers(X, negative, repeat=20, batch=None):
+    """
+    Tiempo promedio (ms) de cada normalizador sobre la misma matriz, opcionalmente
+    replicada `batch` veces como lote. Regresa un DataFrame ordenado del más rápido al
+    más lento, con la correlación de la suma simple de puntuaciones contra 'proportion'.
+    """
+    if batch:
+        X = np.broadcast_to(X, (batch,) + X.shape).copy()
+
+    reference = proportion_matrix(X, negative).reshape(-1, X.shape[-2], X.shape[-1])[0].sum(axis=1)
+    rows = []
+    for name, func in NORMALIZERS.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            scores = func(X, negative)
+        elapsed = (time.perf_counter() - start) / repeat
+        composite = scores.reshape(-1, X.shape[-2], X.shape[-1])[0].sum(axis=1)
+        rows.append({
+            'Normalizador': name,
+            'ms': elapsed * 1000,
+            'Correlación vs proportion': np.corrcoef(composite, reference)[0, 1],
+        })
+    return pd.DataFrame(rows).sort_values('ms', ignore_index=True)
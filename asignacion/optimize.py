@@ -0,0 +1,147 @@
+"""
+Búsqueda de ponderadores que cumplan objetivos de banda y de política.
+
+Los ponderadores se buscan en el simplex por categoría: dentro de cada categoría los
+ponderadores son no negativos y suman lo mismo que en el escenario de partida. La
+búsqueda es de entropía cruzada: en cada ronda se muestrea una población de
+ponderadores (Dirichlet por categoría), se evalúa toda la población en un solo lote con
+`evaluate_scenarios` y la distribución se re-centra en los mejores candidatos.
+
+Objetivos:
+
+- 'bandas': minimizar el número de Entidades que quedan en el tope o en el piso de la
+  banda (desempate: monto total fuera de la banda antes del ajuste).
+- 'variacion': que toda `Var%_ajustada` quede dentro de ±`max_var` (se minimiza el
+  exceso total en puntos porcentuales).
+
+En ambos se suma una penalización pequeña a la distancia L1 contra los ponderadores de
+partida, así que entre soluciones equivalentes se prefiere la más parecida.
+"""
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from .batch import evaluate_scenarios, weight_keys
+from .engine import FASP_VARIABLE_MAP
+
+
+OBJECTIVES = ('bandas', 'variacion')
+
+
+class OptimizationResult(NamedTuple):
+    """Mejores ponderadores encontrados y la evolución de la búsqueda."""
+    weights: dict
+    objetivo: float
+    en_limite: int
+    iteraciones: int
+    evaluaciones: int
+    segundos: float
+    historial: list
+
+
+def _objective(results, data, presupuesto, upper_limit, lower_limit, objective, max_var, start, W, distance):
+    asignacion_2025 = data['Asignacion_2025'].to_numpy(dtype=float)
+    minimo = asignacion_2025 * (1 - lower_limit)
+    maximo = asignacion_2025 * (1 + upper_limit)
+    ajustada = results.asignacion_ajustada
+    bruta = results.asignacion_bruta
+
+    tol = 1e-9 * presupuesto
+    en_limite = ((ajustada <= minimo + tol) | (ajustada >= maximo - tol)).sum(axis=1)
+
+    if objective == 'bandas':
+        fuera = (np.maximum(minimo - bruta, 0) + np.maximum(bruta - maximo, 0)).sum(axis=1) / presupuesto
+        score = en_limite + fuera
+    else:
+        score = np.maximum(np.abs(results.var_ajustada) - max_var, 0).sum(axis=1) * 100
+
+    return score + distance * np.abs(W - start).sum(axis=1), en_limite
+
+
+def optimize_weights(data, weights, presupuesto, upper_limit, lower_limit, variable_map=FASP_VARIABLE_MAP,
+                     method='proportion', normalization=None, objective='bandas', max_var=None,
+                     categories=None, population=2_000, elite=0.05, iterations=40, concentration=300.0,
+                     distance=1e-3, seed=None):
+    """
+    Busca ponderadores que minimicen `objective` partiendo de `weights`.
+
+    `categories` es un diccionario {categoría: [ponderadores]}; la suma de cada categoría
+    se conserva igual a la de `weights` (se ignoran los ponderadores que no están en
+    `weight_keys(variable_map, method)`). Por omisión hay una sola categoría con todos los
+    ponderadores. `concentration` controla qué tan cerca de la media muestrea cada ronda
+    (más alto = búsqueda más local). Se detiene antes si cinco rondas seguidas no mejoran.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"El objetivo debe ser uno de: {', '.join(OBJECTIVES)}")
+    if objective == 'variacion' and max_var is None:
+        raise ValueError("El objetivo 'variacion' requiere `max_var`")
+
+    start_time = time.perf_counter()
+    rng = np.random.default_rng(seed)
+
+    keys = weight_keys(variable_map, method)
+    start = np.array([weights[key] for key in keys], dtype=float)
+    if categories is None:
+        categories = {'Ponderadores': list(keys)}
+    # los ponderadores que la metodología no usa (p. ej. el monto base en Min-Max) se omiten
+    indices = [[keys.index(key) for key in members if key in keys] for members in categories.values()]
+    groups = [(np.array(idx), start[idx].sum()) for idx in indices if idx]
+    if sorted(np.concatenate([idx for idx, _ in groups]).tolist()) != list(range(len(keys))):
+        raise ValueError('Cada ponderador debe pertenecer a exactamente una categoría')
+
+    def evaluate(W):
+        results = evaluate_scenarios(data, W, presupuesto, upper_limit, lower_limit, variable_map,
+                                     method=method, normalization=normalization)
+        return _objective(results, data, presupuesto, upper_limit, lower_limit, objective, max_var,
+                          start, W, distance)
+
+    # media inicial: participación de cada ponderador dentro de su categoría
+    mean = np.empty(len(keys))
+    for idx, total in groups:
+        mean[idx] = start[idx] / total if total > 0 else 1.0 / len(idx)
+
+    scores, en_limite = evaluate(start[None])
+    best_W, best_score, best_en_limite = start, scores[0], en_limite[0]
+    historial = [float(best_score)]
+    n_elite = max(2, int(population * elite))
+    evaluaciones, sin_mejora = 1, 0
+
+    iteration = 0
+    for iteration in range(1, iterations + 1):
+        # Dirichlet por categoría con muestreo gamma vectorizado
+        W = np.empty((population, len(keys)))
+        for idx, total in groups:
+            gamma = rng.standard_gamma(np.maximum(mean[idx] * concentration, 1e-3), size=(population, len(idx)))
+            W[:, idx] = gamma / gamma.sum(axis=1, keepdims=True) * total
+        W[0] = best_W
+
+        scores, en_limite = evaluate(W)
+        evaluaciones += population
+
+        order = np.argsort(scores, kind='stable')
+        if scores[order[0]] < best_score - 1e-12:
+            best_W, best_score, best_en_limite = W[order[0]], scores[order[0]], en_limite[order[0]]
+            sin_mejora = 0
+        else:
+            sin_mejora += 1
+        historial.append(float(best_score))
+
+        # re-centrar en la élite (participaciones dentro de cada categoría)
+        elite_W = W[order[:n_elite]]
+        for idx, total in groups:
+            if total > 0:
+                mean[idx] = elite_W[:, idx].mean(axis=0) / total
+
+        if sin_mejora >= 5:
+            break
+
+    return OptimizationResult(
+        weights=dict(zip(keys, best_W.tolist())),
+        objetivo=float(best_score),
+        en_limite=int(best_en_limite),
+        iteraciones=iteration,
+        evaluaciones=evaluaciones,
+        segundos=time.perf_counter() - start_time,
+        historial=historial,
+    )
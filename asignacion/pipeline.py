@@ -0,0 +1,189 @@
+"""
+Recalculo incremental de la asignación.
+
+`Graph` es un ejecutor de grafos de dependencias: cada etapa declara de qué parámetros o
+etapas depende y guarda su resultado en un `ResultCache` indexado por las llaves de sus
+dependencias. La llave de una etapa se obtiene solo de las llaves de sus dependencias
+(sin calcular nada), así que al cambiar un parámetro se recalculan únicamente las etapas
+que dependen de él.
+
+`allocation_graph` arma el cálculo de `run_allocation` como grafo:
+
+    matriz -> normalizacion -> monto:<indicador> / indice -> bruta -> bandas -> resultado
+
+En Proporción Directa cada `monto:<indicador>` depende solo de su ponderador: cambiar un
+ponderador recalcula un monto, la suma y las bandas; cambiar la banda recalcula solo
+`bandas` y `resultado`. Las gráficas se pueden memorizar con `Graph.key` de la etapa que
+usan (p. ej. la de asignación bruta no cambia al mover la banda).
+"""
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from .batch import weight_keys
+from .cache import ResultCache
+from .engine import FASP_VARIABLE_MAP, band_columns, indicator_matrix, shifted_index
+from .normalizers import normalize_matrix, resolve_methods
+
+
+def fingerprint(value):
+    """Hash estable de un parámetro (DataFrame, arreglo o valor serializable en JSON)."""
+    if isinstance(value, pd.DataFrame):
+        content = pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes()
+        content += json.dumps(list(map(str, value.columns))).encode()
+    elif isinstance(value, np.ndarray):
+        content = value.tobytes() + str((value.dtype, value.shape)).encode()
+    else:
+        content = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(content).hexdigest()
+
+
+class Graph:
+    """
+    Grafo de etapas con caché por etapa.
+
+    `add(nombre, función, *dependencias)` registra una etapa; las dependencias que no son
+    etapas son parámetros de `run`. El grafo se comparte entre sesiones: las etapas que
+    calcula cada llamada se reportan en la lista `recomputed` de esa llamada, no en el grafo.
+    """
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self.nodes = {}
+        self.caches = {}
+
+    def add(self, name, func, *deps):
+        self.nodes[name] = (func, deps)
+        self.caches[name] = ResultCache(self.maxsize)
+        return self
+
+    def key(self, name, params, _keys=None):
+        """Llave de la etapa (o parámetro) `name` con `params`, sin calcular nada."""
+        keys = {} if _keys is None else _keys
+        if name not in keys:
+            if name in self.nodes:
+                deps = self.nodes[name][1]
+                payload = [name] + [self.key(dep, params, keys) for dep in deps]
+                keys[name] = hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+            elif name in params:
+                keys[name] = fingerprint(params[name])
+            else:
+                raise KeyError(f"Falta el parámetro '{name}'")
+        return keys[name]
+
+    def run(self, target, params, recomputed=None):
+        """
+        Valor de la etapa `target`; solo se calculan las etapas cuya llave cambió. Si se
+        pasa la lista `recomputed`, se le agregan los nombres de las etapas calculadas.
+        """
+        recomputed = [] if recomputed is None else recomputed
+        keys, values = {}, {}
+
+        def evaluate(name):
+            if name not in self.nodes:
+                return params[name]
+            if name not in values:
+                func, deps = self.nodes[name]
+
+                def compute():
+                    recomputed.append(name)
+                    return func(*(evaluate(dep) for dep in deps))
+
+                values[name] = self.caches[name].get_or_compute(self.key(name, params, keys), compute)
+            return values[name]
+
+        return evaluate(target)
+
+    def stats(self):
+        """Aciertos y fallos del caché de cada etapa."""
+        return pd.DataFrame([{'Etapa': name, **cache.stats()} for name, cache in self.caches.items()])
+
+
+def allocation_params(data, weights, presupuesto, upper_limit, lower_limit, normalization=None, centavos=False):
+    """Parámetros de `allocation_graph`: cada ponderador es un parámetro `w:<nombre>`."""
+    return {
+        'data': data,
+        **{f'w:{name}': float(value) for name, value in weights.items()},
+        'presupuesto': float(presupuesto),
+        'upper_limit': float(upper_limit),
+        'lower_limit': float(lower_limit),
+        'normalization': normalization,
+        'centavos': bool(centavos),
+    }
+
+
+def allocation_graph(variable_map=FASP_VARIABLE_MAP, method='proportion', epsilon=0.01, maxsize=8):
+    """
+    Grafo del cálculo completo de `run_allocation` para `variable_map` y `method`. La
+    etapa `resultado` es el mismo DataFrame que `run_allocation` con los mismos parámetros
+    (ver `allocation_params`).
+    """
+    if method not in ('proportion', 'min_max'):
+        raise ValueError("El método debe ser 'proportion' o 'min_max'")
+    variables = list(variable_map)
+    graph = Graph(maxsize)
+
+    graph.add('matriz', lambda data: indicator_matrix(data, variable_map), 'data')
+    graph.add('normalizacion',
+              lambda matriz, normalization: normalize_matrix(
+                  *matriz, resolve_methods(variables, normalization, method), shares=method == 'proportion'),
+              'matriz', 'normalization')
+
+    if method == 'proportion':
+        # un monto por indicador: cambiar un ponderador recalcula solo su monto
+        for j, var_name in enumerate(variables):
+            graph.add(f'monto:{var_name}', lambda props, w, presupuesto, j=j: props[:, j] * (w * presupuesto),
+                      'normalizacion', f'w:{var_name}', 'presupuesto')
+        graph.add('monto:Base', lambda data, w, presupuesto: np.full(len(data), presupuesto * w / len(data)),
+                  'data', 'w:Monto base', 'presupuesto')
+        montos = [f'monto:{var_name}' for var_name in variables] + ['monto:Base']
+        graph.add('bruta', lambda *columns: np.sum(columns, axis=0), *montos)
+    else:
+        pesos = [f'w:{key}' for key in weight_keys(variable_map, method)]
+        graph.add('indice', lambda scores, *w: scores @ np.array(w), 'normalizacion', *pesos)
+        graph.add('corrimiento', lambda indice: shifted_index(indice, epsilon), 'indice')
+        graph.add('bruta', lambda corrimiento, presupuesto: corrimiento[1] / corrimiento[1].sum() * presupuesto,
+                  'corrimiento', 'presupuesto')
+
+    redistribution = 'proportional' if method == 'proportion' else 'equal'
+    graph.add('bandas',
+              lambda bruta, data, upper_limit, lower_limit, centavos: band_columns(
+                  bruta, data['Asignacion_2025'].to_numpy(dtype=float), upper_limit, lower_limit,
+                  redistribution, centavos=centavos, reparto=bruta / bruta.sum()),
+              'bruta', 'data', 'upper_limit', 'lower_limit', 'centavos')
+
+    if method == 'proportion':
+        def resultado(data, props, bandas, *montos):
+            bruta = np.sum(montos, axis=0)
+            columns = {f'{var_name}_prop': props[:, j] for j, var_name in enumerate(variables)}
+            columns['Asignacion_Bruta'] = bruta
+            columns.update({f'Monto_{var_name}': monto for var_name, monto in zip(variables, montos[:-1])})
+            columns['Monto_Base'] = montos[-1]
+            columns['Reparto'] = bruta / bruta.sum()
+            columns['Asignacion_2026'] = bruta
+            return _frame(data, columns, bandas)
+
+        graph.add('resultado', resultado, 'data', 'normalizacion', 'bandas', *montos)
+    else:
+        def resultado(data, scores, indice, corrimiento, bruta, bandas):
+            columns = {f'{var_name}_norm': scores[:, j] for j, var_name in enumerate(variables)}
+            columns['Indice Normalizado'] = indice
+            columns['Indice Final (0-1)'], columns['Indice Final (Corrimiento)'] = corrimiento
+            columns['Reparto'] = corrimiento[1] / corrimiento[1].sum()
+            columns['Asignacion_2026'] = bruta
+            return _frame(data, columns, bandas)
+
+        graph.add('resultado', resultado, 'data', 'normalizacion', 'indice', 'corrimiento', 'bruta', 'bandas')
+
+    return graph
+
+
+def _frame(data, columns, bandas):
+    """DataFrame de resultados con las mismas columnas (y orden) que `run_allocation`."""
+    band, resumen = bandas
+    columns['Var%'] = columns['Asignacion_2026'] / data['Asignacion_2025'].to_numpy(dtype=float) - 1
+    df = pd.concat([data, pd.DataFrame({**columns, **band}, index=data.index)], axis=1)
+    df.attrs['bandas'] = resumen
+    return df
@@ -0,0 +1,49 @@
+"""
+Asignación exacta en centavos.
+
+La asignación ajustada se calcula en float64 y su suma puede diferir del presupuesto por
+algunos centavos. `largest_remainder` convierte la asignación a centavos enteros (int64)
+con el método de residuos mayores: se toma el piso de cada monto y los centavos faltantes
+se asignan, uno por Entidad, a los residuos más grandes. La suma coincide exactamente con
+el total y el cálculo es por lote sobre el último eje, sin ciclos por Entidad.
+"""
+import numpy as np
+
+
+def to_centavos(monto):
+    """Monto en pesos a centavos enteros (int64), redondeando al centavo más cercano."""
+    return np.rint(np.asarray(monto, dtype=float) * 100).astype(np.int64)
+
+
+def largest_remainder(asignacion, total, minimo=None, maximo=None):
+    """
+    Asignación (..., n) en pesos a centavos enteros (..., n) que suman exactamente `total`
+    (en pesos, se redondea al centavo; escalar o de forma (...) con un total por fila).
+
+    Con `minimo`/`maximo` (la banda) el centavo extra se da primero a las Entidades cuyo
+    piso quedó debajo del mínimo y nunca a las que con él rebasarían el máximo.
+    """
+    asignacion = np.asarray(asignacion, dtype=float)
+    objetivo = np.broadcast_to(to_centavos(total), asignacion.shape[:-1])
+
+    # re-escalar para que la suma exacta sea el total (el solver la conserva salvo redondeo)
+    suma = asignacion.sum(axis=-1, keepdims=True)
+    exacto = asignacion * 100 * np.divide(objetivo[..., None] / 100, suma, out=np.ones_like(suma),
+                                          where=suma != 0)
+    base = np.floor(exacto).astype(np.int64)
+    residuo = exacto - base
+
+    # prioridad del centavo extra: residuo, ajustado por la banda
+    prioridad = residuo.copy()
+    if minimo is not None:
+        prioridad += base < np.ceil(np.asarray(minimo, dtype=float) * 100)
+    if maximo is not None:
+        prioridad -= 2 * (base + 1 > np.floor(np.asarray(maximo, dtype=float) * 100))
+
+    n = asignacion.shape[-1]
+    faltantes = np.clip(objetivo - base.sum(axis=-1), 0, n)
+    order = np.argsort(-prioridad, axis=-1, kind='stable')
+    posicion = np.empty(order.shape, dtype=np.int64)
+    np.put_along_axis(posicion, order, np.broadcast_to(np.arange(n), order.shape), axis=-1)
+
+    return base + (posicion < np.expand_dims(faltantes, -1))
@@ -0,0 +1,126 @@
+"""
+Validación del csv de entrada antes de cualquier cálculo.
+
+El esquema declara las columnas requeridas, su tipo, su rango y el número de Entidades
+Federativas. `read_validated` lee el csv con el lector multihilo de Polars, convierte los
+tipos una sola vez (las columnas del esquema se leen como texto y se convierten a Float64;
+una celda que no es número queda señalada en lugar de romper la inferencia) y revisa
+todas las reglas en una sola pasada. Si algo falla levanta `SchemaError` con la lista
+completa de problemas; si no, regresa un DataFrame de pandas con los indicadores en
+float64, listo para el motor.
+
+Requiere polars, por eso no se exporta desde `asignacion`.
+"""
+import io
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from .engine import FASP_VARIABLE_MAP, FOFISP_VARIABLE_MAP
+
+
+# filas de ejemplo que se muestran por regla
+MAX_EJEMPLOS = 5
+
+
+class Column(NamedTuple):
+    """Columna requerida: numérica (`float`) o texto (`str`), con cota inferior opcional."""
+    name: str
+    dtype: str = 'float'
+    lower: float | None = None
+    positive: bool = False
+
+
+class Schema(NamedTuple):
+    """Columnas requeridas y número exacto de Entidades distintas en `state_column`."""
+    columns: tuple
+    entidades: int | None = 32
+    state_column: str = 'Entidad_Federativa'
+
+
+class SchemaError(ValueError):
+    """El csv no cumple el esquema; `errores` tiene un mensaje por problema."""
+
+    def __init__(self, errores):
+        self.errores = list(errores)
+        super().__init__('; '.join(self.errores))
+
+
+def input_schema(variable_map, nonnegative=(), entidades=32, state_column='Entidad_Federativa'):
+    """Esquema del csv de un fondo: Entidad, indicadores de `variable_map` y `Asignacion_2025` > 0."""
+    columns = [Column(state_column, 'str')]
+    columns += [Column(var_name, lower=0 if var_name in nonnegative else None) for var_name in variable_map]
+    columns.append(Column('Asignacion_2025', positive=True))
+    return Schema(tuple(columns), entidades, state_column)
+
+
+FASP_SCHEMA = input_schema(FASP_VARIABLE_MAP, nonnegative=('Pob', 'Profesionalizacion'))
+FOFISP_SCHEMA = input_schema(FOFISP_VARIABLE_MAP, nonnegative=('Población', 'Academias'))
+
+
+def _filas(mask):
+    """Números de fila (desde 1) de los primeros casos de `mask`."""
+    filas = np.flatnonzero(mask)[:MAX_EJEMPLOS] + 1
+    return ', '.join(map(str, filas)) + (', ...' if mask.sum() > MAX_EJEMPLOS else '')
+
+
+def read_validated(content, schema):
+    """
+    Lee el csv (`bytes`) y lo valida contra `schema`; regresa un DataFrame de pandas con
+    las columnas numéricas del esquema en float64 o levanta `SchemaError`.
+    """
+    try:
+        df = pl.read_csv(io.BytesIO(content), schema_overrides={column.name: pl.String for column in schema.columns})
+    except (pl.exceptions.PolarsError, UnicodeDecodeError) as error:
+        raise SchemaError([f'No se pudo leer el csv: {error}']) from error
+
+    faltantes = [column.name for column in schema.columns if column.name not in df.columns]
+    if faltantes:
+        raise SchemaError([f"Faltan columnas: {', '.join(faltantes)}"])
+    if df.height == 0:
+        raise SchemaError(['El archivo no tiene filas'])
+
+    numericas = [column for column in schema.columns if column.dtype == 'float']
+    df = df.with_columns(
+        pl.col(column.name).str.strip_chars().cast(pl.Float64, strict=False).alias(f'{column.name}__num')
+        for column in numericas
+    )
+
+    errores = []
+    for column in schema.columns:
+        texto = df[column.name]
+        vacias = texto.is_null().to_numpy() | (texto.str.strip_chars() == '').fill_null(False).to_numpy()
+        if vacias.any():
+            errores.append(f"'{column.name}' tiene celdas vacías (filas {_filas(vacias)})")
+        if column.dtype != 'float':
+            continue
+
+        valores = df[f'{column.name}__num'].to_numpy()
+        no_numericas = np.isnan(valores) & ~vacias
+        if no_numericas.any():
+            errores.append(f"'{column.name}' tiene valores no numéricos (filas {_filas(no_numericas)})")
+        with np.errstate(invalid='ignore'):
+            if column.positive and (fuera := valores <= 0).any():
+                errores.append(f"'{column.name}' debe ser mayor que cero (filas {_filas(fuera)})")
+            elif column.lower is not None and (fuera := valores < column.lower).any():
+                errores.append(f"'{column.name}' debe ser al menos {column.lower:g} (filas {_filas(fuera)})")
+        if np.isinf(valores).any():
+            errores.append(f"'{column.name}' tiene valores infinitos (filas {_filas(np.isinf(valores))})")
+
+    if schema.entidades is not None:
+        distintas = df[schema.state_column].drop_nulls().n_unique()
+        if distintas != schema.entidades:
+            errores.append(f"'{schema.state_column}' tiene {distintas} Entidades distintas; "
+                           f"se esperan {schema.entidades}")
+
+    if errores:
+        raise SchemaError(errores)
+
+    # columnas del esquema ya convertidas; el resto conserva el tipo que infirió Polars
+    tipos = {column.name: column.dtype for column in schema.columns}
+    return pd.DataFrame({
+        name: df[f'{name}__num' if tipos.get(name) == 'float' else name].to_numpy()
+        for name in df.columns if not name.endswith('__num')
+    })
@@ -0,0 +1,83 @@
+"""
+Sensibilidad de la asignación respecto a los ponderadores.
+
+Antes de bandas la derivada es analítica: en Proporción Directa la asignación es lineal
+en los ponderadores (∂A_i/∂w_j = presupuesto * p_ij); en el Índice Normalizado se deriva
+el re-escalamiento Min-Max, el corrimiento y la participación por regla de la cadena.
+Después de bandas se usan diferencias finitas centrales, evaluando todos los
+escenarios perturbados en un solo lote con `evaluate_scenarios`.
+"""
+import numpy as np
+import pandas as pd
+
+from .batch import evaluate_scenarios, weight_keys
+from .engine import FASP_VARIABLE_MAP, indicator_matrix, shifted_index
+from .normalizers import normalize_matrix, resolve_methods
+
+
+def weight_jacobian(data, weights, presupuesto, variable_map=FASP_VARIABLE_MAP, method='proportion',
+                    normalization=None, epsilon=0.01):
+    """
+    Jacobiano analítico de la asignación antes de bandas (`Asignacion_2026`) respecto a
+    los ponderadores: DataFrame (Entidades x ponderadores) en pesos por unidad de ponderador.
+    """
+    variables = list(variable_map)
+    X, negative = indicator_matrix(data, variable_map)
+    n = len(data)
+
+    if method == 'proportion':
+        props = normalize_matrix(X, negative, resolve_methods(variables, normalization, 'proportion'),
+                                 shares=True)
+        jacobian = np.column_stack([props, np.full(n, 1.0 / n)]) * presupuesto
+    elif method == 'min_max':
+        scores = normalize_matrix(X, negative, resolve_methods(variables, normalization, 'min_max'))
+        indice = scores @ np.array([weights[var_name] for var_name in variables])
+        indice_final, corrimiento = shifted_index(indice, epsilon)
+
+        # re-escalamiento Min-Max: F_i = (I_i - I_min) / (I_max - I_min)
+        low, high = np.argmin(indice), np.argmax(indice)
+        spread = indice[high] - indice[low]
+        if spread == 0:
+            d_final = np.zeros_like(scores)
+        else:
+            d_final = ((scores - scores[low]) - indice_final[:, None] * (scores[high] - scores[low])) / spread
+
+        # corrimiento y participación: A_i = presupuesto * C_i / sum(C)
+        d_corr = (1 - epsilon) * d_final
+        total = corrimiento.sum()
+        jacobian = presupuesto * (d_corr / total - corrimiento[:, None] * d_corr.sum(axis=0) / total ** 2)
+    else:
+        raise ValueError("El método debe ser 'proportion' o 'min_max'")
+
+    return pd.DataFrame(jacobian, index=data['Entidad_Federativa'].to_numpy(),
+                        columns=list(weight_keys(variable_map, method)))
+
+
+def band_jacobian(data, weights, presupuesto, upper_limit, lower_limit, variable_map=FASP_VARIABLE_MAP,
+                  method='proportion', normalization=None, step=1e-4):
+    """
+    Jacobiano de la asignación ajustada (después de bandas) por diferencias finitas
+    centrales con paso `step`; los 2K escenarios perturbados se evalúan en un lote.
+    La asignación ajustada es lineal por tramos, así que en un quiebre de la banda el
+    resultado es el promedio de las pendientes de ambos lados. Como en `run_allocation`,
+    el total de la banda es la asignación bruta de cada escenario: cada columna suma lo
+    mismo que la de `weight_jacobian` (la banda reparte el monto, no lo cambia).
+    """
+    keys = weight_keys(variable_map, method)
+    base = np.array([weights[key] for key in keys], dtype=float)
+    delta = np.eye(len(keys)) * step
+    W = np.concatenate([base + delta, base - delta])
+
+    results = evaluate_scenarios(data, W, presupuesto, upper_limit, lower_limit, variable_map,
+                                 method=method, normalization=normalization)
+    up, down = np.split(results.asignacion_ajustada, 2)
+    jacobian = (up - down).T / (2 * step)
+
+    return pd.DataFrame(jacobian, index=results.entidades, columns=list(keys))
+
+
+def points_table(jacobian, punto=0.01):
+    """Pesos que mueve `punto` (por omisión un punto porcentual) de cada ponderador."""
+    table = jacobian * punto
+    table.index.name = 'Entidad_Federativa'
+    return table.reset_index()
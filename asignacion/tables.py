@@ -0,0 +1,66 @@
+"""
+Formato de tablas para `st.dataframe` sin formatear celda por celda con `pandas.Styler`.
+
+El formato de cada columna se declara con `column_config` (formatos numéricos tipados que
+aplica el navegador), así que el costo no crece con el número de celdas. En lugar de
+resaltar celdas (CSS por celda con `Styler`) las filas se marcan con una columna booleana
+que se dibuja como `CheckboxColumn`.
+Requiere streamlit, por eso no se exporta desde `asignacion`.
+"""
+import streamlit as st
+
+
+# formatos de `st.column_config.NumberColumn`
+MONEY = 'dollar'        # $1,234.57
+PERCENT = 'percent'     # fracción: 0.0525 -> 5.25%
+
+
+def formats(columns, fmt):
+    """`column_config` con el mismo formato numérico para todas las `columns`."""
+    return {column: st.column_config.NumberColumn(format=fmt) for column in columns}
+
+
+def money(*columns):
+    return formats(columns, MONEY)
+
+
+def percent(*columns):
+    return formats(columns, PERCENT)
+
+
+def checkbox(*columns):
+    """`column_config` de casillas de solo lectura para columnas booleanas."""
+    return {column: st.column_config.CheckboxColumn(disabled=True) for column in columns}
+
+
+def flag_nonzero(df, subset, column):
+    """Copia de `df` con la columna booleana `column`: alguna de `subset` es distinta de cero."""
+    return df.assign(**{column: (df[subset].to_numpy() != 0).any(axis=1)})
+
+
+def paginate(df, key, page_size=250):
+    """
+    Página de `df` con un selector de página cuando tiene más de `page_size` filas (p. ej.
+    archivos municipales); con menos filas regresa `df` completo y no dibuja nada.
+    """
+    if len(df) <= page_size:
+        return df
+
+    pages = -(-len(df) // page_size)
+    page = st.number_input(f'Página (de {pages})', min_value=1, max_value=pages, value=1, step=1, key=key)
+    first = (page - 1) * page_size
+    st.caption(f'Filas {first + 1:,}–{min(first + page_size, len(df)):,} de {len(df):,}')
+    return df.iloc[first:first + page_size]
+
+
+def keep_widget_state(defaults):
+    """
+    Conserva el estado de los widgets de secciones que no se dibujan en esta ejecución
+    (Streamlit lo descarta): re-asigna su valor o siembra el inicial de `defaults`
+    (None = el del widget).
+    """
+    for key, default in defaults.items():
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+        elif default is not None:
+            st.session_state[key] = default
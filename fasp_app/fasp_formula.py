@@ -0,0 +1,989 @@
+# libraries
+import streamlit as st
+import numpy as np
+import pandas as pd
+import os
+import sys
+from dotenv import load_dotenv
+load_dotenv('.env')
+
+# motor de cálculo compartido (raíz del repositorio)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from asignacion import (band_adjustment, band_summary, ResultCache, content_hash, scenario_key,
+                        NORMALIZERS, FASP_VARIABLE_MAP, FASP_MIN_MAX_VARIABLE_MAP,
+                        compare_allocations, evaluate_normalizers, weight_jacobian, band_jacobian,
+                        points_table, simulate, DISTRIBUTIONS, optimize_weights, OBJECTIVES,
+                        allocate_hierarchical)
+from asignacion.pipeline import allocation_graph, allocation_params
+from asignacion.diagnostics import lazy_import, import_times, importtime_profile
+from asignacion.tables import checkbox, flag_nonzero, formats, keep_widget_state, money, paginate, percent
+
+
+# --- metodologías ---
+# Cada metodología es una configuración del mismo motor: normalizador, dirección de los
+# indicadores, reparto del remanente y valores predeterminados de bandas y ponderadores.
+METODOLOGIAS = {
+    'Proporción Directa': {
+        'key': 'prop',
+        'method': 'proportion',
+        'normalizer': 'proportion',
+        'variable_map': FASP_VARIABLE_MAP,
+        'upper_limit': 0.03,
+        'lower_limit': 0.08,
+        'weights': {
+            'Pob': 0.075, 'Var_inc_del': 0.21, 'Monto base': 0.015,
+            'Tasa_policial': 0.045, 'Dig_salarial': 0.045, 'Profesionalizacion': 0.135,
+            'Ctrl_conf': 0.0225, 'Disp_camaras': 0.078, 'Disp_lectores_veh': 0.078,
+            'Tasa_abandono_llamadas': 0.045, 'Cump_presup': 0.005, 'Sobrepob_penitenciaria': 0.0381,
+            'Proc_justicia': 0.0858, 'Servs_forenses': 0.0368, 'Eficiencia_procesal': 0.0858,
+        },
+    },
+    'Índice Normalizado (Min-Max)': {
+        'key': 'min_max',
+        'method': 'min_max',
+        'normalizer': 'min_max',
+        'variable_map': FASP_MIN_MAX_VARIABLE_MAP,
+        'upper_limit': 0.1,
+        'lower_limit': 0.1,
+        'weights': {
+            'Pob': 0.15, 'Var_inc_del': 0.09, 'Monto base': 0.06,
+            'Tasa_policial': 0.09, 'Dig_salarial': 0.0675, 'Profesionalizacion': 0.0675,
+            'Ctrl_conf': 0.0563, 'Disp_camaras': 0.0563, 'Disp_lectores_veh': 0.0563,
+            'Tasa_abandono_llamadas': 0.0563, 'Cump_presup': 0.05, 'Sobrepob_penitenciaria': 0.05,
+            'Proc_justicia': 0.05, 'Servs_forenses': 0.05, 'Eficiencia_procesal': 0.05,
+        },
+    },
+}
+
+# etiquetas de los ponderadores agrupadas por categoría
+CATEGORIAS = {
+    'Características Estatales': {
+        'Pob': 'Población',
+        'Var_inc_del': 'Var incidencia delictiva',
+        'Monto base': 'Monto base',
+    },
+    'Desempeño Institucional': {
+        'Tasa_policial': 'Tasa policial',
+        'Dig_salarial': 'Dig salarial',
+        'Profesionalizacion': 'Profesionalización',
+        'Ctrl_conf': 'Ctrl confianza',
+        'Disp_camaras': 'Disp cámaras',
+        'Disp_lectores_veh': 'Disp lectores veh.',
+        'Tasa_abandono_llamadas': 'Tasa abandono llamadas',
+        'Cump_presup': 'Cump. presup.',
+        'Sobrepob_penitenciaria': 'Sobrepob. penitenciaria',
+        'Proc_justicia': 'Proc justicia',
+        'Servs_forenses': 'Servs forenses',
+        'Eficiencia_procesal': 'Eficiencia procesal',
+    },
+}
+
+
+# secciones de la app (se dibuja una a la vez)
+SECCIONES = ['1.Introducción', '2.Cálculo', '3.Comparativo', '4.Nota metodológica', '5.Nota técnica',
+             '6.Sensibilidad', '7.Simulación', '8.Optimización']
+
+# widgets de las secciones (fuera de la barra lateral) cuyo estado se conserva entre secciones
+# y su valor inicial (None = el del widget)
+SECCION_DEFAULTS = {
+    'Metodologia calculo': None, 'Metodologia base': None, 'Metodologia sensibilidad': None,
+    'Metodologia simulacion': None, 'Indicadores ruido': ['Tasa_policial', 'Servs_forenses', 'Var_inc_del'],
+    'Desviacion relativa': 0.05, 'Distribucion': None, 'Extracciones': 10_000, 'Ejecutar simulacion': None,
+    'Metodologia optimizacion': None, 'Objetivo optimizacion': None, 'Variacion maxima': 0.05,
+    'Buscar ponderadores': None, 'Columna municipio': None, 'Banda municipal superior': 0.15,
+    'Banda municipal inferior': 0.15,
+}
+
+
+# --- app settings ---
+# blog home link
+st.markdown('<a href="https://tinyurl.com/sesnsp-dgp-blog" target="_self">Home</a>', unsafe_allow_html=True)
+
+# hide streamlit logo and footer
+hide_default_format = """
+    <style>
+    #MainMenu {visibility: hidden;}
+    footer {visibility: hidden;}
+    </style>
+    """
+
+# page layout config and add image
+st.set_page_config(layout="wide", page_title="FASP App", page_icon='images/logo.png')
+
+# set title and subtitle
+st.markdown("<h1><span style='color: #691c32;'>Asignación del Fondo FASP</span></h1>",
+    unsafe_allow_html=True)
+
+# author, date
+st.caption('Jesús LM')
+st.caption('Octubre, 2025')
+
+
+# authentication by password
+password = os.getenv('PASSWORD')
+# Initialize session state if not already set
+if 'password_correct' not in st.session_state:
+    st.session_state.password_correct = False
+
+# if password is not correct, ask for it
+if not st.session_state.password_correct:
+    password_guess = st.text_input('¡Escribe el password para acceder!')
+
+    if password_guess == password:
+        st.session_state.password_correct = True
+        st.rerun()
+    else:
+        st.stop()
+
+# this code runs only when the password is correct
+#st.success('¡Bienvenido!')
+
+# customize color of sidebar and text
+st.markdown(hide_default_format, unsafe_allow_html=True)
+st.markdown("""
+    <style>
+        /* 1. Target the main content area background */
+        [data-testid="stAppViewBlockContainer"] {
+            background-color: #f6f6f6;
+        }
+        /* Sidebar background */
+        [data-testid=stSidebar] {
+            background-color: #f6f6f6;
+            color: #28282b;
+        }
+        /* Target all text elements within the sidebar (labels, markdown, sliders, etc.) */
+        [data-testid="stSidebar"] * {
+            color: #28282b !important;
+        }
+    </style>
+    """, unsafe_allow_html=True)
+
+
+# --- sidebar ---
+# sidebar image and text
+st.sidebar.image('images/sesnsp.png')
+
+# presupuesto estimado widget (común a todas las metodologías)
+with st.sidebar.expander('Presupuesto'):
+    presupuesto = st.number_input(
+        'Presupuesto estimado',
+        value=9_840_407_024.0, placeholder='Monto del fondo', key='Presupuesto estimado', format="%.2f",
+    )
+    presupuesto_formateado = f"${presupuesto:,.2f}"
+    # asignación en centavos enteros: la suma cuadra exactamente con la asignación total
+    centavos = st.toggle('Centavos exactos', value=True, key='Centavos exactos')
+
+# diagnóstico: tiempo de importación de las bibliotecas que se cargan bajo demanda
+with st.sidebar.expander('Diagnóstico'):
+    st.dataframe(import_times(), hide_index=True,
+                 column_config={'Milisegundos': st.column_config.NumberColumn(format='%.1f')})
+    if st.button('Perfil de importación (-X importtime)', key='Perfil importacion'):
+        st.dataframe(importtime_profile(['streamlit', 'pandas', 'plotly.graph_objects', 'great_tables']).head(10),
+                     hide_index=True)
+
+# metodologías a calcular con el mismo archivo; el valor inicial va en session_state para
+# que las publicaciones anteriores (fasp_formula_prop.py, fasp_formula_min_max.py) preseleccionen la suya
+st.session_state.setdefault('Metodologia', list(METODOLOGIAS))
+metodologias = st.sidebar.multiselect('Metodología', list(METODOLOGIAS), key='Metodologia')
+
+
+def methodology_inputs(config):
+    """Widgets de bandas, ponderadores y normalización de una metodología (llaves con prefijo)."""
+    prefix = config['key']
+
+    with st.expander('Bandas'):
+        upper_limit = st.number_input(
+            'Banda superior',
+            value=config['upper_limit'], key=f'{prefix}_Limite superior',
+        )
+        lower_limit = st.number_input(
+            'Banda inferior',
+            value=config['lower_limit'], key=f'{prefix}_Limite inferior',
+        )
+
+    weights = {}
+    for categoria, etiquetas in CATEGORIAS.items():
+        with st.expander(categoria):
+            for var_name, etiqueta in etiquetas.items():
+                if var_name in config['variable_map']:
+                    direccion = 'Alto=Malo' if config['variable_map'][var_name] == 'negative' else 'Alto=Bueno'
+                    etiqueta = f'{etiqueta} ({direccion})'
+                # el valor inicial va en session_state para que 'Aplicar ponderadores' pueda cambiarlo
+                st.session_state.setdefault(f'{prefix}_{var_name}', config['weights'][var_name])
+                weights[var_name] = st.number_input(
+                    etiqueta,
+                    min_value=0.0, max_value=1.0, step=0.001,
+                    key=f'{prefix}_{var_name}', format="%.4f",
+                )
+            st.markdown(f"**Suma:** {sum(weights[var_name] for var_name in etiquetas):.4f}")
+
+    st.markdown(f'**Suma:** {sum(weights.values()):.4f}')
+
+    # Normalizador por indicador (por omisión el de la metodología)
+    with st.expander('Normalización'):
+        normalization = {
+            var_name: st.selectbox(
+                var_name, list(NORMALIZERS), index=list(NORMALIZERS).index(config['normalizer']),
+                key=f'{prefix}_norm_{var_name}',
+            )
+            for var_name in config['variable_map']
+        }
+
+    return {
+        'weights': weights,
+        'upper_limit': upper_limit,
+        'lower_limit': lower_limit,
+        'normalization': normalization,
+    }
+
+
+# Los controles de ambas metodologías se dibujan siempre para conservar su estado
+entradas = {}
+for sidebar_tab, (nombre, config) in zip(st.sidebar.tabs(list(METODOLOGIAS)), METODOLOGIAS.items()):
+    with sidebar_tab:
+        entradas[nombre] = methodology_inputs(config)
+
+
+# --- caché entre reruns ---
+# Solo el trabajo que depende de los ponderadores se recalcula al cambiar un widget.
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_upload(content):
+    """
+    Lee y valida el csv subido (columnas, tipos, rangos y 32 Entidades) antes de calcular;
+    el caché se indexa por el hash del contenido del archivo.
+    """
+    schema = lazy_import('asignacion.schema')
+    return schema.read_validated(content, schema.FASP_SCHEMA)
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def indicadores_html(path, mtime):
+    """Construye la tabla GT de indicadores y la regresa como HTML (se invalida si cambia el archivo)."""
+    great_tables = lazy_import('great_tables')
+    GT, md = great_tables.GT, great_tables.md
+    indicadores_fasp = pd.read_csv(path)
+
+    # Format GT table
+    indicadores = (
+        GT(indicadores_fasp)
+        .tab_stub()
+        .tab_header(
+            title=md('Fondo para las Aportaciones de Seguridad Pública'),
+            subtitle=md('## Indicadores de Distribución')
+            )
+        .fmt_percent(columns=['Ponderación_categoría','Ponderación_indicador'], decimals=1).sub_zero(zero_text=md(''))
+        .cols_width(cases={
+                "Categoría": "26%",
+                "Ponderación_categoría": "22%",
+                "Indicador": "30%",
+                "Ponderación_indicador": "22%",
+                })
+        .cols_label(
+            Categoría = md('**Categoría**'),
+            Ponderación_categoría = md('**Ponderación categoría**'),
+            Indicador = md('**Indicador**'),
+            Ponderación_indicador = md('**Ponderación indicador**'),
+        )
+        .cols_align(align='center', columns=['Ponderación_categoría','Ponderación_indicador'])
+        .tab_options(
+            container_width="100%",
+            container_height="100%",
+            heading_background_color="#691c32",
+            column_labels_background_color="#ddc9a3",
+            source_notes_background_color="#ddc9a3",
+            row_striping_include_table_body=True,
+            row_striping_background_color='#f8f8f8',
+        )
+        .tab_source_note(
+            source_note=md("Fuente: *Secretariado Ejecutivo del Sistema Nacional de Seguridad Pública*")
+        )
+    )
+
+    return indicadores.as_raw_html()
+
+
+@st.cache_resource
+def result_cache():
+    """Memo LRU de resultados y figuras serializadas, compartido por las sesiones del servidor."""
+    return ResultCache(maxsize=32)
+
+
+@st.cache_resource
+def allocation_graphs():
+    """Grafo de cálculo incremental por metodología, compartido por las sesiones del servidor."""
+    return {nombre: allocation_graph(config['variable_map'], config['method'])
+            for nombre, config in METODOLOGIAS.items()}
+
+
+def render_resultados(nombre, config, entrada, df_results, etapas, memo):
+    """
+    Secciones de resultados, bandas y reasignación de una metodología. Las figuras se
+    memorizan con la llave de la etapa que grafican (`etapas`): las de asignación bruta
+    no se reconstruyen al cambiar la banda.
+    """
+    upper_limit, lower_limit = entrada['upper_limit'], entrada['lower_limit']
+    # plotly se importa hasta que hay resultados que graficar
+    pio = lazy_import('plotly.io')
+    charts = lazy_import('asignacion.charts')
+
+    # Mostrar la tabla final de resultados
+    st.subheader(f"2.2 Resultados: {nombre}")
+
+    st.dataframe(paginate(df_results, f"{config['key']}_pagina_resultados")[['Entidad_Federativa','Asignacion_2026','Asignacion_2025','Var%']],
+                 column_config={**money('Asignacion_2026', 'Asignacion_2025'), **percent('Var%')})
+
+    # Gráfico de barras de asignacion de fondos (figuras memorizadas por escenario)
+    fig = pio.from_json(memo.get_or_compute(f"{etapas['bruta']}:fig", lambda: charts.allocation_bar(df_results).to_json()))
+    st.plotly_chart(fig, use_container_width=True, key=f"{config['key']}_fig")
+
+
+    # Gráfico de barras de variación de asignacion de fondos respecto al año anterior
+    fig_var = pio.from_json(memo.get_or_compute(f"{etapas['bruta']}:fig_var", lambda: charts.variation_bar(df_results).to_json()))
+    st.plotly_chart(fig_var, use_container_width=True, key=f"{config['key']}_fig_var")
+
+
+    st.subheader('2.3 Rebalanceo de remanente')
+    st.markdown(f'''
+    Se estableció una banda de control (+{upper_limit:.0%} / -{lower_limit:.0%}) para el importe asignado 2026
+    en relación al asignado 2025.
+
+    A continuación, podemos observar la aplicación de estas bandas a las Entidades Federativas en la asignación 2026.
+    ''')
+
+    # Resumen de superávit, déficit y remanente
+    df_summary = band_summary(df_results)
+
+    # show results and band limits, flagging rows with non-zero surplus/deficit
+    df_bandas = flag_nonzero(
+        paginate(df_results, f"{config['key']}_pagina_bandas")[
+            ['Entidad_Federativa','Asignacion_2025','Asignacion_2026','Var%','Min','Max','Superavit','Deficit']],
+        subset=['Superavit','Deficit'], column='Fuera de banda',
+    )
+
+    st.dataframe(df_bandas, hide_index=True,
+                 column_config={**money('Asignacion_2025', 'Asignacion_2026', 'Min', 'Max', 'Superavit', 'Deficit'),
+                                **percent('Var%'), **checkbox('Fuera de banda')})
+    st.caption('Tabla 3. Entidades Federativas por encima/debajo de la banda de control')
+
+    st.markdown('''
+    En la siguiente tabla, se resume el superavit y deficit totales respecto a la banda de control, y el remanente
+    que libera (o consume) recortar cada Entidad a su banda.
+    ''')
+
+
+    st.dataframe(df_summary, hide_index=True, width=300, column_config=money('Importe'))
+    st.caption('Tabla 4. Resumen del remante')
+
+    bandas = df_results.attrs['bandas']
+    if bandas['factible']:
+        if bandas['reparto'] == 'proportional':
+            nivel = f"multiplicada por el mismo factor **t = {bandas['nivel']:,.6f}**"
+        else:
+            nivel = f"más el mismo monto **t = ${bandas['nivel']:,.2f}**"
+        st.markdown(f'''
+            El remanente no se reparte en una sola pasada: se busca un nivel común *t* con el que la suma de las
+            asignaciones recortadas a la banda es igual a la asignación total. Cada Entidad que no queda en un extremo
+            de la banda recibe su asignación 2026 {nivel}; las demás quedan en Min o Max (columna Tope).
+        ''')
+    else:
+        st.warning('El presupuesto no cabe en la banda de control: todas las Entidades quedan en el '
+                   'extremo de la banda y se escalan por el mismo factor para conservar el total.')
+
+
+    st.dataframe(
+        band_adjustment(paginate(df_results, f"{config['key']}_pagina_reasignacion")),
+        hide_index=True,
+        column_config={**money('Asignacion_2025', 'Asignacion_2026', 'Asignacion_ajustada', 'Ajuste'),
+                       **percent('Var%_ajustada')},
+    )
+    st.caption('Tabla 5. Ajuste de la banda por Entidad Federativa: diferencia contra la asignación 2026 y '
+               'extremo de la banda alcanzado')
+    st.caption(f"Ajuste de banda: {bandas['iteraciones']} iteraciones, "
+               f"{bandas['segundos'] * 1000:.2f} ms.")
+
+    # con centavos exactos el total se suma en enteros para que cuadre con la asignación total
+    if 'Asignacion_centavos' in df_results:
+        total = pd.Series({'Asignacion_ajustada': df_results['Asignacion_centavos'].sum() / 100})
+    else:
+        total = df_results[['Asignacion_ajustada']].sum()
+    st.dataframe(total, width=200, hide_index=True,
+        column_config={
+            '0': st.column_config.NumberColumn(
+                'Importe total asignado',
+                format='dollar',
+            )
+        }
+    )
+
+    # grafico2
+    # Gráfico de barras de reasignacion de remanente 2026 vs 2025
+    fig2 = pio.from_json(memo.get_or_compute(f"{etapas['resultado']}:fig2", lambda: charts.reallocation_bar(df_results).to_json()))
+    st.plotly_chart(fig2, use_container_width=True, key=f"{config['key']}_fig2")
+
+    if config['method'] != 'proportion':
+        return
+
+    # --- Contribución Monetaria por Variable (solo Proporción Directa) ---
+    st.subheader("2.4 Contribución Monetaria por Indicador")
+    st.markdown(f'''
+        La siguiente tabla desglosa la contribución monetaria de cada uno de los 15 indicadores
+        a la asignación bruta (sin rebalanceo) del **Fondo Estimado de {presupuesto_formateado}**.
+    ''')
+
+    contribution_cols = [f'Monto_{col}' for col in config['variable_map']] + ['Monto_Base']
+
+    # DataFrame for display
+    df_contributions = df_results[['Entidad_Federativa'] + contribution_cols].copy()
+
+    # Add the 'Total Bruto' for verification
+    df_contributions['Asignacion Bruta'] = df_results['Asignacion_Bruta']
+
+    # Prepare the DataFrame for display formatting
+    st.dataframe(
+        paginate(df_contributions, f"{config['key']}_pagina_contribuciones"),
+        hide_index=True,
+        use_container_width=True,
+        column_config=money(*contribution_cols, 'Asignacion Bruta'),
+    )
+    st.caption('Tabla 6. Contribución monetaria de cada indicador a la asignación bruta por Entidad Federativa.')
+
+
+def render_municipal(config, entrada, escenario, memo):
+    """
+    Asignación jerárquica de un archivo municipal (más filas que Entidades): la banda de la
+    metodología se aplica a los totales por Entidad y la banda municipal dentro de cada Entidad.
+    """
+    st.subheader('2.5 Asignación municipal')
+    st.markdown('''
+    El archivo tiene una fila por municipio. La banda de control se aplica a los totales por Entidad Federativa
+    y el total ajustado de cada Entidad se reparte entre sus municipios con la banda municipal.
+    ''')
+
+    textos = [col for col in data.columns
+              if col != 'Entidad_Federativa' and not pd.api.types.is_numeric_dtype(data[col])]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        columna = st.selectbox('Columna de municipio', textos, key='Columna municipio')
+    with col2:
+        municipal_upper = st.number_input('Banda municipal superior', min_value=0.0, step=0.01,
+                                          key='Banda municipal superior')
+    with col3:
+        municipal_lower = st.number_input('Banda municipal inferior', min_value=0.0, max_value=1.0, step=0.01,
+                                          key='Banda municipal inferior')
+
+    jerarquica = memo.get_or_compute(
+        f'{escenario}:municipal:{municipal_upper}:{municipal_lower}',
+        lambda: allocate_hierarchical(data, entrada['weights'], presupuesto, entrada['upper_limit'],
+                                      entrada['lower_limit'], municipal_upper, municipal_lower,
+                                      variable_map=config['variable_map'], method=config['method'],
+                                      normalization=entrada['normalization'], centavos=centavos),
+    )
+
+    st.dataframe(
+        jerarquica.estatal[['Entidad_Federativa','Municipios','Asignacion_2025','Asignacion_2026','Var%','Min','Max',
+                            'Asignacion_ajustada','Var%_ajustada']],
+        hide_index=True,
+        column_config={**money('Asignacion_2025', 'Asignacion_2026', 'Min', 'Max', 'Asignacion_ajustada'),
+                       **percent('Var%', 'Var%_ajustada')},
+    )
+    st.caption('Tabla 15. Asignación por Entidad Federativa con banda de control sobre los totales municipales.')
+
+    municipal = jerarquica.municipal
+    st.dataframe(
+        paginate(municipal, f"{config['key']}_pagina_municipal")[
+            ['Entidad_Federativa'] + ([columna] if columna else []) +
+            ['Asignacion_2025','Asignacion_2026','Min','Max','Asignacion_estatal','Asignacion_ajustada','Var%_ajustada']],
+        hide_index=True,
+        column_config={**money('Asignacion_2025', 'Asignacion_2026', 'Min', 'Max', 'Asignacion_estatal',
+                               'Asignacion_ajustada'),
+                       **percent('Var%_ajustada')},
+    )
+    st.caption('Tabla 16. Asignación por municipio con banda municipal dentro del total ajustado de su Entidad.')
+
+    no_factibles = municipal.attrs['bandas']['entidades_no_factibles']
+    if no_factibles:
+        st.warning('El total de estas Entidades no cabe en la banda municipal y sus municipios se escalan por el '
+                   f"mismo factor: {', '.join(no_factibles)}.")
+
+
+# widget para subir archivos
+uploaded_file = st.file_uploader("", type=['csv'], )
+
+if uploaded_file is None:
+    st.text('Sube el archivo con las variables para la asignación del fondo en formato csv.')
+elif not metodologias:
+    st.info('Selecciona al menos una metodología en la barra lateral.')
+else:
+    try:
+        data = load_upload(uploaded_file.getvalue())
+    except lazy_import('asignacion.schema').SchemaError as error:
+        st.error('El archivo no cumple con el formato esperado:\n\n' + '\n'.join(f'- {e}' for e in error.errores))
+        st.stop()
+    data_hash = content_hash(uploaded_file.getvalue())
+
+    # --- Cálculo ---
+    # Un resultado por metodología seleccionada, todos con el mismo archivo y presupuesto;
+    # la llave del escenario incluye la metodología, los ponderadores y las bandas. El
+    # cálculo es incremental: solo se recalculan las etapas que dependen del widget que cambió.
+    memo = result_cache()
+    graphs = allocation_graphs()
+    resultados, etapas, recalculadas = {}, {}, []
+    for nombre in metodologias:
+        config, entrada = METODOLOGIAS[nombre], entradas[nombre]
+        escenario = scenario_key(data_hash, entrada['weights'], presupuesto,
+                                 entrada['upper_limit'], entrada['lower_limit'], method=config['method'],
+                                 normalization=entrada['normalization'], centavos=centavos)
+        params = allocation_params(data, entrada['weights'], presupuesto, entrada['upper_limit'],
+                                   entrada['lower_limit'], entrada['normalization'], centavos)
+        # el resultado del escenario pasa por el memo (un escenario ya visto no toca el grafo); las
+        # etapas recalculadas se reportan por llamada porque el grafo es compartido entre sesiones
+        resultados[nombre] = (escenario, memo.get_or_compute(
+            f'{escenario}:resultado', lambda: graphs[nombre].run('resultado', params, recalculadas)))
+        etapas[nombre] = {etapa: graphs[nombre].key(etapa, params) for etapa in ('bruta', 'resultado')}
+
+    # --- navegación ---
+    # Solo se ejecuta la sección elegida: st.tabs ejecuta y serializa todas las pestañas en
+    # cada interacción, aunque no estén visibles.
+    # Streamlit descarta el estado de los widgets que no se dibujan en una ejecución; se
+    # conserva para las opciones de las secciones ocultas.
+    keep_widget_state(SECCION_DEFAULTS)
+
+    # contadores del memo de escenarios
+    memo_stats = memo.stats()
+    st.sidebar.caption(
+        f"Caché de escenarios: {memo_stats['hits']} aciertos, {memo_stats['misses']} fallos "
+        f"({memo_stats['size']}/{memo_stats['maxsize']})"
+    )
+    st.sidebar.caption(f"Etapas recalculadas: {len(recalculadas)} ({', '.join(recalculadas[:6]) or 'ninguna'})")
+
+    seccion = st.radio('Sección', SECCIONES, horizontal=True, key='Seccion', label_visibility='collapsed')
+
+    if seccion == SECCIONES[0]:
+
+        # header
+        st.subheader('1. Introducción')
+        st.markdown('''
+        <div style="text-align: justify;">
+        A continuación se enlistan los indicadores subyacentes para la asignación del <b>Fondo de Aportaciones para la
+        Seguridad Pública</b> (FASP) <b>2026</b>.
+        </div>''',
+         unsafe_allow_html=True)
+
+        try:
+            indicadores = indicadores_html('fasp_indicadores.csv', os.path.getmtime('fasp_indicadores.csv'))
+        except FileNotFoundError:
+            st.error("Archivo 'fasp_indicadores.csv' no encontrado.")
+            st.stop()
+        st.html(indicadores)
+        st.caption('Tabla 1. Indicadores utilizados para la asignación de fondos y ponderaciones predeterminadas.')
+
+        st.markdown('''
+        ##### ¿Cómo funciona esta aplicación?
+        ''')
+
+        st.markdown('''
+        <div style="text-align: justify;">
+        Esta aplicación interactiva sirve como una herramienta de análisis de escenarios que utiliza un
+        <i>Índice de Asignación de Proporciones Directas</i> y un <i>Índice de Asignación de Seguridad Pública Normalizado</i>.
+        Ambas metodologías se calculan con el mismo archivo y pueden compararse lado a lado.
+
+        El corazón de la aplicación es la ponderación.
+        Al usar los controles deslizantes en la barra lateral, se pueden simular diferentes prioridades de política pública.
+
+        Al ajustar estas ponderaciones, la aplicación recalcula el índice en tiempo real, permitiéndo ver cómo los
+        supuestos de ponderación impactan la clasificación final de las Entidades Federativas.
+        Esto proporciona una base objetiva para discutir y justificar las decisiones de asignación de fondos,
+        asegurando que los recursos se dirijan donde son más necesarios o donde generarán el mayor impacto.
+        </div>''',
+        unsafe_allow_html=True)
+
+        st.markdown('''
+        ##### Referencias
+
+        [Fondo de Aportaciones para la Seguridad Pública (FASP) 2025](https://www.gob.mx/sesnsp/acciones-y-programas/fondo-de-aportaciones-para-la-seguridad-publica-fasp)
+
+        ---
+
+        *© Dirección General de Planeación*
+        ''')
+
+
+    if seccion == SECCIONES[1]:
+        #st.header('2. Cálculo de Asignación')
+        st.markdown(f'''
+            ## 2. Escenarios de Asignación
+            #### Cálculo con un Fondo Estimado de: *{presupuesto_formateado}*
+        ''')
+        st.subheader("2.1 Datos de Entrada")
+
+        # Adjust data for display
+        data_display = data.copy()
+        data_display.index = pd.RangeIndex(start=1, stop=len(data_display)+1, step=1)
+        st.dataframe(
+            paginate(data_display.rename(columns={'Entidad': 'Entidad_Federativa'}), 'pagina_datos'),
+            use_container_width=True,
+            column_config={
+                **formats(['Pob'], '%,.0f'),
+                **formats(['Tasa_policial', 'Ctrl_conf'], '%.2f'),
+                **formats(['Profesionalizacion'], '%.0f'),
+                **percent('Var_inc_del', 'Dig_salarial', 'Disp_camaras', 'Disp_lectores_veh',
+                          'Tasa_abandono_llamadas', 'Cump_presup', 'Sobrepob_penitenciaria', 'Proc_justicia',
+                          'Servs_forenses', 'Eficiencia_procesal'),
+                **money('Asignacion_2025'),
+            },
+        )
+        st.caption('Tabla 2. Variables utilizadas en el modelo para la asignación de fondos.')
+
+        # solo se dibujan los resultados de la metodología elegida
+        nombre = st.radio('Resultados de', metodologias, horizontal=True, key='Metodologia calculo')
+        escenario, df_results = resultados[nombre]
+        render_resultados(nombre, METODOLOGIAS[nombre], entradas[nombre], df_results, etapas[nombre], memo)
+        if len(data) > data['Entidad_Federativa'].nunique():
+            render_municipal(METODOLOGIAS[nombre], entradas[nombre], escenario, memo)
+
+        st.markdown('---')
+        st.markdown('*© Dirección General de Planeación*')
+
+
+    if seccion == SECCIONES[2]:
+        st.markdown('## 3. Comparativo de metodologías')
+        st.markdown('''
+        Asignación ajustada (después de bandas) de cada metodología seleccionada, calculada con el mismo archivo
+        y el mismo presupuesto. Las diferencias y los cambios de rango se miden contra la primera metodología.
+        ''')
+
+        df_comparativo, distancias = compare_allocations(
+            data['Entidad_Federativa'].to_numpy(),
+            {nombre: df_results['Asignacion_ajustada'] for nombre, (_, df_results) in resultados.items()},
+        )
+        montos = [col for col in df_comparativo.columns if col.startswith(('Asignacion_ajustada', 'Diferencia'))]
+        st.dataframe(paginate(df_comparativo, 'pagina_comparativo'), hide_index=True, use_container_width=True, column_config=money(*montos))
+        st.caption('Tabla 7. Asignación ajustada, diferencia y cambio de rango por metodología.')
+
+        if len(resultados) > 1:
+            st.dataframe(distancias, use_container_width=True, column_config=money(*distancias.columns))
+            st.caption('Tabla 8. Distancia L1 entre asignaciones ajustadas (suma de diferencias absolutas).')
+
+        st.subheader('3.1 Comparación de normalizadores')
+        st.markdown('''
+        Con los ponderadores y bandas de la metodología elegida, se calcula la asignación con cada uno de los
+        normalizadores disponibles aplicado a todos los indicadores, en una sola pasada.
+        ''')
+
+        base = st.selectbox('Metodología base', metodologias, key='Metodologia base')
+        config, entrada = METODOLOGIAS[base], entradas[base]
+        escenario_base = resultados[base][0]
+
+        normalizadores = memo.get_or_compute(
+            f'{escenario_base}:normalizadores',
+            lambda: evaluate_normalizers(data, entrada['weights'], presupuesto, entrada['upper_limit'],
+                                         entrada['lower_limit'], config['variable_map'], config['method']),
+        )
+        df_normalizadores, distancias_normalizadores = compare_allocations(
+            normalizadores.entidades,
+            dict(zip(normalizadores.metodos, normalizadores.asignacion_ajustada)),
+            reference=config['normalizer'],
+        )
+        montos = [col for col in df_normalizadores.columns if col.startswith(('Asignacion_ajustada', 'Diferencia'))]
+        st.dataframe(paginate(df_normalizadores, 'pagina_normalizadores'), hide_index=True, use_container_width=True, column_config=money(*montos))
+        st.caption(f"Tabla 9. Asignación ajustada por normalizador (referencia: {config['normalizer']}).")
+
+        st.dataframe(distancias_normalizadores, use_container_width=True,
+                     column_config=money(*distancias_normalizadores.columns))
+        st.caption('Tabla 10. Distancia L1 entre asignaciones ajustadas por normalizador.')
+
+        st.markdown('---')
+        st.markdown('*© Dirección General de Planeación*')
+
+
+    if seccion == SECCIONES[3]:
+        st.header('4. Nota metodológica')
+
+        st.subheader('4.1 Proporción Directa')
+        st.markdown('''
+        #### 1. Estandarización de Variables (Proporciones)
+
+        Primero, calculamos la proporción que representa cada estado en cada variable:
+
+        - Proporción de Población (Pi​):
+
+            `Pi​ = Población del Estado i​ / Población Total`
+
+        - Proporción de Delitos (Di​):
+
+            `Di ​= Delitos del Estado i​ / Total de Delitos`
+
+        #### 2. Cálculo del Factor de Asignación Ponderado
+
+        Luego, combina estas dos proporciones para cada estado (i) usando las ponderaciones (WP​=0.60 y WD​=0.40).
+
+        - Factor Ponderado (Fi​):
+
+            `Fi ​= (Pi​*0.60)+(Di​*0.40)`
+
+        El resultado Fi​ es el porcentaje total del fondo que le corresponde al Estado i.
+
+        `Nota: La suma de todos los Fi​ para todos los estados debe ser igual a 1.00 (100%).`
+
+        #### 3. Asignación Final del Fondo
+
+        Finalmente, multiplica el Factor Ponderado por el Fondo Total (FT):
+
+        - Asignación al Estado i:
+
+            `A_i​ = Fi * FT`
+        ''')
+
+        st.subheader('4.2 Índice Normalizado (Min-Max)')
+        st.markdown("""
+        1. **Normalización:** Todos los indicadores se escalan al rango [0, 1].
+        2. **Agregación:** Se aplica la suma ponderada de las variables normalizadas.
+        3. **Corrimiento estadístico:** Se suma un valor epsilon para evitar coeficientes nulos.
+        4. **Repartición:** Se reparte el presupuesto entre las Entidades Federativas según el valor de las ponderaciones de los indicadores.
+        """)
+
+        st.markdown('#### Normalización')
+        st.latex(r'''
+        V_{i,j} = \frac{X_{i,j} - X_{i, \min}}{X_{i, \max} - X_{i, \min}}\\
+        \text{ }\\
+        \text{donde:}\\
+        \text{ }\\
+        V_{i,j} = \text{Valor normalizado del indicador i para la Entidad Federativa j}\\
+        X_{i,j} = \text{Indicador i de la Entidad Federativa j}\\
+        ''')
+        st.markdown('`Inversión: Las variables negativas se invierten para que una tasa baja resulte en un valor normalizado alto (cercano a 1).`')
+
+        st.markdown('#### Agregación del Índice')
+        st.latex(r'''
+        I_j = \sum_{i=1}^{n}( V_{i,j} \times W_i)\\
+        \text{ }\\
+        \text{donde:}\\
+        \text{ }\\
+        I_j = \text{Índice de asignación de fondos para la Entidad Federativa j}\\
+        V_{i,j} = \text{Valor normalizado del indicador i para la Entidad Federativa j}\\
+        W_i = \text{Ponderación del indicador i}\\
+        ''')
+        st.markdown('`Re-escalado: El índice final se re-escala [0, 1] para facilitar la interpretación del rendimiento relativo.`')
+
+        st.markdown('#### Corrimiento Estadístico')
+        st.markdown('''
+        La fórmula opera sobre el índice normalizado (con rango [0,1]) usando una constante pequeña y positiva, $\epsilon$.
+
+        ##### Compresión del Rango: (indice_normalizado * (1−$\epsilon$))
+
+        **Objetivo: Comprimir el rango de los valores normalizados.**
+
+        - Multiplicar por un factor ligeramente menor que 1, como (1−0.0001)=0.9999.
+        - El rango original [0,1] se convierte en [0,1−$\epsilon$].
+        - El valor mínimo (0) se mantiene en 0×(1−$\epsilon$)=0.
+        - El valor máximo (1) se reduce a 1×(1−$\epsilon$)=1−$\epsilon$.
+
+        ##### Corrimiento hacia arriba (Shift): +$\epsilon$
+
+        **Objetivo: Desplazar todo el conjunto de datos hacia arriba por la cantidad $\epsilon$.**
+
+        Se suma $\epsilon$ al resultado del paso anterior.
+
+        - El mínimo, que era 0, ahora es 0+$\epsilon$=$\epsilon$.
+        - El máximo, que era 1−$\epsilon$, ahora es (1−$\epsilon$)+$\epsilon$=1.
+
+
+        |Indice normalizado|Transformación|Valor Final|
+        |:---:|:---:|:---:|
+        |0 (mínimo)|(0 * (1−$\epsilon$)) + $\epsilon$|$\epsilon$|
+        |1 (máximo)|(1 * (1−$\epsilon$)) + $\epsilon$|1|
+
+        ''')
+
+        st.markdown('#### Repartición del Presupuesto')
+        st.markdown('''
+        Se calcula la participación porcentual de cada Entidad Federativa en el índice total
+        y se distribuye el fondo total entre cada una de acuerdo a su participación porcentual.
+        ''')
+
+        st.subheader('4.3 Repartición del Remanente')
+        st.markdown('''
+        <div style="text-align: justify;">
+        En ambas metodologías se aplica una banda de control [Min, Max] respecto al importe asignado del ejercicio
+        anterior inmediato. El remanente no se reparte una sola vez entre las Entidades elegibles (eso puede volver a
+        sacar Entidades de la banda): se busca el nivel común t con el que la asignación de cada Entidad, recortada a
+        su banda, suma exactamente la asignación total.
+        </div>''',
+        unsafe_allow_html=True)
+        st.latex(r'''
+        x_j = \min(\max(a_j + t \times s_j, \text{Min}_j), \text{Max}_j), \quad \sum_j x_j = \text{Asignación total}\\
+        \text{ }\\
+        \text{Proporción Directa: } a_j = 0,\ s_j = \text{asignación bruta (se escala por el factor t)}\\
+        \text{Índice Normalizado: } a_j = \text{asignación bruta},\ s_j = 1 \text{ (se suma el mismo monto t)}\\
+        ''')
+        st.markdown('`Las Entidades que alcanzan Min o Max quedan en el extremo de la banda; el resto sigue el nivel común t.`')
+
+        st.markdown('---')
+        st.markdown('*© Dirección General de Planeación*')
+
+        # Inject custom CSS to left-align KaTeX elements
+        st.markdown(
+            """
+            <style>
+            .katex-html {
+                text-align: left;
+            }
+            </style>
+            """,
+            unsafe_allow_html=True
+        )
+
+    if seccion == SECCIONES[4]:
+
+        st.header('5. Nota técnica')
+        st.markdown("""
+        En este apartado, se muestra la sábana de datos con todos las fases del cálculo de asignación de fondos,
+        incluyendo las bandas y reasignación del remanente.
+
+        Por otra parte, se anexa hoja de cálculo en formato xlsx (Excel) con el desarrollo mencionado.
+        """)
+
+        for nombre, (_, df_results) in resultados.items():
+            st.markdown(f'##### {nombre}')
+            st.dataframe(paginate(df_results, f"{METODOLOGIAS[nombre]['key']}_pagina_tecnica"), use_container_width=True)
+
+        st.markdown("[Hoja de cálculo](https://sspcgob-my.sharepoint.com/:x:/g/personal/oscar_avila_sspc_gob_mx/ESy9dnRh6AdJgNEwSx5-udMBcKgLhTP29mnxWhgDvYF6WA?e=l1O8Xl)")
+
+        st.markdown('---')
+        st.markdown('*© Dirección General de Planeación*')
+
+    if seccion == SECCIONES[5]:
+        st.header('6. Sensibilidad a los ponderadores')
+        st.markdown('''
+        Pesos que mueve **un punto porcentual** (0.01) de cada ponderador en la asignación de cada Entidad Federativa.
+        Antes de bandas la sensibilidad es analítica (la asignación es lineal en los ponderadores en Proporción
+        Directa); después de bandas se obtiene por diferencias finitas sobre el cálculo por lotes.
+        ''')
+
+        base = st.selectbox('Metodología', metodologias, key='Metodologia sensibilidad')
+        config, entrada = METODOLOGIAS[base], entradas[base]
+        escenario_base = resultados[base][0]
+
+        antes, despues = memo.get_or_compute(
+            f'{escenario_base}:sensibilidad',
+            lambda: (
+                points_table(weight_jacobian(data, entrada['weights'], presupuesto, config['variable_map'],
+                                             config['method'], entrada['normalization'])),
+                points_table(band_jacobian(data, entrada['weights'], presupuesto, entrada['upper_limit'],
+                                           entrada['lower_limit'], config['variable_map'], config['method'],
+                                           entrada['normalization'])),
+            ),
+        )
+        montos = [col for col in antes.columns if col != 'Entidad_Federativa']
+
+        st.subheader('6.1 Antes de bandas')
+        st.dataframe(paginate(antes, 'pagina_sensibilidad_antes'), hide_index=True, use_container_width=True, column_config=money(*montos))
+        st.caption('Tabla 11. Cambio en la asignación por punto porcentual de cada ponderador (sin bandas).')
+
+        st.subheader('6.2 Después de bandas')
+        st.dataframe(paginate(despues, 'pagina_sensibilidad_despues'), hide_index=True, use_container_width=True, column_config=money(*montos))
+        st.caption('Tabla 12. Cambio en la asignación ajustada por punto porcentual de cada ponderador.')
+
+        st.markdown('---')
+        st.markdown('*© Dirección General de Planeación*')
+
+    if seccion == SECCIONES[6]:
+        st.header('7. Simulación de incertidumbre')
+        st.markdown('''
+        Los indicadores provienen de registros administrativos con error de medición. En este apartado se
+        perturban los indicadores seleccionados con ruido relativo y se recalcula la asignación con bandas
+        en cada extracción, para obtener percentiles de la asignación ajustada por Entidad Federativa.
+        ''')
+
+        base = st.selectbox('Metodología', metodologias, key='Metodologia simulacion')
+        config, entrada = METODOLOGIAS[base], entradas[base]
+        escenario_base = resultados[base][0]
+
+        col1, col2 = st.columns(2)
+        with col1:
+            indicadores_ruido = st.multiselect(
+                'Indicadores con ruido', list(config['variable_map']), key='Indicadores ruido',
+            )
+            ruido = st.number_input('Desviación relativa', min_value=0.0, max_value=1.0, step=0.01,
+                                    key='Desviacion relativa')
+        with col2:
+            distribucion = st.selectbox('Distribución', DISTRIBUTIONS, key='Distribucion')
+            extracciones = st.number_input('Extracciones', min_value=1_000, max_value=100_000, step=1_000,
+                                           key='Extracciones')
+
+        if st.toggle('Ejecutar simulación', key='Ejecutar simulacion'):
+            llave = scenario_key(escenario_base, {var_name: ruido for var_name in indicadores_ruido}, presupuesto,
+                                 entrada['upper_limit'], entrada['lower_limit'], distribucion=distribucion,
+                                 extracciones=int(extracciones))
+            simulacion = memo.get_or_compute(
+                f'{llave}:montecarlo',
+                lambda: simulate(data, entrada['weights'], presupuesto, entrada['upper_limit'],
+                                 entrada['lower_limit'], config['variable_map'], config['method'],
+                                 entrada['normalization'], {var_name: ruido for var_name in indicadores_ruido},
+                                 distribucion, int(extracciones), seed=2026),
+            )
+            resumen = simulacion.resumen
+            resumen_cols = [col for col in resumen.columns if col not in ('Entidad_Federativa', 'Prob. en Max', 'Prob. en Min')]
+
+            charts = lazy_import('asignacion.charts')
+            fig3 = charts.simulation_range(resumen)
+            st.plotly_chart(fig3, use_container_width=True)
+
+            st.dataframe(paginate(resumen, 'pagina_simulacion'), hide_index=True, use_container_width=True,
+                         column_config={**money(*resumen_cols), **percent('Prob. en Max', 'Prob. en Min')})
+            st.caption(f'Tabla 13. Percentiles de la asignación ajustada ({int(extracciones):,} extracciones, '
+                       f'{simulacion.segundos:.2f} s).')
+
+        st.markdown('---')
+        st.markdown('*© Dirección General de Planeación*')
+
+    if seccion == SECCIONES[7]:
+        st.header('8. Optimización de ponderadores')
+        st.markdown('''
+        Busca ponderadores que cumplan un objetivo de bandas o de política, conservando la suma de cada
+        categoría (Características Estatales y Desempeño Institucional) igual a la de los ponderadores actuales.
+        Entre soluciones equivalentes se prefiere la más cercana a los ponderadores actuales.
+        ''')
+
+        base = st.selectbox('Metodología', metodologias, key='Metodologia optimizacion')
+        config, entrada = METODOLOGIAS[base], entradas[base]
+        escenario_base = resultados[base][0]
+
+        objetivo = st.radio(
+            'Objetivo', OBJECTIVES, horizontal=True, key='Objetivo optimizacion',
+            format_func={'bandas': 'Minimizar Entidades en Min/Max',
+                         'variacion': 'Var% ajustada dentro de ±x%'}.get,
+        )
+        max_var = st.number_input('Variación máxima (±x)', min_value=0.0, max_value=1.0, step=0.01,
+                                  key='Variacion maxima', disabled=objetivo != 'variacion')
+
+        if st.toggle('Buscar ponderadores', key='Buscar ponderadores'):
+            optimo = memo.get_or_compute(
+                f'{escenario_base}:optimizacion:{objetivo}:{max_var}',
+                lambda: optimize_weights(data, entrada['weights'], presupuesto, entrada['upper_limit'],
+                                         entrada['lower_limit'], config['variable_map'], config['method'],
+                                         entrada['normalization'], objetivo, max_var,
+                                         categories={categoria: list(etiquetas) for categoria, etiquetas in CATEGORIAS.items()},
+                                         seed=2026),
+            )
+
+            df_optimo = pd.DataFrame({
+                'Ponderador': list(optimo.weights),
+                'Actual': [entrada['weights'][key] for key in optimo.weights],
+                'Óptimo': list(optimo.weights.values()),
+            })
+            df_optimo['Diferencia'] = df_optimo['Óptimo'] - df_optimo['Actual']
+            st.dataframe(df_optimo, hide_index=True,
+                         column_config={**formats(['Actual', 'Óptimo'], '%.4f'), **formats(['Diferencia'], '%+.4f')})
+            st.caption(f'Tabla 14. Ponderadores óptimos: {optimo.en_limite} Entidades en Min/Max, objetivo '
+                       f'{optimo.objetivo:,.4f} ({optimo.iteraciones} rondas, {optimo.evaluaciones:,} escenarios, '
+                       f'{optimo.segundos:.2f} s).')
+
+            def aplicar_ponderadores():
+                for key, value in optimo.weights.items():
+                    st.session_state[f"{config['key']}_{key}"] = round(value, 4)
+
+            st.button('Aplicar ponderadores óptimos', on_click=aplicar_ponderadores, key='Aplicar ponderadores')
+
+        st.markdown('---')
+        st.markdown('*© Dirección General de Planeación*')
@@ -2,16 +2,30 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import polars as pl
-import plotly.express as px
-import plotly.graph_objects as go
-from PIL import Image
-from great_tables import GT, md
 import os
-import io
+import sys
 from dotenv import load_dotenv
 load_dotenv('.env')
 
+# motor de cálculo compartido (raíz del repositorio)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from asignacion import (band_adjustment, band_summary, FOFISP_VARIABLE_MAP, ResultCache,
+                        content_hash, scenario_key, NORMALIZERS, weight_jacobian, band_jacobian,
+                        points_table, optimize_weights, OBJECTIVES, allocate_hierarchical)
+from asignacion.pipeline import allocation_graph, allocation_params
+from asignacion.diagnostics import lazy_import, import_times, importtime_profile
+from asignacion.tables import checkbox, flag_nonzero, formats, keep_widget_state, money, paginate, percent
+
+
+# secciones de la app (se dibuja una a la vez)
+SECCIONES = ['1.Introducción', '2.Cálculo', '3.Nota metodológica', '4.Nota técnica', '5.Sensibilidad',
+             '6.Optimización']
+
+# widgets de las secciones (fuera de la barra lateral) cuyo estado se conserva entre secciones
+# y su valor inicial (None = el del widget)
+SECCION_DEFAULTS = {'Objetivo optimizacion': None, 'Variacion maxima': 0.05, 'Buscar ponderadores': None,
+                    'Columna municipio': None, 'Banda municipal superior': 0.15, 'Banda municipal inferior': 0.15}
+
 
 # --- app settings ---
 # blog home link
@@ -25,11 +39,8 @@ hide_default_format = """
     </style>
     """
 
-# load icon image
-im = Image.open('images/logo.png')
-
 # page layout config and add image
-st.set_page_config(layout="wide", page_title="FOFISP App", page_icon=im)
+st.set_page_config(layout="wide", page_title="FOFISP App", page_icon='images/logo.png')
 
 # set title and subtitle
 st.markdown("<h1><span style='color: #691c32;'>Asignación del Fondo FOFISP</span></h1>",
@@ -91,6 +102,8 @@ with st.sidebar.expander('Bandas'):
         value=1_155_443_263.97, placeholder='Monto del fondo', key='Presupuesto estimado', format="%f", 
     )
     presupuesto_formateado = f"${presupuesto:,.2f}"
+    # asignación en centavos enteros: la suma cuadra exactamente con la asignación total
+    centavos = st.toggle('Centavos exactos', value=True, key='Centavos exactos')
     # presupuesto estimado widget
     upper_limit = st.number_input(
         'Banda superior',
@@ -103,24 +116,37 @@ with st.sidebar.expander('Bandas'):
     )
 
 
+# diagnóstico: tiempo de importación de las bibliotecas que se cargan bajo demanda
+with st.sidebar.expander('Diagnóstico'):
+    st.dataframe(import_times(), hide_index=True,
+                 column_config={'Milisegundos': st.column_config.NumberColumn(format='%.1f')})
+    if st.button('Perfil de importación (-X importtime)', key='Perfil importacion'):
+        st.dataframe(importtime_profile(['streamlit', 'pandas', 'plotly.graph_objects', 'great_tables']).head(10),
+                     hide_index=True)
+
 # sliders for weights
 # Los valores se limitan para que la suma siempre sea 1
 with st.sidebar.expander('Ponderadores'):
+    # valores iniciales en session_state para que 'Aplicar ponderadores óptimos' pueda cambiarlos
+    for key, value in {'Población': 0.70, 'Tasa policial': 0.15, 'Variación incidencia delictiva': 0.10,
+                       'Academias': 0.05}.items():
+        st.session_state.setdefault(key, value)
+
     w_pob = st.number_input(
         'Población (Alto=Bueno)',
-        min_value=0.0, max_value=1.0, value=0.70, step=0.01, key='Población', 
+        min_value=0.0, max_value=1.0, step=0.01, key='Población', 
     )
     w_edo_fza = st.number_input(
         'Tasa policial (Alto=Bueno)',
-        min_value=0.0, max_value=1.0, value=0.15, step=0.01, key='Tasa policial'
+        min_value=0.0, max_value=1.0, step=0.01, key='Tasa policial'
     )
     w_var_incidencia_del = st.number_input(
         'Variación incidencia delictiva (Alto=Malo)',
-        min_value=0.0, max_value=1.0, value=0.10, step=0.01, key='Variación incidencia delictiva'
+        min_value=0.0, max_value=1.0, step=0.01, key='Variación incidencia delictiva'
     )
     w_academias = st.number_input(
         'Academias (Alto=Bueno)',
-        min_value=0.0, max_value=1.0, value=0.05, step=0.01, key='Academias'
+        min_value=0.0, max_value=1.0, step=0.01, key='Academias'
     )
 
     # asegurar que la suma sea 1.0 y ajustar el peso del último slider para cuadrar
@@ -147,17 +173,34 @@ weights = {
 }
 
 
-# upload final variables dataset
-# widget para subir archivos
-uploaded_file = st.file_uploader("", type=['csv'], )
+# Normalizador por indicador (por omisión el de la metodología)
+with st.sidebar.expander('Normalización'):
+    normalization = {
+        var_name: st.selectbox(
+            var_name, list(NORMALIZERS), index=list(NORMALIZERS).index('min_max'), key=f'norm_{var_name}',
+        )
+        for var_name in FOFISP_VARIABLE_MAP
+    }
 
-if uploaded_file is None:
-    st.text('Sube el archivo con las variables para la asignación del fondo en formato csv.')
-else:
-    data = pd.read_csv(io.BytesIO(uploaded_file.getvalue()))    
 
-    # tabla de indicadores
-    indicadores_fofisp = pd.read_csv('data/indicadores_fofisp.csv')
+# --- caché entre reruns ---
+# Solo el trabajo que depende de los ponderadores se recalcula al cambiar un widget.
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_upload(content):
+    """
+    Lee y valida el csv subido (columnas, tipos, rangos y 32 Entidades) antes de calcular;
+    el caché se indexa por el hash del contenido del archivo.
+    """
+    schema = lazy_import('asignacion.schema')
+    return schema.read_validated(content, schema.FOFISP_SCHEMA)
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def indicadores_html(path, mtime):
+    """Construye la tabla GT de indicadores y la regresa como HTML (se invalida si cambia el archivo)."""
+    great_tables = lazy_import('great_tables')
+    GT, md = great_tables.GT, great_tables.md
+    indicadores_fofisp = pd.read_csv(path)
     indicadores_fofisp['Categoría'] = indicadores_fofisp['Categoría'].fillna('')
     indicadores_fofisp['Ponderación_categoría'] = indicadores_fofisp['Ponderación_categoría'].fillna(0)
 
@@ -197,12 +240,73 @@ else:
             source_note=md("Fuente: *Secretariado Ejecutivo del Sistema Nacional de Seguridad Pública*")
         )
     )
-    
 
-    # tab layout
-    tab1, tab2, tab3, tab4 = st.tabs(['1.Introducción', '2.Cálculo', '3.Nota metodológica', '4.Nota técnica'])
+    return indicadores.as_raw_html()
+
 
-    with tab1:
+@st.cache_resource
+def result_cache():
+    """Memo LRU de resultados y figuras serializadas, compartido por las sesiones del servidor."""
+    return ResultCache(maxsize=32)
+
+
+@st.cache_resource
+def fofisp_graph():
+    """Grafo de cálculo incremental, compartido por las sesiones del servidor."""
+    return allocation_graph(FOFISP_VARIABLE_MAP, 'min_max')
+
+
+# upload final variables dataset
+# widget para subir archivos
+uploaded_file = st.file_uploader("", type=['csv'], )
+
+if uploaded_file is None:
+    st.text('Sube el archivo con las variables para la asignación del fondo en formato csv.')
+else:
+    try:
+        data = load_upload(uploaded_file.getvalue())
+    except lazy_import('asignacion.schema').SchemaError as error:
+        st.error('El archivo no cumple con el formato esperado:\n\n' + '\n'.join(f'- {e}' for e in error.errores))
+        st.stop()
+
+    # llave del escenario: contenido del archivo, ponderadores, presupuesto y bandas
+    memo = result_cache()
+    escenario = scenario_key(content_hash(uploaded_file.getvalue()), weights, presupuesto,
+                             upper_limit, lower_limit, method='min_max',
+                             normalization=normalization, centavos=centavos)
+
+    # --- Cálculo ---
+    # Calcular el índice, la asignación y las bandas (lo usan todas las secciones); el
+    # cálculo es incremental: solo se recalculan las etapas que dependen del widget que cambió.
+    fofisp_datos_entrada = data.copy()
+    graph = fofisp_graph()
+    params = allocation_params(fofisp_datos_entrada, weights, presupuesto, upper_limit, lower_limit,
+                               normalization, centavos)
+    # el resultado del escenario pasa por el memo (un escenario ya visto no toca el grafo); las
+    # etapas recalculadas se reportan por llamada porque el grafo es compartido entre sesiones
+    recalculadas = []
+    df_results = memo.get_or_compute(f'{escenario}:resultado',
+                                     lambda: graph.run('resultado', params, recalculadas))
+    etapas = {etapa: graph.key(etapa, params) for etapa in ('bruta', 'resultado')}
+
+    # contadores del memo de escenarios
+    memo_stats = memo.stats()
+    st.sidebar.caption(
+        f"Caché de escenarios: {memo_stats['hits']} aciertos, {memo_stats['misses']} fallos "
+        f"({memo_stats['size']}/{memo_stats['maxsize']})"
+    )
+    st.sidebar.caption(f"Etapas recalculadas: {len(recalculadas)} ({', '.join(recalculadas[:6]) or 'ninguna'})")
+
+    # --- navegación ---
+    # Solo se ejecuta la sección elegida: st.tabs ejecuta y serializa todas las pestañas en
+    # cada interacción, aunque no estén visibles.
+    # Streamlit descarta el estado de los widgets que no se dibujan en una ejecución; se
+    # conserva para las opciones de las secciones ocultas.
+    keep_widget_state(SECCION_DEFAULTS)
+
+    seccion = st.radio('Sección', SECCIONES, horizontal=True, key='Seccion', label_visibility='collapsed')
+
+    if seccion == SECCIONES[0]:
 
         # header
         st.subheader('1. Introducción')
@@ -213,6 +317,8 @@ else:
         </div>''',
          unsafe_allow_html=True)
 
+        indicadores = indicadores_html('data/indicadores_fofisp.csv',
+                                       os.path.getmtime('data/indicadores_fofisp.csv'))
         st.html(indicadores)
         st.caption('Tabla 1. Indicadores utilizados para la asignación de fondos y ponderaciones predeterminadas.')
 
@@ -245,7 +351,7 @@ else:
         ''')
 
 
-    with tab2:
+    if seccion == SECCIONES[1]:
         #st.header('2. Cálculo de Asignación')
         st.markdown(f'''
             ## 2. Escenarios de Asignación
@@ -254,226 +360,33 @@ else:
         st.subheader("2.1 Datos de Entrada")
 
         
-        # --- Funciones de Cálculo del Índice ---
-        def min_max_normalize(series, direction='positive'):
-            """
-            Normaliza una serie de datos entre 0 y 1 usando el método Min-Max.
-            Si la dirección es 'negativa', se invierte (Alto = Malo se convierte en Alto = Bueno).
-            """
-            min_val = series.min()
-            max_val = series.max()
-
-            if max_val == min_val:
-                return pd.Series(0.5, index=series.index) # Retorna 0.5 si todos los valores son iguales
-
-            if direction == 'positive':
-                # (X - Min) / (Max - Min) -> Un valor más alto resulta en una puntuación más alta
-                return (series - min_val) / (max_val - min_val)
-            elif direction == 'negative':
-                # (Max - X) / (Max - Min) -> Un valor más bajo (mejor) resulta en una puntuación más alta
-                return (max_val - series) / (max_val - min_val)
-            else:
-                raise ValueError("La dirección debe ser 'positiva' o 'negativa'")
-
-        def calculate_index(df, weights):
-            """Calcula el Índice Compuesto Normalizado."""
-
-            # 1. Normalización de Variables
-            # variables positivas
-            df['Pob_norm'] = min_max_normalize(df['Población'], direction='positive')
-            df['Tasa_policial_norm'] = min_max_normalize(df['Tasa_policial'], direction='positive')
-            df['Academias_norm'] = min_max_normalize(df['Academias'], direction='positive')
-
-            # variables negativas (menos es mejor, por lo tanto, se invierte)
-            df['Var_incidencia_del_norm'] = min_max_normalize(df['Var_incidencia_del'], direction='negative')
-
-            # 2. Aplicación de Ponderadores
-            df['Indice Normalizado'] = (
-                df['Pob_norm'] * weights['Población'] +
-                df['Tasa_policial_norm'] * weights['Tasa_policial'] +
-                df['Var_incidencia_del_norm'] * weights['Var_incidencia_del'] +
-                df['Academias_norm'] * weights['Academias']
-            )
-
-            # El índice final también se normaliza a un rango de 0 a 1 para asegurar comparabilidad
-            df['Indice Final (0-1)'] = min_max_normalize(df['Indice Normalizado'], direction='positive')
-            epsilon = 0.01
-            df['Indice Final (Corrimiento)'] = (df['Indice Final (0-1)'] * (1 - epsilon)) + epsilon
-
-            return df
-
-        
-
         # change index to start at 1, must specify last limit
-        fofisp_datos_entrada = data.copy()
-        data.index = pd.RangeIndex(start=1, stop=33, step=1)
-        data['Var_incidencia_del'] = data['Var_incidencia_del']*100
-        fofisp_datos_entrada2 = (
-            data
-                .style.format({
-                    'Población': '{:,.2f}',
-                    'Var_incidencia_del':'{:.2f}%',
-                    'Tasa_policial':'{:.2f}',
-                    'Asignacion_2025': '${:,.2f}',
-                    })
-                )
-
-        st.dataframe(fofisp_datos_entrada2, use_container_width=True)
+        data.index = pd.RangeIndex(start=1, stop=len(data) + 1, step=1)
+        st.dataframe(
+            paginate(data, 'pagina_datos'), use_container_width=True,
+            column_config={**formats(['Población'], '%,.2f'), **formats(['Tasa_policial'], '%.2f'),
+                           **percent('Var_incidencia_del'), **money('Asignacion_2025')},
+        )
         st.caption('Tabla 2. Variables utilizadas en el modelo para la asignación de fondos.')
 
 
-                # --- Cálculo y Visualización ---
-        # Calcular el índice
-        df_results = calculate_index(fofisp_datos_entrada, weights)
-        
         # Mostrar la tabla final de resultados
         st.subheader("2.2 Resultados")
-        # reckon end allocated amount
-        # sum final index
-        total_indice = df_results['Indice Final (Corrimiento)'].sum()
-        # create share weights
-        df_results['Reparto'] = df_results['Indice Final (Corrimiento)'] / total_indice
-        # Var%funds
-        df_results['Asignacion_2026'] = df_results['Reparto'] * presupuesto
-        # validate allocated budget
-        #stVar%dataframe(df_results[['Asignacion_2026']].sum()) -Var%    
-
-        # create diff amount and percentage
-        df_results['Var%'] = df_results['Asignacion_2026'] / df_results['Asignacion_2025'] -1
-
-        df_end = (
-            df_results[['Entidad_Federativa','Asignacion_2026','Asignacion_2025','Var%']]
-                .style
-                .format({
-                        'Asignacion_2026': '${:,.2f}',
-                        'Asignacion_2025': '${:,.2f}',
-                        'Var%': '{:.2%}',
-                        })
-        )
-
-        # Gráfico de barras de asignacion de fondos
-        fig = px.bar(
-            df_results,
-            x='Entidad_Federativa',
-            y='Asignacion_2026',
-            text='Asignacion_2026',
-            title=f"Población={w_pob*100:.0f}%, Tasa policial={w_edo_fza*100:.0f}%, Incidencia delictiva={w_var_incidencia_del*100:.0f}%, Academias={w_academias*100:.0f}%",
-            template='ggplot2',
-            hover_data={
-                'Entidad_Federativa':False,
-                'Asignacion_2026':':$,.2f', # customize hover for column of y attribute
-                'Var%':':.2%',
-                },
-            labels={
-                'Entidad_Federativa':'Entidad Federativa',
-                'Asignacion_2026':'Asignación 2026',
-                'Var%':'Variación',
-                },
-        )
-            
-        fig.update_traces(
-            textposition='outside',
-            marker_color='#235b4e',
-            opacity=0.9,
-            marker_line_color='#6f7271',
-            marker_line_width=1.2,
-            texttemplate='$%{text:,.2f}',
-            textfont_size=20,
-            )
 
-        fig.update_layout(
-            uniformtext_minsize=8, uniformtext_mode='hide',
-            hovermode="x unified",
-            autosize=True,
-            height=600,
-            xaxis_title='',
-            yaxis_title='Asignacion 2026',
-            hoverlabel=dict(
-                bgcolor="#fff",
-                font_size=16,
-                font_family="Noto Sans",
-                )
-            )
-
-        fig.update_xaxes(
-            showgrid=True,
-            title_font=dict(size=18, family='Noto Sans', color='#691c32'),  # X-axis title font size
-            tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),  # X-axis tick label font size
-            tickangle=-75,
-            )
+        # plotly se importa hasta que hay resultados que graficar
+        pio = lazy_import('plotly.io')
+        charts = lazy_import('asignacion.charts')
 
-        fig.update_yaxes(
-            tickprefix="$",
-            tickformat=',.0f',
-            showgrid=True,
-            title_font=dict(size=16, family='Noto Sans', color='#28282b'),
-            tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),
-            tickangle=0,
-            )
-            
+        # Gráfico de barras de asignacion de fondos (figuras memorizadas por escenario)
+        fig_title = (f"Población={w_pob*100:.0f}%, Tasa policial={w_edo_fza*100:.0f}%, "
+                     f"Incidencia delictiva={w_var_incidencia_del*100:.0f}%, Academias={w_academias*100:.0f}%")
+        fig = pio.from_json(memo.get_or_compute(
+            f"{etapas['bruta']}:fig", lambda: charts.allocation_bar(df_results, title=fig_title).to_json()))
         st.plotly_chart(fig, use_container_width=True)
 
 
         # Gráfico de barras de variación de asignacion de fondos respecto al año anterior
-        # create positive and negative colors using if and list comprehension
-        var_color = ['#235b4e' if v > 0 else '#9f2241' for v in df_results['Var%']]
-
-        fig_var = px.bar(
-            df_results,
-            x='Entidad_Federativa',
-            y='Var%',
-            text='Var%',
-            title=f"Variación en la Asignación de Fondos con respecto al Ejercicio Anterior",
-            template='ggplot2',
-            hover_data={
-                'Entidad_Federativa':False,
-                'Var%':':.2%',
-                },
-            labels={
-                'Entidad_Federativa':'Entidad Federativa',
-                'Var%':'Variación',
-                },
-        )
-            
-        fig_var.update_traces(
-            textposition='outside',
-            marker_color=var_color,
-            opacity=0.9,
-            marker_line_color='#6f7271',
-            marker_line_width=1.2,
-            texttemplate='%{text:.2%}',
-            textfont_size=20,
-            )
-
-        fig_var.update_layout(
-            uniformtext_minsize=8, uniformtext_mode='hide',
-            hovermode="x unified",
-            autosize=True,
-            height=600,
-            xaxis_title='',
-            yaxis_title='Variación %',
-            hoverlabel=dict(
-                bgcolor="#fff",
-                font_size=16,
-                font_family="Noto Sans",
-                )
-            )
-
-        fig_var.update_xaxes(
-            showgrid=True,
-            title_font=dict(size=18, family='Noto Sans', color='#bc955c'),  # X-axis title font size
-            tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),  # X-axis tick label font size
-            tickangle=-75,
-        )
-
-        fig_var.update_yaxes(
-            tickformat='.0%',
-            showgrid=True,
-            title_font=dict(size=16, family='Noto Sans', color='#28282b'),
-            tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),
-            tickangle=0,
-            )
-            
+        fig_var = pio.from_json(memo.get_or_compute(f"{etapas['bruta']}:fig_var", lambda: charts.variation_bar(df_results).to_json()))
         st.plotly_chart(fig_var, use_container_width=True)
 
 
@@ -484,131 +397,60 @@ else:
         A continuación, podemos observar la aplicación de estas bandas a las Entidades Federativas en la asignación 2026.
         ''')
 
-        # Define the tolerance level
-        # Calculate Allocation Band (Min and Max)
-        df_results['Min'] = df_results['Asignacion_2025'] * (1 - lower_limit)
-        df_results['Max'] = df_results['Asignacion_2025'] * (1 + upper_limit)
-        
-        # Calculate Funds to Pool (from allocations > Max)
-        # These are the funds we cap and re-claim
-        df_results['Superavit'] = np.where(df_results['Asignacion_2026'] > df_results['Max'],
-                                        df_results['Asignacion_2026'] - df_results['Max'],
-                                        0)
-
-        # Calculate Deficit to Cover (for allocations < Min)
-        # These are the funds we must first cover from the pool
-        df_results['Deficit'] = np.where(df_results['Asignacion_2026'] < df_results['Min'],
-                                        df_results['Min'] - df_results['Asignacion_2026'],
-                                        0)
-
-        # PHASE 2: Calculate Net Exceeding Fund and Interim Allocation
-
-        # Calculate the Net Exceeding Fund (Total Pooled Funds - Total Deficit Needed)
-        total_superavit = df_results['Superavit'].sum()
-        total_deficit = df_results['Deficit'].sum()
-        remanente = total_superavit - total_deficit
-        
-        # Define the data structure: a list of dictionaries, where each dict is a row
-        summary_data = [
-            {'Concepto': 'Superávit total', 'Importe': total_superavit},
-            {'Concepto': 'Déficit total', 'Importe': total_deficit},
-            {'Concepto': 'Remanente', 'Importe': remanente}
-        ]
-
-        # Create the new DataFrame
-        df_summary = pd.DataFrame(summary_data)
-
-        # show results and band limits
-        df_bandas = df_results.copy()
-        df_bandas['Var%'] = df_bandas['Var%']*100
-
-        # highlighting zeros
-        def highlight_zeros_yellow(value):
-            if value != 0:
-                return 'background-color: #ddc9a3'
-            return ''
-
-        # Apply the styling
-        df_bandas = (
-            df_bandas[['Entidad_Federativa','Asignacion_2025','Asignacion_2026','Var%','Min','Max','Superavit','Deficit']]
-            .style.format({
-                'Asignacion_2025': '${:,.2f}',
-                'Asignacion_2026': '${:,.2f}',
-                'Var%':'{:.2f}%',
-                'Min': '${:,.2f}',
-                'Max': '${:,.2f}',
-                'Superavit': '${:,.2f}',
-                'Deficit': '${:,.2f}',
-                })
-            .applymap(
-            highlight_zeros_yellow,
-                subset=['Superavit','Deficit']
-            )
+        # Resumen de superávit, déficit y remanente
+        df_summary = band_summary(df_results)
+
+        # show results and band limits, flagging rows with non-zero surplus/deficit
+        df_bandas = flag_nonzero(
+            paginate(df_results, 'pagina_bandas')[
+                ['Entidad_Federativa','Asignacion_2025','Asignacion_2026','Var%','Min','Max','Superavit','Deficit']],
+            subset=['Superavit','Deficit'], column='Fuera de banda',
         )
 
-        st.dataframe(df_bandas, hide_index=True)
+        st.dataframe(df_bandas, hide_index=True,
+                     column_config={**money('Asignacion_2025', 'Asignacion_2026', 'Min', 'Max', 'Superavit', 'Deficit'),
+                                    **percent('Var%'), **checkbox('Fuera de banda')})
         st.caption('Tabla 3. Entidades Federativas por encima/debajo de la banda de ±10%')
 
         st.markdown('''
-        En la siguiente tabla, se resume el superavit y deficit totales, respecto a la banda de 10% y el remanente a repartir.
+        En la siguiente tabla, se resume el superavit y deficit totales respecto a la banda de 10%, y el remanente
+        que libera (o consume) recortar cada Entidad a su banda.
         ''')
 
         
-        df_summary2 = (
-            df_summary
-                .style.format({
-                    'Importe': '${:,.2f}',
-                    })
-            )
-        st.dataframe(df_summary2, hide_index=True, width=300)
+        st.dataframe(df_summary, hide_index=True, width=300, column_config=money('Importe'))
         st.caption('Tabla 4. Resumen del remante')
 
-
-        # Determine Interim Allocation: Apply the caps and floors
-        # The .clip() function is perfect for this: setting min=TMin and max=TMax
-        df_results['Reasignacion'] = df_results['Asignacion_2026'].clip(lower=df_results['Min'], upper=df_results['Max'])
-        df_results['Elegibles'] = np.where(df_results['Reasignacion'] < df_results['Max'],
-                                            1,
-                                            0)
-        total_basis = df_results['Elegibles'].sum()
-        # 2. Calculate the proportional share of the net fund
-        if total_basis > 0:
-            df_results['Reparto_neto'] = (df_results['Elegibles'] / total_basis) * remanente
+        bandas = df_results.attrs['bandas']
+        if bandas['factible']:
+            st.markdown(f'''
+                El remanente no se reparte en una sola pasada: se busca un monto común *t* con el que la suma de las
+                asignaciones recortadas a la banda es igual a la asignación total. Cada Entidad que no queda en un
+                extremo de la banda recibe su asignación 2026 más el mismo monto **t = ${bandas['nivel']:,.2f}**;
+                las demás quedan en Min o Max (columna Tope).
+            ''')
         else:
-            df_results['Reparto_neto'] = 0
-
-        # 3. Calculate Final Adjusted Allocation
-        df_results['Asignacion_ajustada'] = df_results['Reasignacion'] + df_results['Reparto_neto']
-        # Calculate the final percentage change to confirm all are within the target band
-        df_results['Var%_ajustada'] = (df_results['Asignacion_ajustada'] - df_results['Asignacion_2025']) / df_results['Asignacion_2025']
-        
-        df_reasignacion = df_results.copy()
-        # create percentages
-        df_reasignacion['Var%'] = df_reasignacion['Var%']*100
-        df_reasignacion['Var%_ajustada'] = df_reasignacion['Var%_ajustada']*100
-
-        df_reasignacion2 = (
-            df_reasignacion[['Entidad_Federativa','Asignacion_2025','Asignacion_2026','Var%','Asignacion_ajustada','Var%_ajustada']]
-            .style.format({
-                'Asignacion_2025': '${:,.2f}',
-                'Asignacion_2026': '${:,.2f}',
-                'Var%':'{:.2f}%',
-                'Asignacion_ajustada': '${:,.2f}',
-                'Var%_ajustada':'{:.2f}%',
-                })
-        )
-
-        st.markdown('''
-            En esta tabla se muestra el importe reasignado así como la variación ajustada.
-        ''')
+            st.warning('El presupuesto no cabe en la banda de control: todas las Entidades quedan en el '
+                       'extremo de la banda y se escalan por el mismo factor para conservar el total.')
 
 
-        st.dataframe(df_reasignacion2, hide_index=True)
-        # validar que la suma de reasignacion ajustada sea igual al presupuesto inicial 2026
-        #st.dataframe(pd.Series(df_results['Asignacion_ajustada'].sum()))
-        st.caption('Tabla 5. Reasignación de Remanente por Entidad Federativa con banda de ±10%')
-
-        st.dataframe(df_results[['Asignacion_ajustada']].sum(), width=200, hide_index=True,
+        st.dataframe(
+            band_adjustment(paginate(df_results, 'pagina_reasignacion')),
+            hide_index=True,
+            column_config={**money('Asignacion_2025', 'Asignacion_2026', 'Asignacion_ajustada', 'Ajuste'),
+                           **percent('Var%_ajustada')},
+        )
+        st.caption('Tabla 5. Ajuste de la banda de ±10% por Entidad Federativa: diferencia contra la asignación 2026 '
+                   'y extremo de la banda alcanzado')
+        st.caption(f"Ajuste de banda: {bandas['iteraciones']} iteraciones, "
+                   f"{bandas['segundos'] * 1000:.2f} ms.")
+
+        # con centavos exactos el total se suma en enteros para que cuadre con la asignación total
+        if 'Asignacion_centavos' in df_results:
+            total = pd.Series({'Asignacion_ajustada': df_results['Asignacion_centavos'].sum() / 100})
+        else:
+            total = df_results[['Asignacion_ajustada']].sum()
+        st.dataframe(total, width=200, hide_index=True,
             column_config={
                 '0': st.column_config.NumberColumn(
                     'Importe total asignado',
@@ -619,70 +461,74 @@ else:
 
         # grafico2
         # Gráfico de barras de reasignacion de remanente 2026 vs 2025
-        fig2 = go.Figure(data=[
-            go.Bar(name='Ejercicio 2025',
-                x=df_results['Entidad_Federativa'],
-                y=df_results['Asignacion_2025'],
-                marker_color='#bc955c',
-                ),
-            go.Bar(name='Ejercicio 2026',
-                x=df_results['Entidad_Federativa'],
-                y=df_results['Asignacion_ajustada'],
-                marker_color='#691c32',
-                ),
-            ])
-
-        # Update layout to group bars
-        fig2.update_traces(
-            textposition='outside',
-            opacity=0.9,
-            marker_line_color='#6f7271',
-            marker_line_width=1.2,
-            texttemplate='$%{text:,.2f}',
-            textfont_size=20,
-            )
+        fig2 = pio.from_json(memo.get_or_compute(
+            f"{etapas['resultado']}:fig2",
+            lambda: charts.reallocation_bar(
+                df_results,
+                title="Reasignación de Fondos por Entidad Federativa después de Remanente de la banda de ±10%",
+            ).to_json(),
+        ))
+        st.plotly_chart(fig2, use_container_width=True)
 
-        fig2.update_layout(
-            barmode='group',
-            title=f"Reasignación de Fondos por Entidad Federativa después de Remanente de la banda de ±10%",
-            template='ggplot2',
-            uniformtext_minsize=8, uniformtext_mode='hide',
-            hovermode="x unified",
-            autosize=True,
-            height=600,
-            xaxis_title='',
-            yaxis_title='Asignacion 2026',
-            hoverlabel=dict(
-                bgcolor="#fff",
-                font_size=16,
-                font_family="Noto Sans",
-                )
+        # archivo municipal (más filas que Entidades): banda estatal y banda municipal
+        if len(data) > data['Entidad_Federativa'].nunique():
+            st.subheader('2.4 Asignación municipal')
+            st.markdown('''
+            El archivo tiene una fila por municipio. La banda de ±10% se aplica a los totales por Entidad Federativa
+            y el total ajustado de cada Entidad se reparte entre sus municipios con la banda municipal.
+            ''')
+
+            textos = [col for col in data.columns
+                      if col != 'Entidad_Federativa' and not pd.api.types.is_numeric_dtype(data[col])]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                columna = st.selectbox('Columna de municipio', textos, key='Columna municipio')
+            with col2:
+                municipal_upper = st.number_input('Banda municipal superior', min_value=0.0, step=0.01,
+                                                  key='Banda municipal superior')
+            with col3:
+                municipal_lower = st.number_input('Banda municipal inferior', min_value=0.0, max_value=1.0,
+                                                  step=0.01, key='Banda municipal inferior')
+
+            jerarquica = memo.get_or_compute(
+                f'{escenario}:municipal:{municipal_upper}:{municipal_lower}',
+                lambda: allocate_hierarchical(fofisp_datos_entrada, weights, presupuesto, upper_limit, lower_limit,
+                                              municipal_upper, municipal_lower, variable_map=FOFISP_VARIABLE_MAP,
+                                              method='min_max', normalization=normalization, centavos=centavos),
             )
 
-        fig2.update_xaxes(
-            showgrid=True,
-            title_font=dict(size=18, family='Noto Sans', color='#691c32'),  # X-axis title font size
-            tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),  # X-axis tick label font size
-            tickangle=-75,
+            st.dataframe(
+                jerarquica.estatal[['Entidad_Federativa','Municipios','Asignacion_2025','Asignacion_2026','Var%',
+                                    'Min','Max','Asignacion_ajustada','Var%_ajustada']],
+                hide_index=True,
+                column_config={**money('Asignacion_2025', 'Asignacion_2026', 'Min', 'Max', 'Asignacion_ajustada'),
+                               **percent('Var%', 'Var%_ajustada')},
             )
-
-        fig2.update_yaxes(
-            tickprefix="$",
-            tickformat=',.0f',
-            showgrid=True,
-            title_font=dict(size=16, family='Noto Sans', color='#28282b'),
-            tickfont=dict(size=15, family='Noto Sans', color='#4f4f4f'),
-            tickangle=0,
+            st.caption('Tabla 9. Asignación por Entidad Federativa con banda de ±10% sobre los totales municipales.')
+
+            municipal = jerarquica.municipal
+            st.dataframe(
+                paginate(municipal, 'pagina_municipal')[
+                    ['Entidad_Federativa'] + ([columna] if columna else []) +
+                    ['Asignacion_2025','Asignacion_2026','Min','Max','Asignacion_estatal','Asignacion_ajustada',
+                     'Var%_ajustada']],
+                hide_index=True,
+                column_config={**money('Asignacion_2025', 'Asignacion_2026', 'Min', 'Max', 'Asignacion_estatal',
+                                       'Asignacion_ajustada'),
+                               **percent('Var%_ajustada')},
             )
-        fig2.show()
-        st.plotly_chart(fig2, use_container_width=True)
+            st.caption('Tabla 10. Asignación por municipio con banda municipal dentro del total ajustado de su Entidad.')
+
+            no_factibles = municipal.attrs['bandas']['entidades_no_factibles']
+            if no_factibles:
+                st.warning('El total de estas Entidades no cabe en la banda municipal y sus municipios se escalan '
+                           f"por el mismo factor: {', '.join(no_factibles)}.")
 
-        
         st.markdown('---')
         st.markdown('*© Dirección General de Planeación*')
 
 
-    with tab3:
+    if seccion == SECCIONES[2]:
         st.header('3. Nota metodológica')
         st.markdown("""
         1. **Normalización:** Todos los indicadores se escalan al rango [0, 1].
@@ -753,12 +599,20 @@ else:
         st.subheader('3.5 Repartición del Remanente')
         st.markdown('''
         <div style="text-align: justify;">
-        Se aplican bandas del ±10% respecto al importe asignado del ejercicio anterior inmediato y se obtiene 
-        el total de importe sobrante y faltante aplicando estas bandas.
-        Posteriormente, se reparte este remanente entre las diversas Entidades Federativas para que ninguna rebase
-        las bandas del ±10%.
+        Se aplican bandas del ±10% respecto al importe asignado del ejercicio anterior inmediato. El remanente no se
+        reparte una sola vez entre las Entidades elegibles (eso puede volver a sacar Entidades de la banda): se busca
+        el monto común t que, sumado a la asignación de cada Entidad y recortado a su banda, hace que la suma sea
+        exactamente la asignación total.
         </div>''',
         unsafe_allow_html=True)
+        st.latex(r'''
+        x_j = \min(\max(A_j + t, \text{Min}_j), \text{Max}_j), \quad \sum_j x_j = \text{Asignación total}\\
+        \text{ }\\
+        \text{donde:}\\
+        \text{ }\\
+        A_j = \text{Asignación 2026 (sin bandas) de la Entidad Federativa j}\\
+        ''')
+        st.markdown('`Las Entidades que alcanzan Min o Max quedan en el extremo de la banda; el resto recibe el mismo monto t.`')
 
         st.markdown('---')
         st.markdown('*© Dirección General de Planeación*')
@@ -775,7 +629,7 @@ else:
             unsafe_allow_html=True
         )
 
-    with tab4:
+    if seccion == SECCIONES[3]:
 
         st.header('4. Nota técnica')
         st.markdown("""
@@ -785,9 +639,87 @@ else:
         Por otra parte, se anexa hoja de cálculo en formato xlsx (Excel) con el desarrollo mencionado.
         """)
 
-        st.dataframe(df_results)
+        st.dataframe(paginate(df_results, 'pagina_tecnica'))
 
         st.markdown("[Hoja de cálculo](https://sspcgob-my.sharepoint.com/:x:/g/personal/oscar_avila_sspc_gob_mx/ESy9dnRh6AdJgNEwSx5-udMBcKgLhTP29mnxWhgDvYF6WA?e=l1O8Xl)")
         
         st.markdown('---')
         st.markdown('*© Dirección General de Planeación*')
+
+    if seccion == SECCIONES[4]:
+        st.header('5. Sensibilidad a los ponderadores')
+        st.markdown('''
+        Pesos que mueve **un punto porcentual** (0.01) de cada ponderador en la asignación de cada Entidad Federativa.
+        Antes de bandas la sensibilidad se deriva analíticamente del índice normalizado; después de bandas se
+        obtiene por diferencias finitas sobre el cálculo por lotes.
+        ''')
+
+        antes, despues = memo.get_or_compute(
+            f'{escenario}:sensibilidad',
+            lambda: (
+                points_table(weight_jacobian(fofisp_datos_entrada, weights, presupuesto, FOFISP_VARIABLE_MAP,
+                                             'min_max', normalization)),
+                points_table(band_jacobian(fofisp_datos_entrada, weights, presupuesto, upper_limit, lower_limit,
+                                           FOFISP_VARIABLE_MAP, 'min_max', normalization)),
+            ),
+        )
+        montos = [col for col in antes.columns if col != 'Entidad_Federativa']
+
+        st.subheader('5.1 Antes de bandas')
+        st.dataframe(paginate(antes, 'pagina_sensibilidad_antes'), hide_index=True, use_container_width=True, column_config=money(*montos))
+        st.caption('Tabla 6. Cambio en la asignación por punto porcentual de cada ponderador (sin bandas).')
+
+        st.subheader('5.2 Después de bandas')
+        st.dataframe(paginate(despues, 'pagina_sensibilidad_despues'), hide_index=True, use_container_width=True, column_config=money(*montos))
+        st.caption('Tabla 7. Cambio en la asignación ajustada por punto porcentual de cada ponderador.')
+
+        st.markdown('---')
+        st.markdown('*© Dirección General de Planeación*')
+
+    if seccion == SECCIONES[5]:
+        st.header('6. Optimización de ponderadores')
+        st.markdown('''
+        Busca ponderadores (con suma igual a 1) que cumplan un objetivo de bandas o de política. Entre soluciones
+        equivalentes se prefiere la más cercana a los ponderadores actuales.
+        ''')
+
+        objetivo = st.radio(
+            'Objetivo', OBJECTIVES, horizontal=True, key='Objetivo optimizacion',
+            format_func={'bandas': 'Minimizar Entidades en Min/Max',
+                         'variacion': 'Var% ajustada dentro de ±x%'}.get,
+        )
+        max_var = st.number_input('Variación máxima (±x)', min_value=0.0, max_value=1.0, step=0.01,
+                                  key='Variacion maxima', disabled=objetivo != 'variacion')
+
+        if st.toggle('Buscar ponderadores', key='Buscar ponderadores'):
+            optimo = memo.get_or_compute(
+                f'{escenario}:optimizacion:{objetivo}:{max_var}',
+                lambda: optimize_weights(fofisp_datos_entrada, weights, presupuesto, upper_limit, lower_limit,
+                                         FOFISP_VARIABLE_MAP, 'min_max', normalization, objetivo, max_var,
+                                         seed=2026),
+            )
+
+            df_optimo = pd.DataFrame({
+                'Ponderador': list(optimo.weights),
+                'Actual': [weights[key] for key in optimo.weights],
+                'Óptimo': list(optimo.weights.values()),
+            })
+            df_optimo['Diferencia'] = df_optimo['Óptimo'] - df_optimo['Actual']
+            st.dataframe(df_optimo, hide_index=True,
+                         column_config={**formats(['Actual', 'Óptimo'], '%.4f'), **formats(['Diferencia'], '%+.4f')})
+            st.caption(f'Tabla 8. Ponderadores óptimos: {optimo.en_limite} Entidades en Min/Max, objetivo '
+                       f'{optimo.objetivo:,.4f} ({optimo.iteraciones} rondas, {optimo.evaluaciones:,} escenarios, '
+                       f'{optimo.segundos:.2f} s).')
+
+            # llaves de los widgets de ponderadores en la barra lateral
+            widget_keys = {'Población': 'Población', 'Tasa_policial': 'Tasa policial',
+                           'Var_incidencia_del': 'Variación incidencia delictiva', 'Academias': 'Academias'}
+
+            def aplicar_ponderadores():
+                for key, value in optimo.weights.items():
+                    st.session_state[widget_keys[key]] = round(value, 2)
+
+            st.button('Aplicar ponderadores óptimos', on_click=aplicar_ponderadores, key='Aplicar ponderadores')
+
+        st.markdown('---')
+        st.markdown('*© Dirección General de Planeación*')
@@ -0,0 +1,272 @@
+"""
+Selección de municipios FORTAMUN por umbral.
+
+En la selección (`select_municipalities`) un municipio queda fuera si no destina recursos a seguridad pública (y no
+cumple ningún criterio), queda siempre dentro si es prioritario o cumple el criterio
+adicional, y el resto entra cuando `dif_prom_nacl_inc_del >= -parámetro`. El número de
+municipios seleccionados es entonces una función escalonada y creciente del parámetro:
+
+    municipios(p) = siempre + #{candidatos con -dif_prom_nacl_inc_del <= p}
+
+Con los umbrales `-dif_prom_nacl_inc_del` de los candidatos ordenados una sola vez por
+archivo (`threshold_index`, O(n log n)), el conteo para cualquier parámetro es una
+búsqueda binaria y el parámetro que da exactamente `objetivo` municipios se lee
+directamente del arreglo ordenado. El DataFrame filtrado (`select_municipalities`) solo
+hace falta para descargar los resultados.
+
+`read_workbook` lee del Excel solo las columnas de `COLUMNAS` con calamine (el motor más
+rápido de Polars) y, si se indica un directorio, guarda una copia Arrow IPC con el hash
+del archivo como nombre: la siguiente sesión con el mismo archivo la lee en milisegundos.
+
+La preparación del Excel (`selection_plan`) y las tablas de la descarga (`result_tables`)
+son planes `LazyFrame`: el promedio nacional de incidencia se calcula como expresión
+dentro del plan (sin `.item()` intermedio) y Polars optimiza y ejecuta cada plan en un
+solo `collect`.
+"""
+import hashlib
+import io
+import math
+import os
+import zipfile
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import polars as pl
+
+
+# tamaño de la muestra de municipios beneficiados
+MUNICIPIOS_OBJETIVO = 247
+
+# columnas del Excel -> nombres del cálculo
+COLUMNAS = {
+    'CLAVE': 'Clave',
+    'NOM_ENT': 'Estado',
+    'CVE_MUN': 'Clave_mun',
+    'NOM_MUN': 'Mun',
+    'ASIGNACIÓN FORTAMUN ESTATAL': 'Asignacion_estatal',
+    'POB_TOTAL': 'Pob',
+    'TOTAL DE VIVIENDAS HABITADAS': 'Viviendas',
+    'Municipios que informaron haber destinado recursos del FORTAMUN a la atención de necesidades directamente vinculadas con la seguridad pública': 'seg_pub',
+    'Asignación municipal (Gacetas estatales)': 'Asignacion_municipal',
+    'INCIDENCIA DELICTIVA DE ALTO IMPACTO': 'Incidencia_delictiva',
+    '56 Municipios prioritarios': 'prioritarios',
+}
+
+
+class ThresholdIndex(NamedTuple):
+    """Municipios seleccionados con cualquier parámetro y umbrales ordenados de los candidatos."""
+    siempre: int
+    umbrales: np.ndarray
+
+    def count(self, parametro):
+        """Municipios seleccionados con `parametro` (el candidato entra si su umbral es <= parámetro)."""
+        return self.siempre + int(np.searchsorted(self.umbrales, parametro, side='right'))
+
+
+class ThresholdSolution(NamedTuple):
+    """
+    Parámetro para `objetivo` municipios. `intervalo` es [inicio, fin) de los parámetros
+    (>= 0) que dan exactamente `objetivo`; si no existe (empates en la diferencia o más
+    municipios fijos que el objetivo) `factible` es False y `parametro` da el conteo
+    alcanzable más cercano, `conteo`.
+    """
+    objetivo: int
+    factible: bool
+    parametro: float
+    intervalo: tuple | None
+    conteo: int
+
+
+def read_workbook(content, cache_dir=None):
+    """
+    Lee el Excel (`bytes`) con solo las columnas de `COLUMNAS`. Con `cache_dir` la copia
+    se guarda como `<sha256>.arrow` y las lecturas siguientes del mismo archivo la usan.
+    """
+    path = None
+    if cache_dir:
+        path = Path(cache_dir) / f'{hashlib.sha256(content).hexdigest()}.arrow'
+        if path.exists():
+            return pl.read_ipc(path)
+
+    data = pl.read_excel(io.BytesIO(content), engine='calamine', columns=list(COLUMNAS))
+
+    if path is not None:
+        # escritura atómica: otra sesión nunca lee una copia a medias
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        data.write_ipc(tmp)
+        os.replace(tmp, path)
+    return data
+
+
+def selection_plan(data):
+    """
+    Plan de `data2` a partir del Excel leído: renombra las columnas y agrega los criterios
+    de la selección. El promedio de incidencia de los municipios con seguridad pública y
+    asignación mayor al promedio nacional es una expresión que se difunde a cada fila.
+    """
+    prom_alto_impacto_asignacion_mayor_media = (
+        pl.col('Incidencia_delictiva')
+        .filter((pl.col('seg_pub') == 1) & (pl.col('mayor_prom_nacl_mun') == 1))
+        .mean()
+    )
+    return (
+        data.lazy()
+        .rename(COLUMNAS)
+        .with_columns(
+            (pl.col('Estado') + ', ' + pl.col('Mun')).alias('municipio'),
+            (pl.col('Asignacion_municipal') * 0.2).alias('seg_pub_20%'),
+            pl.when(
+                (pl.col('seg_pub') == 1)
+                & (pl.col('Asignacion_municipal') > pl.mean('Asignacion_municipal'))
+            )
+            .then(1)
+            .otherwise(0)
+            .alias('mayor_prom_nacl_mun'),
+        )
+        .with_columns(
+            pl.when(
+                (pl.col('Incidencia_delictiva') > prom_alto_impacto_asignacion_mayor_media)
+                & (pl.col('seg_pub') == 1)
+            )
+            .then(1)
+            .otherwise(0)
+            .alias('mayor_prom_inc_del'),
+        )
+        .with_columns(
+            pl.when(
+                (pl.col('mayor_prom_inc_del') == 1)
+                | (pl.col('prioritarios') == 1)
+            )
+            .then(1)
+            .otherwise(0)
+            .alias('criterio_adicional1'),
+            (pl.col('Incidencia_delictiva') - prom_alto_impacto_asignacion_mayor_media)
+            .alias('dif_prom_nacl_inc_del'),
+        )
+    )
+
+
+def threshold_index(data2):
+    """
+    Índice de umbrales de `data2`: los municipios fijos se separan (siempre dentro o
+    siempre fuera) y los umbrales de los candidatos se ordenan. Las condiciones son las
+    mismas de `select_municipalities`, evaluadas en el mismo orden.
+    """
+    cols = data2.select(
+        fuera=((pl.col('seg_pub') == 0) & (pl.col('mayor_prom_nacl_mun') == 0)
+               & (pl.col('mayor_prom_inc_del') == 0)).fill_null(False),
+        fijo=((pl.col('prioritarios') == 1) | (pl.col('criterio_adicional1') == 1)).fill_null(False),
+        candidato=(pl.col('criterio_adicional1') == 0).fill_null(False)
+                  & pl.col('dif_prom_nacl_inc_del').is_not_null(),
+        umbral=-pl.col('dif_prom_nacl_inc_del').cast(pl.Float64),
+    )
+    fuera = cols['fuera'].to_numpy()
+    fijo = cols['fijo'].to_numpy() & ~fuera
+    candidato = cols['candidato'].to_numpy() & ~fuera & ~fijo
+    return ThresholdIndex(int(fijo.sum()), np.sort(cols['umbral'].to_numpy()[candidato]))
+
+
+def select_municipalities(data2, parameter):
+    """Municipios seleccionados con `parameter` (DataFrame o LazyFrame filtrado, para la descarga)."""
+    return data2.with_columns(
+        pl.when(
+            (pl.col('seg_pub') == 0)
+            & (pl.col('mayor_prom_nacl_mun') == 0)
+            & (pl.col('mayor_prom_inc_del') == 0)
+        )
+        .then(pl.lit(0))
+        .when((pl.col('prioritarios') == 1) | (pl.col('criterio_adicional1') == 1))
+        .then(pl.lit(1))
+        .when((pl.col('criterio_adicional1') == 0) & (pl.col('dif_prom_nacl_inc_del') >= -parameter))
+        .then(pl.lit(1))
+        .otherwise(pl.lit(0))
+        .alias('prom_criterio_inc_del')
+    ).filter(
+        pl.col('prom_criterio_inc_del') == 1
+    )
+
+
+def result_tables(data2, parameter):
+    """
+    `(resultados, resumen)` de la descarga: el listado de municipios seleccionados con
+    `parameter` y el resumen por Entidad, en un solo plan (la selección se evalúa una vez).
+    """
+    municipios = select_municipalities(data2.lazy(), parameter)
+
+    # resultados listado 247 municipios
+    resultados = (
+        municipios.select(['Clave', 'Estado', 'Clave_mun', 'Mun', 'Pob'])
+        .rename({
+            'Estado': 'Entidad Federativa',
+            'Mun': 'Municipio',
+            'Pob': 'Población',
+        })
+    )
+    # resumen
+    estados = (
+        municipios.group_by('Estado', maintain_order=True)
+        .agg(pl.col('Mun').count(), pl.col('Asignacion_estatal').first())
+    )
+    municipios_por_estado = (
+        data2.lazy().group_by('Estado', maintain_order=True).agg(pl.col('Mun').count())
+    )
+    resumen = (
+        estados.join(municipios_por_estado, on='Estado', maintain_order='left')
+        .rename({
+            'Estado': 'Entidad Federativa',
+            'Mun': 'Municipios seleccionados',
+            'Asignacion_estatal': 'FORTAMUN',
+            'Mun_right': 'Total de Municipios',
+        })
+        .select(['Entidad Federativa', 'Total de Municipios', 'FORTAMUN', 'Municipios seleccionados'])
+    )
+    return tuple(pl.collect_all([resultados, resumen]))
+
+
+def results_zip(data2, parameter):
+    """Zip de la descarga con `resultados.csv` y `resumen.csv` (latin1) para `parameter`."""
+    resultados, resumen = result_tables(data2, parameter)
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "x") as csv_zip:
+        csv_zip.writestr("resultados.csv", resultados.write_csv(file=None).encode('latin1'))
+        csv_zip.writestr("resumen.csv", resumen.write_csv(file=None).encode('latin1'))
+    return buf.getvalue()
+
+
+def count_curve(index):
+    """
+    Curva municipios vs. parámetro: por cada umbral distinto, los municipios
+    seleccionados desde ese parámetro (abajo del primero quedan solo los fijos).
+    """
+    valores, conteos = np.unique(index.umbrales, return_counts=True)
+    return pl.DataFrame({'Parámetro': valores, 'Municipios': index.siempre + np.cumsum(conteos)})
+
+
+def solve_threshold(index, objetivo=MUNICIPIOS_OBJETIVO):
+    """Parámetro (>= 0) que selecciona exactamente `objetivo` municipios, o el más cercano."""
+    siempre, umbrales = index
+    # parámetros >= 0: los umbrales negativos cuentan desde p = 0
+    umbrales = np.maximum(umbrales, 0.0)
+    faltan = objetivo - siempre
+
+    if 0 <= faltan <= len(umbrales):
+        inicio = umbrales[faltan - 1] if faltan > 0 else 0.0
+        fin = umbrales[faltan] if faltan < len(umbrales) else math.inf
+        if inicio < fin:
+            # el primer entero del intervalo si cabe (más fácil de capturar)
+            parametro = math.ceil(inicio) if math.ceil(inicio) < fin else inicio
+            return ThresholdSolution(objetivo, True, float(parametro), (float(inicio), float(fin)), objetivo)
+
+    # conteos alcanzables: los fijos y, en cada umbral distinto, los candidatos hasta él
+    valores = np.unique(umbrales)
+    alcanzables = siempre + np.searchsorted(umbrales, valores, side='right')
+    parametros = valores
+    if len(valores) == 0 or valores[0] > 0:
+        alcanzables = np.r_[siempre, alcanzables]
+        parametros = np.r_[0.0, valores]
+    # el más cercano; en empate, el mayor
+    i = len(alcanzables) - 1 - np.argmin(np.abs(alcanzables - objetivo)[::-1])
+    return ThresholdSolution(objetivo, False, float(parametros[i]), None, int(alcanzables[i]))
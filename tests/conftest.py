@@ -0,0 +1,36 @@
+"""Datos sintéticos de 32 Entidades con los indicadores de FASP y FOFISP."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from asignacion import FASP_VARIABLE_MAP, FOFISP_VARIABLE_MAP
+
+
+PRESUPUESTO = 9_840_407_024.0
+
+
+def synthetic_data(variable_map, seed=0, n=32):
+    rng = np.random.default_rng(seed)
+    data = {'Entidad_Federativa': [f'Entidad {i + 1}' for i in range(n)]}
+    for var_name in variable_map:
+        # las variaciones pueden ser negativas; el resto de los indicadores es positivo
+        data[var_name] = rng.normal(0, 0.05, n) if var_name.startswith('Var_') else rng.uniform(0.1, 3.0, n)
+    data['Asignacion_2025'] = rng.uniform(0.5, 1.5, n) * PRESUPUESTO / n
+    return pd.DataFrame(data)
+
+
+@pytest.fixture
+def fasp_data():
+    return synthetic_data(FASP_VARIABLE_MAP)
+
+
+@pytest.fixture
+def fofisp_data():
+    return synthetic_data(FOFISP_VARIABLE_MAP, seed=1)
+
+
+@pytest.fixture
+def fasp_weights():
+    weights = dict.fromkeys(FASP_VARIABLE_MAP, 0.9 / len(FASP_VARIABLE_MAP))
+    weights['Monto base'] = 0.1
+    return weights
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from asignacion import band_adjustment, run_allocation, solve_bands
+
+from conftest import PRESUPUESTO
+
+
+def random_problems(trials, seed=0):
+    """Problemas pequeños con Entidades de asignación bruta cero y presupuesto dentro de la banda."""
+    rng = np.random.default_rng(seed)
+    for _ in range(trials):
+        n = rng.integers(3, 12)
+        asignacion = rng.uniform(0, 10, n)
+        asignacion[rng.random(n) < 0.3] = 0
+        anterior = rng.uniform(1, 10, n)
+        minimo = anterior * (1 - rng.uniform(0, 0.5))
+        maximo = anterior * (1 + rng.uniform(0, 0.5))
+        yield asignacion, minimo, maximo, rng.uniform(minimo.sum(), maximo.sum())
+
+
+@pytest.mark.parametrize('redistribution', ['proportional', 'equal'])
+def test_iterative_flags_only_solutions_inside_the_band(redistribution):
+    for asignacion, minimo, maximo, total in random_problems(3000):
+        iterative = solve_bands(asignacion, minimo, maximo, total, redistribution, method='iterative')
+        closed = solve_bands(asignacion, minimo, maximo, total, redistribution)
+
+        assert iterative.factible == closed.factible
+        if iterative.factible:
+            x = iterative.asignacion
+            assert np.isclose(x.sum(), total, rtol=1e-12)
+            assert (x >= minimo * (1 - 1e-12)).all() and (x <= maximo * (1 + 1e-12)).all()
+            np.testing.assert_allclose(x, closed.asignacion, rtol=1e-9)
+
+
+@pytest.mark.parametrize('method', ['closed', 'iterative'])
+@pytest.mark.parametrize('redistribution', ['proportional', 'equal'])
+def test_level_reproduces_the_states_inside_the_band(redistribution, method):
+    for asignacion, minimo, maximo, total in random_problems(500, seed=1):
+        solution = solve_bands(asignacion, minimo, maximo, total, redistribution, method=method)
+        if not solution.factible:
+            continue
+        a, s = (np.zeros_like(asignacion), asignacion) if redistribution == 'proportional' else (asignacion, 1.0)
+        # nivel común: x = clip(a + t * s, Min, Max)
+        np.testing.assert_allclose(solution.asignacion, np.clip(a + solution.nivel * s, minimo, maximo),
+                                   rtol=1e-9, atol=1e-9)
+
+
+def test_band_adjustment_marks_the_states_at_the_band(fasp_data, fasp_weights):
+    df = run_allocation(fasp_data, fasp_weights, PRESUPUESTO, 0.03, 0.08, centavos=True)
+    ajuste = band_adjustment(df)
+    t = df.attrs['bandas']['nivel']
+
+    libres = ajuste['Tope'] == ''
+    assert libres.any() and not libres.all()
+    np.testing.assert_allclose(ajuste['Asignacion_ajustada'][libres], t * ajuste['Asignacion_2026'][libres], atol=0.01)
+    np.testing.assert_allclose(ajuste['Asignacion_ajustada'][ajuste['Tope'] == 'Max'],
+                               df['Max'][ajuste['Tope'] == 'Max'], atol=0.01)
+    assert ajuste['Ajuste'].sum() == pytest.approx(0, abs=0.01)
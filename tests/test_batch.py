@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from asignacion import (FASP_MIN_MAX_VARIABLE_MAP, FASP_VARIABLE_MAP, evaluate_scenarios, run_allocation,
+                        weight_keys, weights_to_matrix)
+
+from conftest import PRESUPUESTO
+
+
+@pytest.mark.parametrize('variable_map, method', [
+    (FASP_VARIABLE_MAP, 'proportion'),
+    (FASP_MIN_MAX_VARIABLE_MAP, 'min_max'),
+])
+def test_evaluate_scenarios_matches_run_allocation(fasp_data, fasp_weights, variable_map, method):
+    # ponderadores que no suman 1 (la barra lateral no lo exige)
+    scenarios = [fasp_weights, {**fasp_weights, 'Pob': 0.3}, {**fasp_weights, 'Monto base': 0.0}]
+    keys = weight_keys(variable_map, method)
+
+    results = evaluate_scenarios(fasp_data, weights_to_matrix(scenarios, keys), PRESUPUESTO, 0.03, 0.08,
+                                 variable_map, method=method)
+
+    for i, weights in enumerate(scenarios):
+        df = run_allocation(fasp_data, weights, PRESUPUESTO, 0.03, 0.08, variable_map=variable_map, method=method)
+        np.testing.assert_allclose(results.asignacion_bruta[i], df['Asignacion_2026'], rtol=1e-9)
+        np.testing.assert_allclose(results.asignacion_ajustada[i], df['Asignacion_ajustada'], rtol=1e-9)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('plotly')
+
+from asignacion.charts import MAX_BARRAS, allocation_bar, reallocation_bar, variation_bar
+
+
+def test_municipal_results_are_drawn_by_state():
+    rng = np.random.default_rng(0)
+    n = 2_500
+    df = pd.DataFrame({
+        'Entidad_Federativa': [f'Entidad {i % 32 + 1}' for i in range(n)],
+        'Asignacion_2025': rng.uniform(1, 2, n),
+        'Asignacion_2026': rng.uniform(1, 2, n),
+        'Asignacion_ajustada': rng.uniform(1, 2, n),
+    })
+    df['Var%'] = df['Asignacion_2026'] / df['Asignacion_2025'] - 1
+
+    for fig in (allocation_bar(df), variation_bar(df), reallocation_bar(df)):
+        assert all(len(trace.x) == MAX_BARRAS for trace in fig.data)
+
+    # la variación de cada barra es la de los totales de la Entidad
+    total = df[df['Entidad_Federativa'] == 'Entidad 1'][['Asignacion_2025', 'Asignacion_2026']].sum()
+    np.testing.assert_allclose(variation_bar(df).data[0].y[0], total['Asignacion_2026'] / total['Asignacion_2025'] - 1)
+
+
+def test_state_results_keep_one_bar_per_row():
+    df = pd.DataFrame({'Entidad_Federativa': ['A', 'B'], 'Asignacion_2025': [1.0, 2.0],
+                       'Asignacion_2026': [1.5, 1.5], 'Asignacion_ajustada': [1.2, 1.8], 'Var%': [0.5, -0.25]})
+    assert list(allocation_bar(df).data[0].x) == ['A', 'B']
@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from asignacion import run_allocation
+from asignacion.cli import main
+
+from conftest import PRESUPUESTO
+
+
+@pytest.fixture
+def entradas(tmp_path, fasp_data, fasp_weights):
+    datos = tmp_path / 'datos.csv'
+    fasp_data.to_csv(datos, index=False)
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps({'fondo': 'fasp', 'presupuesto': PRESUPUESTO, 'weights': fasp_weights}))
+    return datos, config
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.parquet'])
+def test_round_trip_matches_run_allocation(entradas, tmp_path, capsys, extension):
+    datos, config = entradas
+    salida = tmp_path / f'resultado{extension}'
+
+    assert main([str(datos), str(config), '-o', str(salida)]) == 0
+
+    df = pd.read_csv(salida) if extension == '.csv' else pd.read_parquet(salida)
+    esperado = run_allocation(pd.read_csv(datos), json.loads(config.read_text())['weights'], PRESUPUESTO, 0.03, 0.08)
+    np.testing.assert_allclose(df['Asignacion_ajustada'], esperado['Asignacion_ajustada'], rtol=1e-12)
+    # centavos toma el valor por omisión del motor
+    assert 'Asignacion_centavos' not in df
+    assert '32 filas' in capsys.readouterr().out
+
+
+def test_centavos_flag(entradas, tmp_path):
+    datos, config = entradas
+    salida = tmp_path / 'resultado.csv'
+
+    assert main([str(datos), str(config), '-o', str(salida), '--centavos']) == 0
+    assert pd.read_csv(salida)['Asignacion_centavos'].sum() == round(PRESUPUESTO * 100)
+
+
+def test_bad_extension_fails_before_computing(entradas, tmp_path, capsys):
+    datos, config = entradas
+    salida = tmp_path / 'resultado.txt'
+
+    assert main([str(datos), str(config), '-o', str(salida)]) == 1
+    assert not salida.exists()
+    assert 'extensión' in capsys.readouterr().err
+
+
+def test_missing_columns_are_reported(entradas, tmp_path, capsys):
+    datos, config = entradas
+    pd.read_csv(datos).drop(columns=['Pob', 'Ctrl_conf']).to_csv(datos, index=False)
+
+    assert main([str(datos), str(config), '-o', str(tmp_path / 'resultado.csv')]) == 1
+    assert 'Faltan columnas en el csv: Pob, Ctrl_conf' in capsys.readouterr().err
+
+
+def test_missing_weights_are_reported(entradas, tmp_path, capsys):
+    datos, config = entradas
+    config.write_text(json.dumps({'presupuesto': PRESUPUESTO, 'weights': {'Pob': 1.0}}))
+
+    assert main([str(datos), str(config), '-o', str(tmp_path / 'resultado.csv')]) == 1
+    assert 'Faltan ponderadores' in capsys.readouterr().err
+
+
+def test_usage_error_exit_code(entradas):
+    with pytest.raises(SystemExit) as error:
+        main([str(entradas[0])])
+    assert error.value.code == 2
+
+
+def test_hierarchical_run_writes_the_state_summary(entradas, tmp_path, fasp_data, fasp_weights):
+    datos, config = entradas
+    # tres municipios por Entidad
+    municipal = pd.concat([fasp_data.assign(Municipio=f'Municipio {k}') for k in range(3)], ignore_index=True)
+    municipal['Asignacion_2025'] /= 3
+    municipal.to_csv(datos, index=False)
+    config.write_text(json.dumps({'presupuesto': PRESUPUESTO, 'weights': fasp_weights,
+                                  'municipal_upper': 0.15, 'municipal_lower': 0.15}))
+    salida = tmp_path / 'resultado.csv'
+
+    assert main([str(datos), str(config), '-o', str(salida)]) == 0
+
+    df, estatal = pd.read_csv(salida), pd.read_csv(tmp_path / 'resultado_estatal.csv')
+    assert len(df) == 96 and len(estatal) == 32
+    totales = df.groupby('Entidad_Federativa')['Asignacion_ajustada'].sum()
+    np.testing.assert_allclose(totales[estatal['Entidad_Federativa']], estatal['Asignacion_ajustada'], rtol=1e-9)
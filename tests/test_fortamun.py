@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[1] / 'fortamun_app'))
+
+from fortamun_pipeline import COLUMNAS, select_municipalities, selection_plan, solve_threshold, threshold_index  # noqa: E402
+
+
+def workbook(n=600, seed=0):
+    """Excel leído (encabezados originales) con incidencia entera: hay empates entre umbrales."""
+    rng = np.random.default_rng(seed)
+    incidencia = rng.integers(0, 400, n).astype(float)
+    incidencia[rng.random(n) < 0.05] = np.nan
+    data = {
+        'Clave': np.arange(n) // 20 + 1,
+        'Estado': [f'Entidad {k // 20 + 1}' for k in range(n)],
+        'Clave_mun': np.arange(n),
+        'Mun': [f'Municipio {k}' for k in range(n)],
+        'Asignacion_estatal': np.repeat(rng.uniform(1e8, 1e9, n // 20), 20),
+        'Pob': rng.integers(1_000, 500_000, n),
+        'Viviendas': rng.integers(300, 150_000, n),
+        'seg_pub': (rng.random(n) < 0.7).astype(int),
+        'Asignacion_municipal': rng.uniform(1e6, 1e8, n),
+        'Incidencia_delictiva': incidencia,
+        'prioritarios': (rng.random(n) < 0.03).astype(int),
+    }
+    return pl.DataFrame(data).with_columns(pl.col('Incidencia_delictiva').fill_nan(None)).rename(
+        {value: key for key, value in COLUMNAS.items()})
+
+
+@pytest.fixture
+def data2():
+    return selection_plan(workbook()).collect()
+
+
+@pytest.mark.parametrize('objetivo', [100, 232, 247, 300, 420, 10_000])
+def test_solve_threshold_matches_the_selection(data2, objetivo):
+    index = threshold_index(data2)
+    solution = solve_threshold(index, objetivo)
+
+    seleccionados = select_municipalities(data2, solution.parametro).height
+    assert seleccionados == solution.conteo
+    if solution.factible:
+        assert solution.conteo == objetivo and solution.parametro >= 0
+        inicio, fin = solution.intervalo
+        assert select_municipalities(data2, inicio).height == objetivo
+        if np.isfinite(fin):
+            assert select_municipalities(data2, fin).height > objetivo
+    else:
+        # ningún parámetro >= 0 da exactamente el objetivo y el conteo es el más cercano
+        parametros = np.r_[0.0, np.maximum(index.umbrales, 0)]
+        alcanzables = {select_municipalities(data2, p).height for p in parametros}
+        assert objetivo not in alcanzables
+        assert abs(solution.conteo - objetivo) == min(abs(conteo - objetivo) for conteo in alcanzables)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_threshold_index_count_matches_the_selection(seed):
+    data2 = selection_plan(workbook(seed=seed)).collect()
+    index = threshold_index(data2)
+
+    # incluye los umbrales exactos (empates), puntos intermedios y parámetros negativos
+    parametros = np.r_[-50.0, 0.0, index.umbrales, index.umbrales + 0.5, np.linspace(-10, 500, 37)]
+    for parametro in parametros:
+        assert index.count(parametro) == select_municipalities(data2, parametro).height
+    # con el LazyFrame se obtiene el mismo conteo
+    assert index.count(100) == select_municipalities(data2.lazy(), 100).collect().height
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from asignacion import FASP_MIN_MAX_VARIABLE_MAP, FASP_VARIABLE_MAP, run_allocation, simulate
+
+from conftest import PRESUPUESTO
+
+
+@pytest.mark.parametrize('variable_map, method', [
+    (FASP_VARIABLE_MAP, 'proportion'),
+    (FASP_MIN_MAX_VARIABLE_MAP, 'min_max'),
+])
+def test_simulate_without_noise_is_run_allocation(fasp_data, fasp_weights, variable_map, method):
+    weights = {**fasp_weights, 'Pob': 0.3}
+    df = run_allocation(fasp_data, weights, PRESUPUESTO, 0.03, 0.08, variable_map=variable_map, method=method)
+
+    results = simulate(fasp_data, weights, PRESUPUESTO, 0.03, 0.08, variable_map, method, noise=0.0,
+                       draws=4, seed=0)
+
+    np.testing.assert_allclose(results.asignaciones, np.broadcast_to(df['Asignacion_ajustada'], (4, len(df))),
+                               rtol=1e-9)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from asignacion import (FASP_VARIABLE_MAP, NORMALIZERS, direct_proportion_normalize, get_normalizer,
+                        min_max_normalize, normalize_matrix)
+from asignacion.engine import indicator_matrix
+from asignacion.normalizers import SHARE_NORMALIZERS, rank_matrix
+
+from conftest import synthetic_data
+
+
+@pytest.fixture
+def matrix():
+    return indicator_matrix(synthetic_data(FASP_VARIABLE_MAP))
+
+
+@pytest.mark.parametrize('name, reference', [
+    ('proportion', direct_proportion_normalize),
+    ('min_max', min_max_normalize),
+])
+def test_matrix_normalizers_match_the_column_versions(matrix, name, reference):
+    X, negative = matrix
+    scores = get_normalizer(name)(X, negative)
+    for j, direction in enumerate(FASP_VARIABLE_MAP.values()):
+        np.testing.assert_allclose(scores[:, j], reference(pd.Series(X[:, j]), direction), rtol=1e-12)
+
+
+@pytest.mark.parametrize('name', list(NORMALIZERS))
+def test_registered_normalizers(matrix, name):
+    X, negative = matrix
+    scores = NORMALIZERS[name](X, negative)
+    assert scores.shape == X.shape and np.isfinite(scores).all()
+
+    # un lote da lo mismo que cada matriz por separado
+    lote = np.stack([X, X * 2 + 1])
+    np.testing.assert_allclose(NORMALIZERS[name](lote, negative)[1], NORMALIZERS[name](lote[1], negative))
+
+    # más alto es mejor: en Alto=Malo el orden se invierte
+    for j in range(X.shape[1]):
+        orden = np.corrcoef(X[:, j], scores[:, j])[0, 1]
+        assert orden < 0 if negative[j] else orden > 0
+
+    if name in SHARE_NORMALIZERS:
+        np.testing.assert_allclose(scores.sum(axis=0), 1)
+
+
+@pytest.mark.parametrize('name', list(NORMALIZERS))
+def test_normalize_matrix_shares_sum_to_one(matrix, name):
+    X, negative = matrix
+    np.testing.assert_allclose(normalize_matrix(X, negative, [name] * X.shape[1], shares=True).sum(axis=0), 1)
+
+
+def test_rank_averages_ties():
+    X = np.array([[1.0], [3.0], [3.0], [5.0]])
+    np.testing.assert_allclose(rank_matrix(X, np.array([False]))[:, 0], [0, 0.5, 0.5, 1])
+
+
+def test_unknown_normalizer():
+    with pytest.raises(ValueError, match='Normalizador desconocido'):
+        get_normalizer('no_existe')
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from asignacion import FASP_MIN_MAX_VARIABLE_MAP, FASP_VARIABLE_MAP, optimize_weights, weight_keys
+
+from conftest import PRESUPUESTO
+
+
+# categorías como las de la app de FASP: incluyen el monto base aunque Min-Max no lo use
+CATEGORIAS = {
+    'Características Estatales': ['Pob', 'Var_inc_del', 'Monto base'],
+    'Desempeño Institucional': [key for key in FASP_VARIABLE_MAP if key not in ('Pob', 'Var_inc_del')],
+}
+
+
+@pytest.mark.parametrize('variable_map, method', [
+    (FASP_VARIABLE_MAP, 'proportion'),
+    (FASP_MIN_MAX_VARIABLE_MAP, 'min_max'),
+])
+def test_optimize_weights_keeps_category_totals(fasp_data, fasp_weights, variable_map, method):
+    result = optimize_weights(fasp_data, fasp_weights, PRESUPUESTO, 0.03, 0.08, variable_map, method,
+                              categories=CATEGORIAS, population=200, iterations=3, seed=0)
+
+    assert list(result.weights) == list(weight_keys(variable_map, method))
+    for members in CATEGORIAS.values():
+        members = [key for key in members if key in result.weights]
+        assert np.isclose(sum(result.weights[key] for key in members),
+                          sum(fasp_weights[key] for key in members))
@@ -0,0 +1,92 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from asignacion import FASP_MIN_MAX_VARIABLE_MAP, FASP_VARIABLE_MAP, Graph, allocation_graph, allocation_params, run_allocation
+
+from conftest import PRESUPUESTO
+
+
+CASOS = [(FASP_VARIABLE_MAP, 'proportion'), (FASP_MIN_MAX_VARIABLE_MAP, 'min_max')]
+
+
+@pytest.mark.parametrize('variable_map, method', CASOS)
+def test_resultado_matches_run_allocation(fasp_data, fasp_weights, variable_map, method):
+    graph = allocation_graph(variable_map, method)
+    df = graph.run('resultado', allocation_params(fasp_data, fasp_weights, PRESUPUESTO, 0.03, 0.08, centavos=True))
+
+    esperado = run_allocation(fasp_data, fasp_weights, PRESUPUESTO, 0.03, 0.08, variable_map=variable_map,
+                              method=method, centavos=True)
+    pd.testing.assert_frame_equal(df, esperado, check_exact=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize('variable_map, method', CASOS)
+def test_only_dependent_stages_are_recomputed(fasp_data, fasp_weights, variable_map, method):
+    graph = allocation_graph(variable_map, method)
+    params = allocation_params(fasp_data, fasp_weights, PRESUPUESTO, 0.03, 0.08)
+
+    primera = []
+    graph.run('resultado', params, primera)
+    assert {'matriz', 'normalizacion', 'bruta', 'bandas', 'resultado'} <= set(primera)
+
+    # mismo escenario: nada se recalcula
+    misma = []
+    graph.run('resultado', params, misma)
+    assert misma == []
+
+    # la banda solo invalida las bandas y el resultado
+    banda = []
+    graph.run('resultado', {**params, 'upper_limit': 0.05}, banda)
+    assert sorted(banda) == ['bandas', 'resultado']
+
+    # un ponderador no toca la matriz ni la normalización
+    ponderador = []
+    graph.run('resultado', {**params, 'w:Pob': 0.2}, ponderador)
+    assert 'bruta' in ponderador and not {'matriz', 'normalizacion'} & set(ponderador)
+    if method == 'proportion':
+        # en Proporción Directa solo se recalcula el monto de ese ponderador
+        assert [name for name in ponderador if name.startswith('monto:')] == ['monto:Pob']
+
+    # otro archivo invalida todo
+    datos = []
+    graph.run('resultado', {**params, 'data': fasp_data.assign(Pob=fasp_data['Pob'] * 2)}, datos)
+    assert {'matriz', 'normalizacion'} <= set(datos)
+
+
+def test_key_does_not_compute_and_missing_parameter():
+    calls = []
+    graph = Graph().add('doble', lambda x: calls.append(x) or 2 * x, 'x')
+
+    assert graph.key('doble', {'x': 1}) != graph.key('doble', {'x': 2})
+    assert calls == []
+    assert graph.run('doble', {'x': 3}) == 6
+    with pytest.raises(KeyError, match="Falta el parámetro 'x'"):
+        graph.key('doble', {})
+
+
+def test_recomputed_is_per_call_on_a_shared_graph():
+    # el grafo se comparte entre sesiones: cada llamada reporta solo sus etapas
+    barrier = threading.Barrier(2)
+
+    def lento(x):
+        barrier.wait(timeout=5)
+        return x
+
+    graph = Graph().add('a', lento, 'x').add('b', lambda a: a + 1, 'a')
+    recomputed = {}
+
+    def session(x):
+        recomputed[x] = []
+        graph.run('b', {'x': x}, recomputed[x])
+
+    threads = [threading.Thread(target=session, args=(x,)) for x in (1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert recomputed == {1: ['b', 'a'], 2: ['b', 'a']}
+    assert not hasattr(graph, 'recomputed')
+    np.testing.assert_array_equal(graph.stats()['misses'], [2, 2])
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from asignacion import FASP_MIN_MAX_VARIABLE_MAP, FASP_VARIABLE_MAP, largest_remainder, run_allocation, to_centavos
+
+from conftest import PRESUPUESTO
+
+
+def test_largest_remainder_sums_exactly_to_the_total():
+    rng = np.random.default_rng(0)
+    asignacion = rng.uniform(1e6, 5e8, (200, 32))
+    total = asignacion.sum(axis=1) + rng.uniform(-1, 1, 200)
+
+    centavos = largest_remainder(asignacion, total)
+
+    assert centavos.dtype == np.int64
+    np.testing.assert_array_equal(centavos.sum(axis=1), to_centavos(total))
+    # cada monto queda a menos de un centavo de su valor re-escalado al total
+    exacto = asignacion * (np.round(total, 2) / asignacion.sum(axis=1))[:, None] * 100
+    assert (np.abs(centavos - exacto) < 1).all()
+
+
+def test_extra_centavos_respect_the_band():
+    asignacion = np.array([1.004, 1.004, 1.004, 0.988])
+    minimo = np.array([0.0, 0.0, 0.0, 0.99])
+    maximo = np.array([1.0, 1.01, 1.01, 1.0])
+
+    centavos = largest_remainder(asignacion, 4.0, minimo, maximo)
+
+    # la Entidad bajo el mínimo recibe primero el centavo; la primera no rebasa su máximo
+    np.testing.assert_array_equal(centavos, [100, 101, 100, 99])
+
+
+@pytest.mark.parametrize('variable_map, method', [
+    (FASP_VARIABLE_MAP, 'proportion'),
+    (FASP_MIN_MAX_VARIABLE_MAP, 'min_max'),
+])
+def test_run_allocation_centavos_add_up_to_the_total_allocation(fasp_data, fasp_weights, variable_map, method):
+    df = run_allocation(fasp_data, fasp_weights, PRESUPUESTO, 0.03, 0.08, variable_map=variable_map, method=method,
+                        centavos=True)
+
+    assert df['Asignacion_centavos'].sum() == to_centavos(df['Asignacion_2026'].sum())
+    np.testing.assert_allclose(df['Asignacion_ajustada'], df['Asignacion_centavos'] / 100)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from asignacion.schema import FASP_SCHEMA, SchemaError, read_validated
+
+
+def csv(df):
+    return df.to_csv(index=False).encode()
+
+
+def errores(content):
+    with pytest.raises(SchemaError) as error:
+        read_validated(content, FASP_SCHEMA)
+    return error.value.errores
+
+
+def test_valid_csv_is_read_as_float64(fasp_data):
+    df = read_validated(csv(fasp_data), FASP_SCHEMA)
+
+    assert list(df.columns) == list(fasp_data.columns)
+    assert (df.drop(columns='Entidad_Federativa').dtypes == np.float64).all()
+    np.testing.assert_allclose(df['Asignacion_2025'], fasp_data['Asignacion_2025'])
+
+
+def test_missing_columns(fasp_data):
+    assert errores(csv(fasp_data.drop(columns=['Pob', 'Ctrl_conf']))) == ['Faltan columnas: Pob, Ctrl_conf']
+
+
+def test_empty_file(fasp_data):
+    assert errores(csv(fasp_data.head(0))) == ['El archivo no tiene filas']
+
+
+def test_all_problems_are_reported_together(fasp_data):
+    data = fasp_data.astype({'Pob': object, 'Ctrl_conf': object})
+    data.loc[2, 'Ctrl_conf'] = None
+    data.loc[4, 'Ctrl_conf'] = 'n/d'
+    data.loc[0, 'Asignacion_2025'] = 0
+    data.loc[1, 'Pob'] = -1
+
+    assert errores(csv(data)) == [
+        "'Pob' debe ser al menos 0 (filas 2)",
+        "'Ctrl_conf' tiene celdas vacías (filas 3)",
+        "'Ctrl_conf' tiene valores no numéricos (filas 5)",
+        "'Asignacion_2025' debe ser mayor que cero (filas 1)",
+    ]
+
+
+def test_entidad_count(fasp_data):
+    data = fasp_data.copy()
+    data.loc[1, 'Entidad_Federativa'] = data.loc[0, 'Entidad_Federativa']
+
+    assert errores(csv(data)) == ["'Entidad_Federativa' tiene 31 Entidades distintas; se esperan 32"]
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from asignacion import (FASP_MIN_MAX_VARIABLE_MAP, FASP_VARIABLE_MAP, band_jacobian, run_allocation,
+                        weight_jacobian, weight_keys)
+
+from conftest import PRESUPUESTO
+
+
+def finite_differences(data, weights, variable_map, method, column, step=1e-4):
+    """Jacobiano de `column` de `run_allocation` por diferencias finitas centrales."""
+    columns = []
+    for key in weight_keys(variable_map, method):
+        up = run_allocation(data, {**weights, key: weights[key] + step}, PRESUPUESTO, 0.03, 0.08,
+                            variable_map=variable_map, method=method)
+        down = run_allocation(data, {**weights, key: weights[key] - step}, PRESUPUESTO, 0.03, 0.08,
+                              variable_map=variable_map, method=method)
+        columns.append((up[column] - down[column]).to_numpy() / (2 * step))
+    return np.column_stack(columns)
+
+
+@pytest.mark.parametrize('variable_map, method', [
+    (FASP_VARIABLE_MAP, 'proportion'),
+    (FASP_MIN_MAX_VARIABLE_MAP, 'min_max'),
+])
+def test_jacobians_match_run_allocation(fasp_data, fasp_weights, variable_map, method):
+    weights = {**fasp_weights, 'Pob': 0.3}
+
+    antes = weight_jacobian(fasp_data, weights, PRESUPUESTO, variable_map, method)
+    despues = band_jacobian(fasp_data, weights, PRESUPUESTO, 0.03, 0.08, variable_map, method)
+
+    np.testing.assert_allclose(antes.to_numpy(), finite_differences(fasp_data, weights, variable_map, method,
+                                                                    'Asignacion_2026'), atol=1e-4 * PRESUPUESTO)
+    np.testing.assert_allclose(despues.to_numpy(), finite_differences(fasp_data, weights, variable_map, method,
+                                                                      'Asignacion_ajustada'), atol=1e-4 * PRESUPUESTO)
+    # antes y después de bandas cada ponderador mueve el mismo total
+    np.testing.assert_allclose(despues.sum(axis=0), antes.sum(axis=0), atol=1e-4 * PRESUPUESTO)